@@ -2,64 +2,394 @@
 from __future__ import annotations
 
 import logging
+from pathlib import Path
 from typing import Any
+from urllib.parse import quote
 
 import aiohttp
 import asyncio
 
+import voluptuous as vol
+
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import CONF_HOST, CONF_PORT, Platform
-from homeassistant.core import HomeAssistant
-from homeassistant.exceptions import ConfigEntryNotReady
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+)
+from homeassistant.exceptions import ConfigEntryNotReady, HomeAssistantError
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
+import homeassistant.helpers.config_validation as cv
+from homeassistant.helpers.typing import ConfigType
 
-from .const import DOMAIN
+from .const import (
+    DOMAIN,
+    ATTR_CONFIG_ENTRY_ID,
+    ATTR_FILE,
+    ATTR_NAME,
+    ATTR_PHRASES,
+    ATTR_SPEAKERS,
+    ATTR_SPEEDS,
+    ATTR_TRANSCRIPT,
+    CONF_FORMAT,
+    CONF_SERVERS,
+    CONF_SPEAKER,
+    CONF_SPEED,
+    DEFAULT_FORMAT,
+    DEFAULT_SPEED,
+    EVENT_PREWARM_COMPLETE,
+    EVENT_PREWARM_PROGRESS,
+    JOINABLE_FORMATS,
+    MAX_SPEED,
+    MIN_SPEED,
+    PREWARM_POLL_INTERVAL,
+    SEGMENT_MAX_CHARS,
+    SERVICE_PREWARM,
+    SERVICE_REGISTER_VOICE,
+    VOICE_REGISTER_TIMEOUT,
+)
+from .pool import ServerPool, parse_servers
+from .segment import split_text
+from .speakers import SpeakerDirectory
+from .stats import RequestStats
+from .timeouts import TimeoutEstimator
 
 _LOGGER = logging.getLogger(__name__)
 
-PLATFORMS: list[Platform] = [Platform.TTS]
+PLATFORMS: list[Platform] = [Platform.SENSOR, Platform.TTS]
+
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
+
+PREWARM_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_PHRASES): vol.All(cv.ensure_list, [cv.string]),
+        vol.Optional(ATTR_SPEAKERS): vol.All(cv.ensure_list, [cv.string]),
+        vol.Optional(ATTR_SPEEDS): vol.All(
+            cv.ensure_list,
+            [vol.All(vol.Coerce(float), vol.Range(min=MIN_SPEED, max=MAX_SPEED))],
+        ),
+        vol.Optional(ATTR_CONFIG_ENTRY_ID): cv.string,
+    }
+)
+
+REGISTER_VOICE_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_NAME): cv.string,
+        vol.Required(ATTR_FILE): cv.string,
+        vol.Optional(ATTR_TRANSCRIPT, default=""): cv.string,
+        vol.Optional(ATTR_CONFIG_ENTRY_ID): cv.string,
+    }
+)
+
+
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    """Set up the Qwen3 TTS services."""
+
+    async def async_prewarm(call: ServiceCall) -> ServiceResponse:
+        """Ask the server(s) to synthesize a phrase library into the audio cache."""
+        jobs = []
+        for entry_id in _service_entry_ids(hass, call):
+            jobs.extend(await _async_start_prewarm(hass, entry_id, call.data))
+        return {"jobs": jobs}
+
+    async def async_register_voice(call: ServiceCall) -> ServiceResponse:
+        """Register a reference clip as a custom voice on the server(s)."""
+        path = hass.config.path(call.data[ATTR_FILE])
+        if not hass.config.is_allowed_path(path):
+            raise HomeAssistantError(
+                f"Cannot read {path}: add its directory to allowlist_external_dirs"
+            )
+        try:
+            audio = await hass.async_add_executor_job(Path(path).read_bytes)
+        except OSError as err:
+            raise HomeAssistantError(f"Cannot read {path}: {err}") from err
+
+        voices = []
+        for entry_id in _service_entry_ids(hass, call):
+            voices.extend(
+                await _async_register_voice(
+                    hass,
+                    entry_id,
+                    call.data[ATTR_NAME],
+                    audio,
+                    call.data[ATTR_TRANSCRIPT],
+                )
+            )
+        return {"voices": voices}
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_PREWARM,
+        async_prewarm,
+        schema=PREWARM_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_REGISTER_VOICE,
+        async_register_voice,
+        schema=REGISTER_VOICE_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    return True
+
+
+def _service_entry_ids(hass: HomeAssistant, call: ServiceCall) -> list[str]:
+    """Return the config entries a service call targets (all loaded ones by default)."""
+    entries = hass.data.get(DOMAIN, {})
+    if entry_id := call.data.get(ATTR_CONFIG_ENTRY_ID):
+        if entry_id not in entries:
+            raise HomeAssistantError(f"Qwen3 TTS entry {entry_id} is not loaded")
+        return [entry_id]
+    return list(entries)
+
+
+async def _async_register_voice(
+    hass: HomeAssistant, entry_id: str, name: str, audio: bytes, transcript: str
+) -> list[dict[str, Any]]:
+    """Upload a reference clip to each healthy server of an entry.
+
+    Every server keeps its own voice registry, so the voice is registered on
+    each one. The server computes the speaker conditioning once, so later
+    synthesis with the voice is as fast as with a built-in speaker. Voice
+    cloning needs a Base model on every server, otherwise the voice would
+    only be usable on part of the pool.
+    """
+    entry_data = hass.data[DOMAIN][entry_id]
+    pool: ServerPool = entry_data["pool"]
+    session = entry_data["session"]
+
+    backends = pool.healthy_backends()
+    if unsupported := [b.base_url for b in backends if not b.voice_cloning]:
+        raise HomeAssistantError(
+            f"Voice cloning is not available on {', '.join(unsupported)}: the "
+            "server must run a Qwen3-TTS Base model (for example "
+            "Qwen/Qwen3-TTS-12Hz-0.6B-Base)"
+        )
+
+    voices = []
+    for backend in backends:
+        base_url = backend.base_url
+        try:
+            async with asyncio.timeout(VOICE_REGISTER_TIMEOUT):
+                async with session.put(
+                    f"{base_url}/api/voices/{quote(name, safe='')}",
+                    params={"transcript": transcript},
+                    data=audio,
+                ) as response:
+                    if response.status != 201:
+                        raise HomeAssistantError(
+                            f"Registering voice {name} on {base_url} failed with status "
+                            f"{response.status}: {await response.text()}"
+                        )
+                    voice = await response.json()
+        except (asyncio.TimeoutError, aiohttp.ClientError) as err:
+            raise HomeAssistantError(
+                f"Error registering voice {name} on {base_url}: {err}"
+            ) from err
+
+        _LOGGER.info(
+            "Registered custom voice %s on %s (%.1f s reference clip)",
+            name,
+            base_url,
+            voice["duration"],
+        )
+        voices.append({"config_entry_id": entry_id, "server": base_url, **voice})
+
+    # Offer the new voice right away instead of at the next periodic refresh
+    await entry_data["speakers"].async_refresh()
+    return voices
+
+
+async def _async_start_prewarm(
+    hass: HomeAssistant, entry_id: str, data: dict[str, Any]
+) -> list[dict[str, Any]]:
+    """Submit a prewarm job to each healthy server of an entry.
+
+    Every server in the pool has its own audio cache, so each one is warmed.
+    Progress is tracked in the background.
+    """
+    entry = hass.config_entries.async_get_entry(entry_id)
+    entry_data = hass.data[DOMAIN][entry_id]
+    pool: ServerPool = entry_data["pool"]
+    session = entry_data["session"]
+
+    speakers = data.get(ATTR_SPEAKERS) or [entry.data.get(CONF_SPEAKER) or "Vivian"]
+    speeds = data.get(ATTR_SPEEDS) or [entry.data.get(CONF_SPEED, DEFAULT_SPEED)]
+    audio_format = entry.data.get(CONF_FORMAT, DEFAULT_FORMAT)
+
+    # Long phrases are synthesized segment by segment by the TTS entity, so warm
+    # the same segments (in the same format) to make the first real playback a
+    # cache hit.
+    targets: dict[tuple[str, str], None] = {}
+    for phrase in data[ATTR_PHRASES]:
+        segments = split_text(phrase, SEGMENT_MAX_CHARS)
+        segment_format = (
+            audio_format
+            if len(segments) == 1 or audio_format in JOINABLE_FORMATS
+            else DEFAULT_FORMAT
+        )
+        for segment in segments:
+            targets[(segment, segment_format)] = None
+
+    items = [
+        {
+            "text": text,
+            "speaker": speaker,
+            "speed": speed,
+            "language": "Chinese",
+            "format": segment_format,
+        }
+        for text, segment_format in targets
+        for speaker in speakers
+        for speed in speeds
+    ]
+    if not items:
+        raise HomeAssistantError("No phrases to prewarm")
+
+    jobs = []
+    for backend in pool.healthy_backends():
+        base_url = backend.base_url
+        try:
+            async with asyncio.timeout(10):
+                async with session.post(
+                    f"{base_url}/api/tts/prewarm", json={"items": items}
+                ) as response:
+                    if response.status != 202:
+                        raise HomeAssistantError(
+                            f"Prewarm request to {base_url} failed with status "
+                            f"{response.status}: {await response.text()}"
+                        )
+                    job = await response.json()
+        except (asyncio.TimeoutError, aiohttp.ClientError) as err:
+            raise HomeAssistantError(
+                f"Error sending prewarm request to {base_url}: {err}"
+            ) from err
+
+        _LOGGER.info(
+            "Started prewarm job %s on %s (%d items)", job["job_id"], base_url, len(items)
+        )
+        hass.async_create_background_task(
+            _async_track_prewarm(hass, entry_id, base_url, session, job),
+            name=f"{DOMAIN} prewarm {job['job_id']}",
+        )
+        jobs.append({"config_entry_id": entry_id, "server": base_url, **job})
+    return jobs
+
+
+async def _async_track_prewarm(
+    hass: HomeAssistant,
+    entry_id: str,
+    base_url: str,
+    session: aiohttp.ClientSession,
+    job: dict[str, Any],
+) -> None:
+    """Poll a prewarm job and fire progress and completion events."""
+    url = f"{base_url}/api/tts/prewarm/{job['job_id']}"
+    last_done = -1
+    errors = 0
+    while True:
+        await asyncio.sleep(PREWARM_POLL_INTERVAL)
+        try:
+            async with asyncio.timeout(10):
+                async with session.get(url) as response:
+                    if response.status == 404:
+                        _LOGGER.warning(
+                            "Prewarm job %s is no longer known to the server",
+                            job["job_id"],
+                        )
+                        return
+                    response.raise_for_status()
+                    progress = await response.json()
+        except (asyncio.TimeoutError, aiohttp.ClientError) as err:
+            errors += 1
+            if errors >= 3:
+                _LOGGER.warning(
+                    "Stopped tracking prewarm job %s: %s", job["job_id"], err
+                )
+                return
+            continue
+        errors = 0
+
+        event_data = {"config_entry_id": entry_id, "server": base_url, **progress}
+        if progress["status"] == "failed":
+            hass.bus.async_fire(EVENT_PREWARM_COMPLETE, event_data)
+            _LOGGER.warning(
+                "Prewarm job %s stopped after %d of %d items",
+                job["job_id"],
+                progress["done"],
+                progress["total"],
+            )
+            return
+        if progress["status"] == "completed":
+            hass.bus.async_fire(EVENT_PREWARM_COMPLETE, event_data)
+            _LOGGER.info(
+                "Prewarm job %s completed (%d items, %d already cached, %d failed)",
+                job["job_id"],
+                progress["total"],
+                progress["cached"],
+                progress["failed"],
+            )
+            return
+        if progress["done"] != last_done:
+            last_done = progress["done"]
+            hass.bus.async_fire(EVENT_PREWARM_PROGRESS, event_data)
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up Qwen3 TTS from a config entry."""
     host = entry.data[CONF_HOST]
     port = entry.data[CONF_PORT]
+    servers = [(host, port)]
+    for server in parse_servers(entry.data.get(CONF_SERVERS, "")):
+        if server not in servers:
+            servers.append(server)
 
-    # Verify connection to Qwen3 TTS server
-    url = f"http://{host}:{port}/health"
     session = async_get_clientsession(hass)
+    pool = ServerPool(
+        hass, session, [f"http://{server[0]}:{server[1]}" for server in servers]
+    )
 
-    try:
-        async with asyncio.timeout(10):
-            async with session.get(url) as response:
-                if response.status != 200:
-                    raise ConfigEntryNotReady(
-                        f"Qwen3 TTS server returned status {response.status}"
-                    )
-                data = await response.json()
-                _LOGGER.info(
-                    "Successfully connected to Qwen3 TTS server at %s:%s (status: %s)",
-                    host,
-                    port,
-                    data.get("status"),
-                )
-    except asyncio.TimeoutError as err:
-        raise ConfigEntryNotReady(
-            f"Timeout connecting to Qwen3 TTS server at {host}:{port}"
-        ) from err
-    except aiohttp.ClientError as err:
+    # Verify connection to at least one Qwen3 TTS server
+    await pool.async_probe()
+    if not pool.healthy_backends():
         raise ConfigEntryNotReady(
-            f"Error connecting to Qwen3 TTS server at {host}:{port}: {err}"
-        ) from err
+            f"Error connecting to Qwen3 TTS server at {host}:{port}: "
+            f"{pool.primary.last_error}"
+        )
+    _LOGGER.info(
+        "Successfully connected to %d of %d Qwen3 TTS servers (%s)",
+        len(pool.healthy_backends()),
+        len(pool.backends),
+        ", ".join(backend.base_url for backend in pool.healthy_backends()),
+    )
+    pool.async_start()
+    entry.async_on_unload(pool.async_stop)
+
+    # Discover speakers in the background so synthesis never waits for it
+    speakers = SpeakerDirectory(hass, session, pool)
+    speakers.async_start()
+    entry.async_on_unload(speakers.async_stop)
+
+    # Load the generation speed learned before the last restart
+    timeouts = TimeoutEstimator(hass, entry.entry_id)
+    await timeouts.async_load()
 
-    # Store the base URL in hass.data
+    # Store the server pool, speaker list, request statistics and timeout
+    # estimates in hass.data
     hass.data.setdefault(DOMAIN, {})
     hass.data[DOMAIN][entry.entry_id] = {
-        "base_url": f"http://{host}:{port}",
+        "base_url": pool.primary.base_url,
         "session": session,
+        "pool": pool,
+        "speakers": speakers,
+        "stats": RequestStats(),
+        "timeouts": timeouts,
     }
 
-    # Forward the setup to the TTS platform
+    # Forward the setup to the sensor and TTS platforms
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
 
     # Register update listener to reload on config changes
@@ -13,6 +13,11 @@ from homeassistant.const import CONF_HOST, CONF_PORT
 from homeassistant.core import HomeAssistant
 from homeassistant.data_entry_flow import FlowResult
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.selector import (
+    SelectSelector,
+    SelectSelectorConfig,
+    SelectSelectorMode,
+)
 
 from .const import (
     DOMAIN,
@@ -20,14 +25,27 @@ from .const import (
     DEFAULT_PORT,
     DEFAULT_SPEED,
     DEFAULT_TIMEOUT,
+    DEFAULT_PARALLELISM,
+    DEFAULT_FORMAT,
+    DEFAULT_TIMEOUT_MARGIN,
+    CONF_PARALLELISM,
+    CONF_FORMAT,
+    CONF_SERVERS,
     CONF_SPEED,
     CONF_SPEAKER,
     CONF_TIMEOUT,
+    CONF_TIMEOUT_MARGIN,
     MIN_SPEED,
     MAX_SPEED,
     MIN_TIMEOUT,
     MAX_TIMEOUT,
+    MIN_PARALLELISM,
+    MAX_PARALLELISM,
+    MIN_TIMEOUT_MARGIN,
+    MAX_TIMEOUT_MARGIN,
+    SUPPORT_FORMATS,
 )
+from .pool import parse_servers
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -41,6 +59,7 @@ STEP_USER_DATA_SCHEMA = vol.Schema(
         vol.Optional(CONF_TIMEOUT, default=DEFAULT_TIMEOUT): vol.All(
             vol.Coerce(int), vol.Range(min=MIN_TIMEOUT, max=MAX_TIMEOUT)
         ),
+        vol.Optional(CONF_SERVERS, default=""): str,
     }
 )
 
@@ -54,6 +73,13 @@ async def validate_input(hass: HomeAssistant, data: dict[str, Any]) -> dict[str,
     port = data[CONF_PORT]
     url = f"http://{host}:{port}/health"
 
+    # Additional pool servers only need to be well formed; the pool's health
+    # probe admits them once they are reachable.
+    try:
+        parse_servers(data.get(CONF_SERVERS, ""))
+    except ValueError as err:
+        raise InvalidServers(str(err)) from err
+
     session = async_get_clientsession(hass)
 
     try:
@@ -91,6 +117,8 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 info = await validate_input(self.hass, user_input)
             except CannotConnect:
                 errors["base"] = "cannot_connect"
+            except InvalidServers:
+                errors[CONF_SERVERS] = "invalid_servers"
             except Exception:  # pylint: disable=broad-except
                 _LOGGER.exception("Unexpected exception")
                 errors["base"] = "unknown"
@@ -138,12 +166,17 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
             # Validate connection if host or port changed
             host_changed = user_input.get(CONF_HOST) != self.config_entry.data.get(CONF_HOST)
             port_changed = user_input.get(CONF_PORT) != self.config_entry.data.get(CONF_PORT)
+            servers_changed = user_input.get(CONF_SERVERS, "") != self.config_entry.data.get(
+                CONF_SERVERS, ""
+            )
 
-            if host_changed or port_changed:
+            if host_changed or port_changed or servers_changed:
                 try:
                     await validate_input(self.hass, user_input)
                 except CannotConnect:
                     errors["base"] = "cannot_connect"
+                except InvalidServers:
+                    errors[CONF_SERVERS] = "invalid_servers"
                 except Exception:  # pylint: disable=broad-except
                     _LOGGER.exception("Unexpected exception in options flow validation")
                     errors["base"] = "unknown"
@@ -162,6 +195,14 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
         current_speed = self.config_entry.data.get(CONF_SPEED, DEFAULT_SPEED)
         current_speaker = self.config_entry.data.get(CONF_SPEAKER, "")
         current_timeout = self.config_entry.data.get(CONF_TIMEOUT, DEFAULT_TIMEOUT)
+        current_parallelism = self.config_entry.data.get(
+            CONF_PARALLELISM, DEFAULT_PARALLELISM
+        )
+        current_timeout_margin = self.config_entry.data.get(
+            CONF_TIMEOUT_MARGIN, DEFAULT_TIMEOUT_MARGIN
+        )
+        current_format = self.config_entry.data.get(CONF_FORMAT, DEFAULT_FORMAT)
+        current_servers = self.config_entry.data.get(CONF_SERVERS, "")
 
         return self.async_show_form(
             step_id="init",
@@ -172,15 +213,54 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
                     vol.Optional(CONF_SPEED, default=current_speed): vol.All(
                         vol.Coerce(float), vol.Range(min=MIN_SPEED, max=MAX_SPEED)
                     ),
-                    vol.Optional(CONF_SPEAKER, default=current_speaker): str,
+                    vol.Optional(CONF_SPEAKER, default=current_speaker): SelectSelector(
+                        SelectSelectorConfig(
+                            options=self._speaker_options(current_speaker),
+                            custom_value=True,
+                            mode=SelectSelectorMode.DROPDOWN,
+                        )
+                    ),
                     vol.Optional(CONF_TIMEOUT, default=current_timeout): vol.All(
                         vol.Coerce(int), vol.Range(min=MIN_TIMEOUT, max=MAX_TIMEOUT)
                     ),
+                    vol.Optional(
+                        CONF_PARALLELISM, default=current_parallelism
+                    ): vol.All(
+                        vol.Coerce(int),
+                        vol.Range(min=MIN_PARALLELISM, max=MAX_PARALLELISM),
+                    ),
+                    vol.Optional(
+                        CONF_TIMEOUT_MARGIN, default=current_timeout_margin
+                    ): vol.All(
+                        vol.Coerce(float),
+                        vol.Range(min=MIN_TIMEOUT_MARGIN, max=MAX_TIMEOUT_MARGIN),
+                    ),
+                    vol.Optional(CONF_FORMAT, default=current_format): vol.In(
+                        SUPPORT_FORMATS
+                    ),
+                    vol.Optional(CONF_SERVERS, default=current_servers): str,
                 }
             ),
             errors=errors,
         )
 
+    def _speaker_options(self, current_speaker: str) -> list[str]:
+        """Return the speakers the server offers, including custom voices.
+
+        Any other name can still be typed in, for example a voice registered
+        after the speaker list was last refreshed.
+        """
+        entry_data = self.hass.data.get(DOMAIN, {}).get(self.config_entry.entry_id, {})
+        directory = entry_data.get("speakers")
+        speakers = list(directory.speakers or []) if directory is not None else []
+        if current_speaker and current_speaker not in speakers:
+            speakers.append(current_speaker)
+        return speakers
+
 
 class CannotConnect(Exception):
     """Error to indicate we cannot connect."""
+
+
+class InvalidServers(Exception):
+    """Error to indicate the additional server list is malformed."""
@@ -1,4 +1,6 @@
 """Constants for the Qwen3 TTS integration."""
+from datetime import timedelta
+
 from homeassistant.const import CONF_HOST, CONF_PORT
 
 DOMAIN = "qwen3_tts"
@@ -8,11 +10,43 @@ DEFAULT_HOST = "localhost"
 DEFAULT_PORT = 7861  # MLX-Audio version port (7860 was Docker version)
 DEFAULT_SPEED = 1.0
 DEFAULT_TIMEOUT = 60  # Default base timeout in seconds
+DEFAULT_PARALLELISM = 2  # Concurrent segment requests for long messages
+DEFAULT_FORMAT = "wav"
+DEFAULT_TIMEOUT_MARGIN = 3.0
 
 # Configuration keys
 CONF_SPEED = "speed"
 CONF_SPEAKER = "speaker"
 CONF_TIMEOUT = "timeout"
+CONF_PARALLELISM = "parallelism"
+CONF_FORMAT = "format"
+CONF_SERVERS = "servers"  # Additional host:port pairs for the server pool
+CONF_PRIORITY = "priority"  # Per-message TTS option: interactive or bulk
+CONF_TIMEOUT_MARGIN = "timeout_margin"  # Safety factor for learned timeouts
+# Per-message TTS options for server-side post-processing
+CONF_SAMPLE_RATE = "sample_rate"  # Resample the output to this rate
+CONF_TRIM_SILENCE = "trim_silence"  # Trim leading and trailing silence
+CONF_LOUDNESS = "loudness"  # Normalize to this integrated loudness (LUFS)
+
+# Server pool health checking
+HEALTH_CHECK_INTERVAL = timedelta(seconds=30)
+HEALTH_CHECK_TIMEOUT = 5  # Seconds
+MAX_BACKEND_FAILURES = 2  # Consecutive failed requests before a server is ejected
+
+# Services and events
+SERVICE_PREWARM = "prewarm"
+SERVICE_REGISTER_VOICE = "register_voice"
+ATTR_PHRASES = "phrases"
+ATTR_SPEAKERS = "speakers"
+ATTR_SPEEDS = "speeds"
+ATTR_CONFIG_ENTRY_ID = "config_entry_id"
+ATTR_NAME = "name"
+ATTR_FILE = "file"
+ATTR_TRANSCRIPT = "transcript"
+EVENT_PREWARM_PROGRESS = f"{DOMAIN}_prewarm_progress"
+EVENT_PREWARM_COMPLETE = f"{DOMAIN}_prewarm_complete"
+PREWARM_POLL_INTERVAL = 2  # Seconds between prewarm progress polls
+VOICE_REGISTER_TIMEOUT = 120  # Seconds to compute a custom voice on the server
 
 # Supported languages (Qwen3-TTS supports 10 languages)
 SUPPORT_LANGUAGES = [
@@ -28,6 +62,25 @@ SUPPORT_LANGUAGES = [
     "it",  # Italian
 ]
 
+# Audio formats the server can encode, and the file extension for each
+SUPPORT_FORMATS = ["wav", "flac", "opus", "mp3"]
+FORMAT_EXTENSIONS = {
+    "wav": "wav",
+    "flac": "flac",
+    "opus": "ogg",
+    "mp3": "mp3",
+}
+# Formats whose segments can be joined into one file (FLAC cannot)
+JOINABLE_FORMATS = ["wav", "opus", "mp3"]
+
+# Output sample rates the server can resample to, and those Ogg Opus supports
+SUPPORT_SAMPLE_RATES = [8000, 16000, 22050, 24000, 44100, 48000]
+OPUS_SAMPLE_RATES = [8000, 16000, 24000, 48000]
+
+# Loudness normalization target range (LUFS)
+MIN_LOUDNESS = -40.0
+MAX_LOUDNESS = -5.0
+
 # Speed range
 MIN_SPEED = 0.5
 MAX_SPEED = 2.0
@@ -35,3 +88,37 @@ MAX_SPEED = 2.0
 # Timeout range (in seconds)
 MIN_TIMEOUT = 10
 MAX_TIMEOUT = 300
+
+# Learned timeout safety margin range
+MIN_TIMEOUT_MARGIN = 1.5
+MAX_TIMEOUT_MARGIN = 10.0
+
+# Adaptive timeouts: weight of the newest sample in the moving estimates,
+# samples needed before an estimate replaces the static formula, and how
+# long to batch estimate updates before writing them to storage (seconds)
+ADAPTIVE_ALPHA = 0.2
+ADAPTIVE_MIN_SAMPLES = 5
+ADAPTIVE_SAVE_DELAY = 60
+
+# Parallel segment requests range
+MIN_PARALLELISM = 1
+MAX_PARALLELISM = 8
+
+# Long messages are split into segments of at most this many characters
+SEGMENT_MAX_CHARS = 150
+# Extra attempts for a segment that times out or fails with a server error
+SEGMENT_RETRIES = 1
+
+# Server scheduling priorities. Interactive requests (Assist replies) run
+# before bulk ones (long announcements); messages longer than
+# BULK_MIN_CHARS are sent as bulk unless the priority option says otherwise.
+PRIORITY_INTERACTIVE = "interactive"
+PRIORITY_BULK = "bulk"
+PRIORITIES = [PRIORITY_INTERACTIVE, PRIORITY_BULK]
+BULK_MIN_CHARS = 200
+
+# Client request statistics: number of recent requests kept for percentiles
+STATS_WINDOW = 200
+
+# Speaker list refresh interval (conditional requests, so refreshes are cheap)
+SPEAKERS_REFRESH_INTERVAL = timedelta(minutes=10)
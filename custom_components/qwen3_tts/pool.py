@@ -0,0 +1,212 @@
+"""Pool of Qwen3 TTS servers with least-outstanding-requests routing."""
+from __future__ import annotations
+
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime
+import logging
+
+import aiohttp
+import asyncio
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.event import async_track_time_interval
+
+from .const import HEALTH_CHECK_INTERVAL, HEALTH_CHECK_TIMEOUT, MAX_BACKEND_FAILURES
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def parse_servers(value: str) -> list[tuple[str, int]]:
+    """Parse a comma separated list of host:port pairs.
+
+    Raises ValueError if an entry is not a valid host:port pair.
+    """
+    servers: list[tuple[str, int]] = []
+    for item in value.replace("\n", ",").split(","):
+        item = item.strip()
+        if not item:
+            continue
+        host, sep, port = item.rpartition(":")
+        if not sep or not host or not port.isdigit() or not 0 < int(port) < 65536:
+            raise ValueError(f"Invalid server address: {item}")
+        servers.append((host, int(port)))
+    return servers
+
+
+async def _async_ready_info(response: aiohttp.ClientResponse) -> tuple[int, bool]:
+    """Return a server's highest protocol version and whether it can clone voices.
+
+    Servers that do not report them are treated as version 1 without voice
+    cloning.
+    """
+    try:
+        data = await response.json(content_type=None)
+        return max(data.get("api_versions") or [1]), bool(data.get("voice_cloning"))
+    except (ValueError, TypeError, AttributeError, aiohttp.ClientError):
+        return 1, False
+
+
+@dataclass
+class Backend:
+    """A single Qwen3 TTS server in the pool."""
+
+    base_url: str
+    healthy: bool = True
+    in_flight: int = 0
+    failures: int = 0
+    last_error: str | None = None
+    # Highest request protocol version the server advertises (1 = query parameters)
+    api_version: int = 1
+    # Whether the server's model can register custom voices (a Base model)
+    voice_cloning: bool = False
+
+
+class ServerPool:
+    """Route requests to the least loaded healthy Qwen3 TTS server.
+
+    Each backend tracks its in-flight requests. Backends are ejected after
+    MAX_BACKEND_FAILURES consecutive failed requests or a failed health
+    probe, and re-admitted by the periodic health probe once they answer
+    again.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        session: aiohttp.ClientSession,
+        base_urls: list[str],
+    ) -> None:
+        """Initialize the pool."""
+        self.hass = hass
+        self._session = session
+        self.backends = [Backend(base_url) for base_url in base_urls]
+        self._next = 0
+        self._unsub_probe: Callable[[], None] | None = None
+
+    @property
+    def primary(self) -> Backend:
+        """Return the first configured backend."""
+        return self.backends[0]
+
+    def healthy_backends(self) -> list[Backend]:
+        """Return the backends currently admitted to the pool."""
+        return [backend for backend in self.backends if backend.healthy]
+
+    def acquire(self, exclude: set[str] | None = None) -> Backend | None:
+        """Pick the healthy backend with the fewest requests in flight.
+
+        Backends in exclude (for example ones that already failed this
+        request) are only used if nothing else is available. Ties are broken
+        round-robin so idle backends share the load.
+        """
+        exclude = exclude or set()
+        candidates = [
+            backend
+            for backend in self.healthy_backends()
+            if backend.base_url not in exclude
+        ] or self.healthy_backends()
+        if not candidates:
+            return None
+
+        self._next = (self._next + 1) % len(self.backends)
+        return min(
+            candidates,
+            key=lambda backend: (
+                backend.in_flight,
+                (self.backends.index(backend) - self._next) % len(self.backends),
+            ),
+        )
+
+    @contextmanager
+    def track(self, backend: Backend) -> Iterator[Backend]:
+        """Count a request as in flight on backend for the duration of the block."""
+        backend.in_flight += 1
+        try:
+            yield backend
+        finally:
+            backend.in_flight -= 1
+
+    @callback
+    def mark_success(self, backend: Backend) -> None:
+        """Record a successful request."""
+        backend.failures = 0
+
+    @callback
+    def mark_failure(self, backend: Backend, error: str) -> None:
+        """Record a failed request and eject the backend if it keeps failing."""
+        backend.failures += 1
+        backend.last_error = error
+        if backend.healthy and backend.failures >= MAX_BACKEND_FAILURES:
+            backend.healthy = False
+            _LOGGER.warning(
+                "Ejected Qwen3 TTS server %s from pool after %d failures: %s",
+                backend.base_url,
+                backend.failures,
+                error,
+            )
+
+    async def async_probe(self, now: datetime | None = None) -> None:
+        """Check the health of every backend."""
+        await asyncio.gather(
+            *(self._async_probe_backend(backend) for backend in self.backends)
+        )
+
+    async def _async_probe_backend(self, backend: Backend) -> None:
+        """Check one backend and eject or re-admit it.
+
+        A backend is only admitted once /ready reports that its model is
+        loaded and warmed up. Servers without a /ready endpoint fall back to
+        /health. The protocol versions listed in the /ready response decide
+        whether requests use the v2 endpoints, and its voice_cloning flag
+        whether custom voices can be registered on the server.
+        """
+        try:
+            async with asyncio.timeout(HEALTH_CHECK_TIMEOUT):
+                async with self._session.get(f"{backend.base_url}/ready") as response:
+                    status = response.status
+                    if status == 200:
+                        (
+                            backend.api_version,
+                            backend.voice_cloning,
+                        ) = await _async_ready_info(response)
+                if status == 404:
+                    backend.api_version, backend.voice_cloning = 1, False
+                    async with self._session.get(
+                        f"{backend.base_url}/health"
+                    ) as response:
+                        status = response.status
+            ok = status == 200
+            error = None if ok else f"status {status}"
+        except (asyncio.TimeoutError, aiohttp.ClientError) as err:
+            ok = False
+            error = str(err) or type(err).__name__
+
+        if ok and not backend.healthy:
+            _LOGGER.info("Re-admitted Qwen3 TTS server %s to pool", backend.base_url)
+        elif not ok and backend.healthy:
+            _LOGGER.warning(
+                "Ejected Qwen3 TTS server %s from pool: not ready (%s)",
+                backend.base_url,
+                error,
+            )
+        backend.healthy = ok
+        if ok:
+            backend.failures = 0
+        else:
+            backend.last_error = error
+
+    @callback
+    def async_start(self) -> None:
+        """Start probing backend health periodically."""
+        self._unsub_probe = async_track_time_interval(
+            self.hass, self.async_probe, HEALTH_CHECK_INTERVAL
+        )
+
+    @callback
+    def async_stop(self) -> None:
+        """Stop probing backend health."""
+        if self._unsub_probe is not None:
+            self._unsub_probe()
+            self._unsub_probe = None
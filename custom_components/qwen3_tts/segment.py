@@ -0,0 +1,73 @@
+"""Sentence segmentation for long Qwen3 TTS messages."""
+from __future__ import annotations
+
+import re
+
+# Sentence terminators. CJK punctuation ends a sentence on its own, ASCII
+# punctuation only when followed by whitespace so that "21.5" or "v1.2" stay intact.
+_SENTENCE_END = re.compile(r"(?<=[。！？；…\n])|(?<=[.!?;])(?=\s)")
+
+# Clause boundaries, used only to break up sentences that are still too long.
+_CLAUSE_END = re.compile(r"(?<=[，、：,:])")
+
+
+def split_text(text: str, max_chars: int) -> list[str]:
+    """Split text into segments of at most max_chars characters.
+
+    Text is split at sentence boundaries first, sentences longer than
+    max_chars are split at clause boundaries, and anything still too long
+    is split at whitespace (or hard-cut for unbroken CJK text). Adjacent
+    short pieces are merged back together so segments stay close to
+    max_chars, which keeps prosody natural and the request count low.
+    """
+    text = text.strip()
+    if len(text) <= max_chars:
+        return [text] if text else []
+
+    pieces: list[str] = []
+    for sentence in _split(_SENTENCE_END, text):
+        if len(sentence) <= max_chars:
+            pieces.append(sentence)
+            continue
+        for clause in _split(_CLAUSE_END, sentence):
+            if len(clause) <= max_chars:
+                pieces.append(clause)
+            else:
+                pieces.extend(_hard_split(clause, max_chars))
+
+    segments: list[str] = []
+    current = ""
+    for piece in pieces:
+        candidate = f"{current} {piece}" if _needs_space(current, piece) else current + piece
+        if current and len(candidate) > max_chars:
+            segments.append(current)
+            current = piece
+        else:
+            current = candidate
+    if current:
+        segments.append(current)
+    return segments
+
+
+def _split(pattern: re.Pattern[str], text: str) -> list[str]:
+    """Split text after each match of pattern, dropping empty pieces."""
+    return [part.strip() for part in pattern.split(text) if part.strip()]
+
+
+def _hard_split(text: str, max_chars: int) -> list[str]:
+    """Split text at whitespace, or every max_chars characters if there is none."""
+    parts: list[str] = []
+    while len(text) > max_chars:
+        cut = text.rfind(" ", 0, max_chars + 1)
+        if cut <= 0:
+            cut = max_chars
+        parts.append(text[:cut].strip())
+        text = text[cut:].strip()
+    if text:
+        parts.append(text)
+    return parts
+
+
+def _needs_space(left: str, right: str) -> bool:
+    """Return True if two pieces of Latin-script text need a space between them."""
+    return bool(left) and left[-1].isascii() and right[:1].isascii()
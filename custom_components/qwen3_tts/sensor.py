@@ -0,0 +1,126 @@
+"""Sensors reporting client-side Qwen3 TTS request statistics."""
+from __future__ import annotations
+
+from collections.abc import Callable
+from dataclasses import dataclass
+
+from homeassistant.components.sensor import (
+    SensorDeviceClass,
+    SensorEntity,
+    SensorEntityDescription,
+    SensorStateClass,
+)
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import EntityCategory, UnitOfInformation, UnitOfTime
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.device_registry import DeviceInfo
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+
+from .const import DOMAIN
+from .stats import RequestStats, percentile
+
+
+@dataclass(frozen=True, kw_only=True)
+class Qwen3TTSSensorEntityDescription(SensorEntityDescription):
+    """Describes a Qwen3 TTS statistics sensor."""
+
+    value_fn: Callable[[RequestStats], float | int | None]
+
+
+def _latency_sensor(key: str, name: str, values: str, q: float) -> Qwen3TTSSensorEntityDescription:
+    """Describe a sensor reporting a percentile of one of the timing buffers."""
+    return Qwen3TTSSensorEntityDescription(
+        key=key,
+        name=name,
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement=UnitOfTime.SECONDS,
+        suggested_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        suggested_display_precision=0,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        value_fn=lambda stats: percentile(list(getattr(stats, values)), q),
+    )
+
+
+SENSORS: tuple[Qwen3TTSSensorEntityDescription, ...] = (
+    _latency_sensor("latency_p50", "Latency p50", "latency", 50),
+    _latency_sensor("latency_p95", "Latency p95", "latency", 95),
+    _latency_sensor("latency_p99", "Latency p99", "latency", 99),
+    _latency_sensor("server_time", "Server generation time", "server_time", 50),
+    _latency_sensor("network_overhead", "Network overhead", "network_overhead", 50),
+    Qwen3TTSSensorEntityDescription(
+        key="bytes_received",
+        name="Audio received",
+        device_class=SensorDeviceClass.DATA_SIZE,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        native_unit_of_measurement=UnitOfInformation.BYTES,
+        suggested_unit_of_measurement=UnitOfInformation.MEBIBYTES,
+        suggested_display_precision=1,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        value_fn=lambda stats: stats.bytes_received,
+    ),
+    Qwen3TTSSensorEntityDescription(
+        key="timeouts",
+        name="Timeouts",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        value_fn=lambda stats: stats.timeouts,
+    ),
+    Qwen3TTSSensorEntityDescription(
+        key="errors",
+        name="Errors",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        value_fn=lambda stats: stats.errors,
+    ),
+)
+
+
+async def async_setup_entry(
+    hass: HomeAssistant,
+    config_entry: ConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+) -> None:
+    """Set up Qwen3 TTS statistics sensors via config entry."""
+    stats = hass.data[DOMAIN][config_entry.entry_id]["stats"]
+    async_add_entities(
+        Qwen3TTSSensor(stats, config_entry, description) for description in SENSORS
+    )
+
+
+class Qwen3TTSSensor(SensorEntity):
+    """A rolling statistic of the requests made to the Qwen3 TTS server(s)."""
+
+    entity_description: Qwen3TTSSensorEntityDescription
+    _attr_has_entity_name = True
+    _attr_should_poll = False
+
+    def __init__(
+        self,
+        stats: RequestStats,
+        config_entry: ConfigEntry,
+        description: Qwen3TTSSensorEntityDescription,
+    ) -> None:
+        """Initialize the sensor."""
+        self.entity_description = description
+        self._stats = stats
+        self._attr_unique_id = f"{DOMAIN}_{config_entry.entry_id}_{description.key}"
+        self._attr_device_info = DeviceInfo(
+            identifiers={(DOMAIN, config_entry.entry_id)},
+            name=config_entry.title,
+            manufacturer="Qwen",
+            model="Qwen3-TTS",
+        )
+
+    @property
+    def native_value(self) -> float | int | None:
+        """Return the current value of the statistic."""
+        return self.entity_description.value_fn(self._stats)
+
+    async def async_added_to_hass(self) -> None:
+        """Update the sensor whenever a request completes."""
+        self.async_on_remove(self._stats.async_add_listener(self._async_update))
+
+    @callback
+    def _async_update(self) -> None:
+        self.async_write_ha_state()
@@ -0,0 +1,89 @@
+"""Background-refreshed snapshot of the speakers offered by the Qwen3 TTS server."""
+from __future__ import annotations
+
+from collections.abc import Callable
+from datetime import datetime
+import logging
+
+import aiohttp
+import asyncio
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.event import async_track_time_interval
+
+from .const import DOMAIN, SPEAKERS_REFRESH_INTERVAL
+from .pool import ServerPool
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class SpeakerDirectory:
+    """Keep the server's speaker list up to date without blocking synthesis.
+
+    The list is fetched in the background when the config entry is set up
+    and refreshed every SPEAKERS_REFRESH_INTERVAL with a conditional request
+    (If-None-Match), so an unchanged list costs one 304 response. Readers
+    get the last snapshot, or None until the first fetch has succeeded.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        session: aiohttp.ClientSession,
+        pool: ServerPool,
+    ) -> None:
+        """Initialize the directory."""
+        self.hass = hass
+        self._session = session
+        self._pool = pool
+        self.speakers: list[str] | None = None
+        self._etag: str | None = None
+        self._unsub_refresh: Callable[[], None] | None = None
+
+    async def async_refresh(self, now: datetime | None = None) -> None:
+        """Fetch the speaker list if it changed since the last fetch."""
+        if (backend := self._pool.acquire()) is None:
+            return
+        headers = {"If-None-Match": self._etag} if self._etag else {}
+        try:
+            async with asyncio.timeout(10):
+                async with self._session.get(
+                    f"{backend.base_url}/api/list_speakers", headers=headers
+                ) as response:
+                    if response.status == 304:
+                        return
+                    if response.status != 200:
+                        _LOGGER.debug(
+                            "Failed to get speakers list from %s: status %s",
+                            backend.base_url,
+                            response.status,
+                        )
+                        return
+                    data = await response.json()
+                    etag = response.headers.get("ETag")
+        except (asyncio.TimeoutError, aiohttp.ClientError, ValueError) as err:
+            _LOGGER.debug("Error fetching speakers list: %s", err)
+            return
+
+        speakers = [s["name"] for s in data.get("speakers", [])] or None
+        if speakers != self.speakers:
+            _LOGGER.debug("Available speakers: %s", speakers)
+        self.speakers = speakers
+        self._etag = etag
+
+    @callback
+    def async_start(self) -> None:
+        """Fetch the speaker list in the background and refresh it periodically."""
+        self.hass.async_create_background_task(
+            self.async_refresh(), name=f"{DOMAIN} speakers"
+        )
+        self._unsub_refresh = async_track_time_interval(
+            self.hass, self.async_refresh, SPEAKERS_REFRESH_INTERVAL
+        )
+
+    @callback
+    def async_stop(self) -> None:
+        """Stop refreshing the speaker list."""
+        if self._unsub_refresh is not None:
+            self._unsub_refresh()
+            self._unsub_refresh = None
@@ -0,0 +1,88 @@
+"""Rolling client-side request statistics for Qwen3 TTS."""
+from __future__ import annotations
+
+from collections import deque
+from collections.abc import Callable
+
+from homeassistant.core import CALLBACK_TYPE, callback
+
+from .const import STATS_WINDOW
+
+
+def percentile(values: list[float], q: float) -> float | None:
+    """Return the q-th percentile (0-100) of values with linear interpolation."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * q / 100
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+class RequestStats:
+    """Keep timings of the most recent TTS requests in bounded ring buffers.
+
+    Timings are in seconds. Server time is the queue wait plus generation
+    time reported by the server in response headers, and network overhead is
+    the end-to-end latency minus that server time. For streamed responses
+    both are measured to the first audio chunk, when playback starts.
+    Counters are totals since the config entry was loaded.
+    """
+
+    def __init__(self, window: int = STATS_WINDOW) -> None:
+        """Initialize empty statistics."""
+        self.latency: deque[float] = deque(maxlen=window)
+        self.server_time: deque[float] = deque(maxlen=window)
+        self.network_overhead: deque[float] = deque(maxlen=window)
+        self.requests = 0
+        self.bytes_received = 0
+        self.timeouts = 0
+        self.errors = 0
+        self._listeners: list[Callable[[], None]] = []
+
+    @callback
+    def async_add_listener(self, update_callback: Callable[[], None]) -> CALLBACK_TYPE:
+        """Call update_callback whenever the statistics change."""
+        self._listeners.append(update_callback)
+
+        @callback
+        def remove_listener() -> None:
+            self._listeners.remove(update_callback)
+
+        return remove_listener
+
+    @callback
+    def async_record_success(
+        self, latency: float, server_time: float | None, size: int
+    ) -> None:
+        """Record a successful request.
+
+        server_time is None if the server did not report its timing.
+        """
+        self.requests += 1
+        self.bytes_received += size
+        self.latency.append(latency)
+        if server_time is not None:
+            self.server_time.append(server_time)
+            self.network_overhead.append(max(latency - server_time, 0.0))
+        self._async_notify()
+
+    @callback
+    def async_record_timeout(self) -> None:
+        """Record a request that timed out."""
+        self.requests += 1
+        self.timeouts += 1
+        self._async_notify()
+
+    @callback
+    def async_record_error(self) -> None:
+        """Record a request that failed with an error."""
+        self.requests += 1
+        self.errors += 1
+        self._async_notify()
+
+    @callback
+    def _async_notify(self) -> None:
+        for update_callback in list(self._listeners):
+            update_callback()
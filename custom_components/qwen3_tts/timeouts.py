@@ -0,0 +1,183 @@
+"""Request timeouts learned from the generation speed of each server and speaker."""
+from __future__ import annotations
+
+from dataclasses import dataclass
+import logging
+import math
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from .const import (
+    ADAPTIVE_ALPHA,
+    ADAPTIVE_MIN_SAMPLES,
+    ADAPTIVE_SAVE_DELAY,
+    DOMAIN,
+    MAX_TIMEOUT,
+    MIN_TIMEOUT,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+
+# Key for the estimate that pools every speaker of a server
+_ALL_SPEAKERS = ""
+
+# Below this coefficient of variation of the sampled text lengths the
+# intercept cannot be told apart from the per-character time
+_MIN_LENGTH_SPREAD = 0.1
+
+
+@dataclass
+class SpeedEstimate:
+    """Exponentially weighted linear fit of server time against text length.
+
+    Server time is modelled as a fixed per-request overhead (the intercept:
+    queue wait, model setup, the first decoded chunk) plus a time per
+    character, so short texts do not inflate the estimate for long ones.
+    variance is the weighted variance of the prediction errors.
+    """
+
+    samples: int = 0
+    mean_chars: float = 0.0
+    mean_time: float = 0.0
+    var_chars: float = 0.0
+    cov: float = 0.0
+    variance: float = 0.0
+
+    def add(self, chars: int, server_time: float) -> None:
+        """Fold one request into the estimate."""
+        if not self.samples:
+            self.mean_chars = chars
+            self.mean_time = server_time
+        else:
+            error = server_time - self.predict(chars)
+            self.variance = (1 - ADAPTIVE_ALPHA) * (
+                self.variance + ADAPTIVE_ALPHA * error * error
+            )
+            diff_chars = chars - self.mean_chars
+            diff_time = server_time - self.mean_time
+            self.mean_chars += ADAPTIVE_ALPHA * diff_chars
+            self.mean_time += ADAPTIVE_ALPHA * diff_time
+            self.var_chars = (1 - ADAPTIVE_ALPHA) * (
+                self.var_chars + ADAPTIVE_ALPHA * diff_chars * diff_chars
+            )
+            self.cov = (1 - ADAPTIVE_ALPHA) * (
+                self.cov + ADAPTIVE_ALPHA * diff_chars * diff_time
+            )
+        self.samples += 1
+
+    def coefficients(self) -> tuple[float, float]:
+        """Return the (overhead, seconds per character) of the fit.
+
+        Both are kept non-negative. If the sampled texts all had about the
+        same length, the time is attributed to the characters alone.
+        """
+        if self.mean_chars <= 0:
+            return self.mean_time, 0.0
+        rate = self.mean_time / self.mean_chars
+        if self.var_chars < (_MIN_LENGTH_SPREAD * self.mean_chars) ** 2:
+            return 0.0, rate
+        slope = self.cov / self.var_chars
+        intercept = self.mean_time - slope * self.mean_chars
+        if slope < 0:
+            return self.mean_time, 0.0
+        if intercept < 0:
+            return 0.0, rate
+        return intercept, slope
+
+    def predict(self, chars: int) -> float:
+        """Return the expected server time for chars characters."""
+        intercept, slope = self.coefficients()
+        return intercept + slope * chars
+
+    def upper(self, chars: int) -> float:
+        """Return a pessimistic server time for chars characters (fit + 3 sigma)."""
+        return self.predict(chars) + 3 * math.sqrt(self.variance)
+
+
+class TimeoutEstimator:
+    """Derive request timeouts from observed generation speed.
+
+    Every uncached response adds a sample for its server and speaker, and
+    for the server as a whole: the characters synthesized by the request
+    and the server time until its audio was complete (queue wait plus
+    generation). Timeouts use the most specific estimate that has
+    ADAPTIVE_MIN_SAMPLES samples, scaled by the configured safety margin
+    and clamped to MIN_TIMEOUT..MAX_TIMEOUT, so a hung fast server is
+    detected quickly while long texts on a slow server still get enough
+    time. Until then the caller's static formula is used. Estimates are
+    stored per config entry and survive Home Assistant restarts.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        """Initialize the estimator."""
+        self._store: Store[dict[str, Any]] = Store(
+            hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}.timeouts"
+        )
+        self._estimates: dict[str, dict[str, SpeedEstimate]] = {}
+
+    async def async_load(self) -> None:
+        """Load the estimates saved by a previous run."""
+        if not (data := await self._store.async_load()):
+            return
+        self._estimates = {
+            server: {
+                speaker: SpeedEstimate(*values) for speaker, values in speakers.items()
+            }
+            for server, speakers in data.get("servers", {}).items()
+        }
+
+    @callback
+    def async_record(
+        self, server: str, speaker: str, chars: int, server_time: float
+    ) -> None:
+        """Record how long a server took to synthesize a request of chars characters."""
+        if chars <= 0 or server_time <= 0:
+            return
+        speakers = self._estimates.setdefault(server, {})
+        for key in (speaker, _ALL_SPEAKERS):
+            speakers.setdefault(key, SpeedEstimate()).add(chars, server_time)
+        self._store.async_delay_save(self._data_to_save, ADAPTIVE_SAVE_DELAY)
+
+    def timeout(
+        self,
+        server: str | None,
+        speaker: str,
+        chars: int,
+        margin: float,
+        fallback: float,
+    ) -> float:
+        """Return the timeout for synthesizing chars characters.
+
+        Returns fallback if neither the speaker nor the server has enough
+        samples yet.
+        """
+        speakers = self._estimates.get(server or "", {})
+        for key in (speaker, _ALL_SPEAKERS):
+            estimate = speakers.get(key)
+            if estimate is not None and estimate.samples >= ADAPTIVE_MIN_SAMPLES:
+                return min(max(margin * estimate.upper(chars), MIN_TIMEOUT), MAX_TIMEOUT)
+        return fallback
+
+    @callback
+    def _data_to_save(self) -> dict[str, Any]:
+        """Return the estimates in storable form."""
+        return {
+            "servers": {
+                server: {
+                    speaker: [
+                        estimate.samples,
+                        estimate.mean_chars,
+                        estimate.mean_time,
+                        estimate.var_chars,
+                        estimate.cov,
+                        estimate.variance,
+                    ]
+                    for speaker, estimate in speakers.items()
+                }
+                for server, speakers in self._estimates.items()
+            }
+        }
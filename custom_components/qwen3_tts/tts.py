@@ -1,7 +1,12 @@
 """Support for Qwen3 TTS speech service."""
 from __future__ import annotations
 
+from collections.abc import AsyncGenerator
+import contextlib
+import json
 import logging
+import struct
+import time
 from typing import Any
 import asyncio
 
@@ -12,40 +17,175 @@ from homeassistant.components.tts import (
     PLATFORM_SCHEMA,
     Provider,
     TextToSpeechEntity,
+    TTSAudioRequest,
+    TTSAudioResponse,
     TtsAudioType,
 )
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import CONF_HOST, CONF_PORT
 from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import HomeAssistantError
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.device_registry import DeviceInfo
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.core import callback
 import homeassistant.helpers.config_validation as cv
 
 from .const import (
     DOMAIN,
+    BULK_MIN_CHARS,
+    CONF_FORMAT,
+    CONF_LOUDNESS,
+    CONF_PARALLELISM,
+    CONF_PRIORITY,
+    CONF_SAMPLE_RATE,
     CONF_SPEED,
     CONF_SPEAKER,
     CONF_TIMEOUT,
+    CONF_TIMEOUT_MARGIN,
+    CONF_TRIM_SILENCE,
+    DEFAULT_FORMAT,
+    DEFAULT_PARALLELISM,
     DEFAULT_SPEED,
+    DEFAULT_TIMEOUT_MARGIN,
+    FORMAT_EXTENSIONS,
+    JOINABLE_FORMATS,
     DEFAULT_TIMEOUT,
+    SEGMENT_MAX_CHARS,
+    SEGMENT_RETRIES,
     SUPPORT_LANGUAGES,
     MIN_SPEED,
     MAX_SPEED,
     MAX_TIMEOUT,
+    MIN_LOUDNESS,
+    MAX_LOUDNESS,
+    OPUS_SAMPLE_RATES,
+    SUPPORT_SAMPLE_RATES,
+    PRIORITIES,
+    PRIORITY_BULK,
+    PRIORITY_INTERACTIVE,
 )
+from .pool import Backend, ServerPool
+from .segment import split_text
+from .speakers import SpeakerDirectory
+from .stats import RequestStats
+from .timeouts import TimeoutEstimator
 
 _LOGGER = logging.getLogger(__name__)
 
 
+class _SegmentFailed(Exception):
+    """A message segment could not be synthesized."""
+
+
+async def _async_yield(data: bytes) -> AsyncGenerator[bytes]:
+    """Wrap already received audio in an async generator."""
+    yield data
+
+
+def concat_wav(parts: list[bytes]) -> bytes:
+    """Join WAV files with identical formats into a single WAV file."""
+    fmt_chunk: bytes | None = None
+    pcm: list[bytes] = []
+    for part in parts:
+        if part[:4] != b"RIFF" or part[8:12] != b"WAVE":
+            raise ValueError("not a WAV file")
+        part_fmt, data = _parse_wav(part)
+        if fmt_chunk is None:
+            fmt_chunk = part_fmt
+        elif part_fmt != fmt_chunk:
+            raise ValueError("segments have different audio formats")
+        pcm.append(data)
+
+    if fmt_chunk is None:
+        raise ValueError("no audio segments")
+
+    data = b"".join(pcm)
+    format_tag = struct.unpack_from("<H", fmt_chunk)[0]
+    block_align = struct.unpack_from("<H", fmt_chunk, 12)[0]
+    fact = b""
+    if format_tag != 1:
+        # Non-PCM formats (IEEE float) carry a fact chunk with the sample count
+        fact = struct.pack("<4sII", b"fact", 4, len(data) // block_align)
+    body = (
+        b"WAVE"
+        + struct.pack("<4sI", b"fmt ", len(fmt_chunk)) + fmt_chunk
+        + fact
+        + struct.pack("<4sI", b"data", len(data)) + data
+    )
+    return struct.pack("<4sI", b"RIFF", len(body)) + body
+
+
+def _parse_wav(wav: bytes) -> tuple[bytes, bytes]:
+    """Return the fmt chunk body and the sample data of a WAV file."""
+    fmt_chunk: bytes | None = None
+    pos = 12
+    while pos + 8 <= len(wav):
+        chunk_id, size = struct.unpack_from("<4sI", wav, pos)
+        pos += 8
+        if chunk_id == b"fmt ":
+            fmt_chunk = wav[pos:pos + size]
+        elif chunk_id == b"data":
+            if fmt_chunk is None:
+                raise ValueError("WAV data before fmt chunk")
+            # Streaming WAVs use 0xFFFFFFFF as size; the slice clamps it
+            return fmt_chunk, wav[pos:pos + size]
+        pos += size + (size & 1)
+    raise ValueError("WAV file has no data chunk")
+
+
+def _server_time(headers: Any) -> float | None:
+    """Return the queue wait plus generation time reported by the server."""
+    if (generation_time := headers.get("X-Generation-Time")) is None:
+        return None
+    try:
+        return float(generation_time) + float(headers.get("X-Queue-Time", 0))
+    except ValueError:
+        return None
+
+
+def _stream_server_time(headers: Any) -> float | None:
+    """Return the server's time to the first chunk of a streamed response.
+
+    Streamed responses send their headers before generation finishes, so
+    they report the queue wait plus the time to the first audio chunk
+    instead of the total generation time. Cache hits are sent whole and
+    report the regular timing headers.
+    """
+    if (first_chunk_time := headers.get("X-First-Chunk-Time")) is None:
+        return _server_time(headers)
+    try:
+        return float(first_chunk_time)
+    except ValueError:
+        return None
+
+
+def _deadline_headers(remaining: float) -> dict[str, str]:
+    """Return the header telling the server when the client stops waiting.
+
+    The server drops queued work and aborts generation past this absolute
+    time, so the clocks of Home Assistant and the server should be in sync.
+    """
+    return {"X-Deadline": f"{time.time() + remaining:.3f}"}
+
+
+def _endpoint(backend: Backend, path: str) -> str:
+    """Return the URL of an API path in the backend's protocol version."""
+    version = "/v2" if backend.api_version >= 2 else ""
+    return f"{backend.base_url}/api{version}{path}"
+
+
 async def async_setup_entry(
     hass: HomeAssistant,
     config_entry: ConfigEntry,
     async_add_entities: AddEntitiesCallback,
 ) -> None:
     """Set up Qwen3 TTS speech platform via config entry."""
-    base_url = hass.data[DOMAIN][config_entry.entry_id]["base_url"]
+    pool = hass.data[DOMAIN][config_entry.entry_id]["pool"]
     session = hass.data[DOMAIN][config_entry.entry_id]["session"]
+    stats = hass.data[DOMAIN][config_entry.entry_id]["stats"]
+    speakers = hass.data[DOMAIN][config_entry.entry_id]["speakers"]
+    timeouts = hass.data[DOMAIN][config_entry.entry_id]["timeouts"]
 
     # Get defaults from config entry
     default_speed = config_entry.data.get(CONF_SPEED, DEFAULT_SPEED)
@@ -53,7 +193,20 @@ async def async_setup_entry(
     base_timeout = config_entry.data.get(CONF_TIMEOUT, DEFAULT_TIMEOUT)
 
     async_add_entities(
-        [Qwen3TTSEntity(hass, base_url, session, default_speed, default_speaker, base_timeout, config_entry)]
+        [
+            Qwen3TTSEntity(
+                hass,
+                pool,
+                session,
+                stats,
+                speakers,
+                default_speed,
+                default_speaker,
+                base_timeout,
+                config_entry,
+                timeouts,
+            )
+        ]
     )
 
 
@@ -63,24 +216,35 @@ class Qwen3TTSEntity(TextToSpeechEntity):
     def __init__(
         self,
         hass: HomeAssistant,
-        base_url: str,
+        pool: ServerPool,
         session: aiohttp.ClientSession,
+        stats: RequestStats,
+        speakers: SpeakerDirectory,
         default_speed: float,
         default_speaker: str,
         base_timeout: int,
         config_entry: ConfigEntry,
+        timeouts: TimeoutEstimator | None = None,
     ) -> None:
         """Initialize Qwen3 TTS provider."""
         self.hass = hass
-        self._base_url = base_url
+        self._pool = pool
         self._session = session
+        self._stats = stats
+        self._speakers = speakers
         self._default_speed = default_speed
         self._default_speaker = default_speaker
         self._base_timeout = base_timeout
         self._config_entry = config_entry
+        self._timeouts = timeouts
         self._attr_name = "Qwen3 TTS"
         self._attr_unique_id = f"{DOMAIN}_{config_entry.entry_id}"
-        self._supported_voices_cache: dict[str, list[str] | None] = {}
+        self._attr_device_info = DeviceInfo(
+            identifiers={(DOMAIN, config_entry.entry_id)},
+            name=config_entry.title,
+            manufacturer="Qwen",
+            model="Qwen3-TTS",
+        )
 
     @property
     def default_language(self) -> str:
@@ -95,7 +259,14 @@ class Qwen3TTSEntity(TextToSpeechEntity):
     @property
     def supported_options(self) -> list[str]:
         """Return list of supported options."""
-        return [CONF_SPEED, CONF_SPEAKER]
+        return [
+            CONF_SPEED,
+            CONF_SPEAKER,
+            CONF_PRIORITY,
+            CONF_SAMPLE_RATE,
+            CONF_TRIM_SILENCE,
+            CONF_LOUDNESS,
+        ]
 
     @property
     def default_options(self) -> dict[str, Any]:
@@ -105,9 +276,19 @@ class Qwen3TTSEntity(TextToSpeechEntity):
             options[CONF_SPEAKER] = self._default_speaker
         return options
 
-    def _calculate_timeout(self, text_length: int) -> float:
+    def _calculate_timeout(
+        self,
+        text_length: int,
+        backend: Backend | None = None,
+        speaker: str = "",
+    ) -> float:
         """Calculate dynamic timeout based on text length.
 
+        Once enough responses from the backend have been observed, the
+        timeout is learned from its generation speed for the speaker (see
+        TimeoutEstimator) times the configured safety margin. Until then,
+        or without a backend, the static formula below is used.
+
         Uses configurable base timeout + additional time per character.
 
         Formula: timeout = base_timeout + (text_length × 0.1 seconds)
@@ -135,22 +316,41 @@ class Qwen3TTSEntity(TextToSpeechEntity):
             int(timeout)
         )
 
-        return timeout
+        if backend is None or self._timeouts is None:
+            return timeout
+        margin = self._config_entry.data.get(CONF_TIMEOUT_MARGIN, DEFAULT_TIMEOUT_MARGIN)
+        learned = self._timeouts.timeout(
+            backend.base_url, speaker, text_length, margin, timeout
+        )
+        if learned != timeout:
+            _LOGGER.debug(
+                "Learned timeout for %s (%s, %d chars, margin %.1f): %.1fs",
+                backend.base_url,
+                speaker,
+                text_length,
+                margin,
+                learned,
+            )
+        return learned
 
-    async def async_get_tts_audio(
-        self, message: str, language: str, options: dict[str, Any]
-    ) -> TtsAudioType:
-        """Load TTS from Qwen3 TTS server."""
+    @callback
+    def _record_speed(
+        self, backend: Backend, speaker: str, chars: int, server_time: float | None
+    ) -> None:
+        """Feed the server time of an uncached request into the timeout estimates.
+
+        server_time is the queue wait plus generation time of the whole
+        request, from the server receiving it until its audio was complete.
+        """
+        if self._timeouts is not None and server_time:
+            self._timeouts.async_record(backend.base_url, speaker, chars, server_time)
+
+    def _resolve_options(self, options: dict[str, Any]) -> tuple[float, str]:
+        """Return the (speed, speaker) to use for a request."""
         speed = options.get(CONF_SPEED, self._default_speed)
         # Use speaker from options, fall back to default speaker, or use Vivian as final fallback
         speaker = options.get(CONF_SPEAKER) or self._default_speaker or "Vivian"
 
-
-        # Update supported voices cache if not already cached for this language
-        if language not in self._supported_voices_cache:
-            speakers = await self.async_get_speakers()
-            self._supported_voices_cache[language] = speakers
-            _LOGGER.debug("Cached voices for language %s: %s", language, speakers)
         # Validate speed
         if not MIN_SPEED <= speed <= MAX_SPEED:
             _LOGGER.warning(
@@ -162,94 +362,708 @@ class Qwen3TTSEntity(TextToSpeechEntity):
             )
             speed = self._default_speed
 
-        # Calculate dynamic timeout based on text length
-        text_length = len(message)
-        timeout_seconds = self._calculate_timeout(text_length)
+        return speed, speaker
+
+    def _resolve_priority(self, message: str, options: dict[str, Any]) -> str:
+        """Return the server scheduling priority for a message.
+
+        The priority option wins; otherwise long messages (briefings,
+        announcements) are bulk so they do not delay Assist replies.
+        """
+        priority = options.get(CONF_PRIORITY)
+        if priority in PRIORITIES:
+            return priority
+        if priority is not None:
+            _LOGGER.warning("Unknown priority %s, choosing by message length", priority)
+        return PRIORITY_BULK if len(message) > BULK_MIN_CHARS else PRIORITY_INTERACTIVE
+
+    def _resolve_post_process(
+        self, options: dict[str, Any], audio_format: str
+    ) -> dict[str, Any]:
+        """Return the server-side post-processing parameters for a request.
+
+        The server trims silence, normalizes loudness and resamples the
+        audio before encoding it, and caches the result under those
+        parameters. Invalid values are logged and dropped.
+        """
+        post: dict[str, Any] = {}
+        if (sample_rate := options.get(CONF_SAMPLE_RATE)) is not None:
+            if sample_rate not in SUPPORT_SAMPLE_RATES:
+                _LOGGER.warning("Unsupported sample rate %s, ignoring", sample_rate)
+            elif audio_format == "opus" and sample_rate not in OPUS_SAMPLE_RATES:
+                _LOGGER.warning("Opus does not support %d Hz, ignoring", sample_rate)
+            else:
+                post[CONF_SAMPLE_RATE] = sample_rate
+        if options.get(CONF_TRIM_SILENCE):
+            post[CONF_TRIM_SILENCE] = True
+        if (loudness := options.get(CONF_LOUDNESS)) is not None:
+            if MIN_LOUDNESS <= loudness <= MAX_LOUDNESS:
+                post[CONF_LOUDNESS] = loudness
+            else:
+                _LOGGER.warning(
+                    "Loudness %.1f LUFS is out of range (%.0f to %.0f), ignoring",
+                    loudness,
+                    MIN_LOUDNESS,
+                    MAX_LOUDNESS,
+                )
+        return post
+
+    def _post(
+        self, backend: Backend, path: str, payload: dict[str, Any], remaining: float
+    ) -> Any:
+        """POST a request using the protocol version the backend advertises.
+
+        v2 servers take the parameters as a JSON body, which keeps message
+        text out of URLs and access logs; older servers take query parameters.
+        Either way the server learns the deadline, remaining seconds from now.
+        """
+        headers = _deadline_headers(remaining)
+        if backend.api_version >= 2:
+            return self._session.post(
+                _endpoint(backend, path), json=payload, headers=headers
+            )
+        params = {
+            key: str(value).lower() if isinstance(value, bool) else value
+            for key, value in payload.items()
+        }
+        return self._session.post(
+            _endpoint(backend, path), params=params, headers=headers
+        )
+
+    async def async_get_tts_audio(
+        self, message: str, language: str, options: dict[str, Any]
+    ) -> TtsAudioType:
+        """Load TTS from Qwen3 TTS server."""
+        speed, speaker = self._resolve_options(options)
+        priority = self._resolve_priority(message, options)
+        audio_format = self._config_entry.data.get(CONF_FORMAT, DEFAULT_FORMAT)
+
+        segments = split_text(message, SEGMENT_MAX_CHARS)
+        if not segments:
+            _LOGGER.error("Nothing to synthesize in empty TTS message")
+            return None, None
+        if len(segments) == 1:
+            post = self._resolve_post_process(options, audio_format)
+            data = await self._async_fetch_segment(
+                segments[0], speed, speaker, audio_format, priority=priority, post=post
+            )
+            return (FORMAT_EXTENSIONS[audio_format], data) if data else (None, None)
+
+        # Segments are joined by concatenation, which FLAC does not support
+        if audio_format not in JOINABLE_FORMATS:
+            audio_format = DEFAULT_FORMAT
+        post = self._resolve_post_process(options, audio_format)
+
+        # Long message: synthesize segments concurrently, at most `parallelism`
+        # in flight, so the next segment is already queued on the server while
+        # the current one generates.
+        parallelism = self._config_entry.data.get(CONF_PARALLELISM, DEFAULT_PARALLELISM)
+        semaphore = asyncio.Semaphore(parallelism)
+        _LOGGER.debug(
+            "Split %d chars into %d segments (parallelism: %d)",
+            len(message),
+            len(segments),
+            parallelism,
+        )
+
+        # Servers speaking v2 synthesize every segment in one batch request;
+        # segments it could not deliver are fetched on their own below,
+        # within what is left of the batch's deadline.
+        parts: list[bytes | None] = [None] * len(segments)
+        deadline: float | None = None
+        if (backend := self._pool.acquire()) is not None and backend.api_version >= 2:
+            deadline = asyncio.get_running_loop().time() + self._calculate_timeout(
+                sum(map(len, segments)), backend, speaker
+            )
+            parts = await self._async_fetch_batch(
+                backend, segments, speed, speaker, audio_format, priority, deadline, post
+            )
 
+        async def fetch(index: int, segment: str) -> bytes:
+            if (data := parts[index]) is not None:
+                return data
+            async with semaphore:
+                data = await self._async_fetch_segment(
+                    segment,
+                    speed,
+                    speaker,
+                    audio_format,
+                    f"{index + 1}/{len(segments)}",
+                    priority,
+                    post,
+                    deadline,
+                )
+            if data is None:
+                raise _SegmentFailed
+            return data
+
+        tasks = [
+            asyncio.create_task(fetch(index, segment))
+            for index, segment in enumerate(segments)
+        ]
         try:
-            # Always use the same endpoint with language and speaker parameters
-            url = f"{self._base_url}/api/tts"
-            params = {
-                "text": message,
-                "speed": speed,
-                "language": "Chinese",
-                "speaker": speaker
-            }
+            joined = await asyncio.gather(*tasks)
+        except _SegmentFailed:
+            return None, None
+        finally:
+            for task in tasks:
+                task.cancel()
+
+        try:
+            if audio_format == "wav":
+                data = concat_wav(joined)
+            else:
+                # MP3 frames and chained Ogg streams can be concatenated as-is
+                data = b"".join(joined)
+        except ValueError as err:
+            _LOGGER.error("Cannot join TTS audio segments: %s", err)
+            return None, None
+
+        _LOGGER.debug(
+            "Joined %d TTS audio segments (%d bytes)", len(joined), len(data)
+        )
+        return FORMAT_EXTENSIONS[audio_format], data
+
+    async def _async_fetch_batch(
+        self,
+        backend: Backend,
+        segments: list[str],
+        speed: float,
+        speaker: str,
+        audio_format: str,
+        priority: str,
+        deadline: float,
+        post: dict[str, Any] | None = None,
+    ) -> list[bytes | None]:
+        """Synthesize all segments of a message in one v2 batch request.
+
+        The server streams each segment back as a length-prefixed frame
+        ([header size][audio size][JSON header][audio]) as soon as it is
+        done. Segments that failed or never arrived by deadline (event
+        loop time) are returned as None so the caller can retry them
+        individually.
+        """
+        parts: list[bytes | None] = [None] * len(segments)
+        payload = {
+            "items": [
+                {
+                    "text": segment,
+                    "speed": speed,
+                    "language": "Chinese",
+                    "speaker": speaker,
+                    "format": audio_format,
+                    "priority": priority,
+                    **(post or {}),
+                }
+                for segment in segments
+            ]
+        }
+        loop = asyncio.get_running_loop()
+        timeout_seconds = deadline - loop.time()
+        url = f"{backend.base_url}/api/v2/tts/batch"
+        _LOGGER.debug(
+            "Requesting %d TTS segments in one batch from %s (timeout: %.1fs)",
+            len(segments),
+            backend.base_url,
+            timeout_seconds,
+        )
+        received = 0
+        # Characters generated by the server, and its time until the last of them
+        generated_chars = 0
+        server_time = 0.0
+        started = loop.time()
+        try:
+            with self._pool.track(backend):
+                async with asyncio.timeout_at(deadline):
+                    async with self._session.post(
+                        url, json=payload, headers=_deadline_headers(timeout_seconds)
+                    ) as response:
+                        if response.status == 504:
+                            # The server gave up at our deadline
+                            raise asyncio.TimeoutError
+                        if response.status != 200:
+                            _LOGGER.warning(
+                                "Batch TTS request to %s failed with status %s: %s",
+                                backend.base_url,
+                                response.status,
+                                await response.text(),
+                            )
+                            if response.status == 404:
+                                # Not a v2 server after all: not an error
+                                backend.api_version = 1
+                                return parts
+                            self._stats.async_record_error()
+                            # 503 means the server is busy, not unhealthy
+                            if response.status >= 500 and response.status != 503:
+                                self._pool.mark_failure(
+                                    backend, f"status {response.status}"
+                                )
+                            return parts
+                        while True:
+                            try:
+                                prefix = await response.content.readexactly(8)
+                            except asyncio.IncompleteReadError:
+                                break
+                            header_size, size = struct.unpack(">II", prefix)
+                            header = json.loads(
+                                await response.content.readexactly(header_size)
+                            )
+                            data = await response.content.readexactly(size)
+                            if header.get("status") != 200 or not data:
+                                _LOGGER.warning(
+                                    "Batch TTS segment %s/%d failed: %s",
+                                    header.get("index", -1) + 1,
+                                    len(segments),
+                                    header.get("error", "empty response"),
+                                )
+                                continue
+                            parts[header["index"]] = data
+                            received += len(data)
+                            if header.get("cache") == "MISS":
+                                generated_chars += len(segments[header["index"]])
+                                server_time = max(
+                                    server_time,
+                                    header.get("elapsed")
+                                    or header.get("generation_time", 0.0),
+                                )
+        except asyncio.TimeoutError:
+            _LOGGER.warning(
+                "Timeout waiting for batch TTS response from %s (%.1fs)",
+                backend.base_url,
+                timeout_seconds,
+            )
+            self._pool.mark_failure(backend, "timeout")
+            self._stats.async_record_timeout()
+        except (aiohttp.ClientError, asyncio.IncompleteReadError, ValueError) as err:
+            _LOGGER.warning(
+                "Error reading batch TTS response from %s: %s", backend.base_url, err
+            )
+            self._pool.mark_failure(backend, str(err) or type(err).__name__)
+            self._stats.async_record_error()
+
+        if received:
+            self._stats.async_record_success(loop.time() - started, None, received)
+        if generated_chars:
+            # The batch is one request: its overhead is paid once for all segments
+            self._record_speed(backend, speaker, generated_chars, server_time)
+        if all(part is not None for part in parts):
+            self._pool.mark_success(backend)
+        return parts
+
+    async def _async_fetch_segment(
+        self,
+        text: str,
+        speed: float,
+        speaker: str,
+        audio_format: str = DEFAULT_FORMAT,
+        label: str = "1/1",
+        priority: str = PRIORITY_INTERACTIVE,
+        post: dict[str, Any] | None = None,
+        deadline: float | None = None,
+    ) -> bytes | None:
+        """Synthesize one segment, retrying it on its own if it fails.
+
+        Each attempt goes to the least loaded healthy server, preferring one
+        that has not failed this segment yet. All attempts share one deadline
+        (event loop time): the given one, or else one derived from the
+        segment length and the first server's observed generation speed.
+        """
+        params = {
+            "text": text,
+            "speed": speed,
+            "language": "Chinese",
+            "speaker": speaker,
+            "format": audio_format,
+            "priority": priority,
+            **(post or {}),
+        }
+        # Calculate dynamic timeout based on segment length
+        text_length = len(text)
+        attempts = SEGMENT_RETRIES + len(self._pool.backends)
+        tried: set[str] = set()
+        loop = asyncio.get_running_loop()
+        timeout_seconds = 0.0 if deadline is None else deadline - loop.time()
+        if timeout_seconds < 0:
+            _LOGGER.error("No time left to retry TTS segment %s", label)
+            self._stats.async_record_timeout()
+            return None
+
+        for attempt in range(attempts):
+            backend = self._pool.acquire(exclude=tried)
+            if backend is None:
+                _LOGGER.error(
+                    "No healthy Qwen3 TTS server available for segment %s", label
+                )
+                return None
+            tried.add(backend.base_url)
+            if deadline is None:
+                timeout_seconds = self._calculate_timeout(text_length, backend, speaker)
+                deadline = loop.time() + timeout_seconds
+            url = _endpoint(backend, "/tts")
             _LOGGER.debug(
-                "Requesting TTS: %s (speaker: %s, speed: %.2f, timeout: %.1fs for %d chars, base: %ds)",
-                message[:50],
+                "Requesting TTS segment %s from %s: %s (speaker: %s, speed: %.2f, timeout: %.1fs for %d chars, attempt %d)",
+                label,
+                backend.base_url,
+                text[:50],
                 speaker,
                 speed,
                 timeout_seconds,
                 text_length,
-                self._base_timeout,
+                attempt + 1,
             )
+            started = loop.time()
+            try:
+                with self._pool.track(backend):
+                    async with asyncio.timeout_at(deadline):
+                        async with self._post(
+                            backend, "/tts", params, deadline - loop.time()
+                        ) as response:
+                            if response.status == 404 and backend.api_version >= 2:
+                                # Server was downgraded: fall back to query parameters
+                                backend.api_version = 1
+                                tried.discard(backend.base_url)
+                                continue
+                            if response.status == 504:
+                                # The server gave up at our deadline
+                                raise asyncio.TimeoutError
+                            if response.status != 200:
+                                self._stats.async_record_error()
+                                error_text = await response.text()
+                                _LOGGER.warning(
+                                    "TTS request for segment %s failed with status %s: %s",
+                                    label,
+                                    response.status,
+                                    error_text,
+                                )
+                                if response.status < 500:
+                                    return None
+                                # 503 means the server is busy, not unhealthy
+                                if response.status != 503:
+                                    self._pool.mark_failure(
+                                        backend, f"status {response.status}"
+                                    )
+                                continue
 
-            # Use dynamic timeout based on text length
-            async with asyncio.timeout(timeout_seconds):
-                async with self._session.post(url, params=params) as response:
-                    if response.status != 200:
-                        error_text = await response.text()
-                        _LOGGER.error(
-                            "TTS request failed with status %s: %s",
-                            response.status,
-                            error_text,
-                        )
-                        return None, None
+                            data = await response.read()
 
-                    data = await response.read()
+                            if not data:
+                                _LOGGER.warning(
+                                    "Received empty audio data for segment %s", label
+                                )
+                                self._stats.async_record_error()
+                                self._pool.mark_failure(backend, "empty response")
+                                continue
 
-                    if not data:
-                        _LOGGER.error("Received empty audio data from TTS server")
-                        return None, None
+                            self._pool.mark_success(backend)
+                            server_time = _server_time(response.headers)
+                            self._stats.async_record_success(
+                                loop.time() - started, server_time, len(data)
+                            )
+                            if response.headers.get("X-Cache") == "MISS":
+                                self._record_speed(
+                                    backend, speaker, text_length, server_time
+                                )
+                            _LOGGER.debug(
+                                "Successfully received TTS audio for segment %s "
+                                "(%d bytes %s, encode time: %ss)",
+                                label,
+                                len(data),
+                                response.headers.get("X-Audio-Format", audio_format),
+                                response.headers.get("X-Encode-Time", "?"),
+                            )
+                            return data
 
-                    _LOGGER.debug(
-                        "Successfully received TTS audio (%d bytes)", len(data)
-                    )
-                    return "wav", data
+            except asyncio.TimeoutError:
+                _LOGGER.error(
+                    "Timeout waiting for TTS segment %s from %s (%.1fs timeout for %d chars, base: %ds)",
+                    label,
+                    url,
+                    timeout_seconds,
+                    text_length,
+                    self._base_timeout,
+                )
+                self._pool.mark_failure(backend, "timeout")
+                self._stats.async_record_timeout()
+                return None
+            except aiohttp.ClientError as err:
+                _LOGGER.warning(
+                    "Error communicating with TTS server %s for segment %s: %s",
+                    backend.base_url,
+                    label,
+                    err,
+                )
+                self._pool.mark_failure(backend, str(err))
+                self._stats.async_record_error()
+            except Exception as err:
+                _LOGGER.exception("Unexpected error during TTS request: %s", err)
+                self._stats.async_record_error()
+                return None
 
-        except asyncio.TimeoutError:
-            _LOGGER.error(
-                "Timeout waiting for TTS response from %s (%.1fs timeout for %d chars, base: %ds)",
-                url,
-                timeout_seconds,
-                text_length,
-                self._base_timeout,
+        _LOGGER.error("TTS segment %s failed after %d attempts", label, attempts)
+        return None
+
+    async def async_stream_tts_audio(
+        self, request: TTSAudioRequest
+    ) -> TTSAudioResponse:
+        """Stream TTS audio from Qwen3 TTS server as it is generated.
+
+        Playback can start as soon as the server has decoded the first
+        chunk instead of waiting for the whole message to be synthesized.
+        Long messages are split into segments like in async_get_tts_audio.
+        """
+        message = "".join([chunk async for chunk in request.message_gen])
+        audio_format = self._config_entry.data.get(CONF_FORMAT, DEFAULT_FORMAT)
+        if audio_format != "wav" or self._resolve_post_process(
+            request.options, audio_format
+        ):
+            # Only unprocessed WAV can be streamed; compressed formats and
+            # post-processed audio are fetched whole
+            extension, data = await self.async_get_tts_audio(
+                message, request.language, request.options
             )
-            return None, None
-        except aiohttp.ClientError as err:
-            _LOGGER.error("Error communicating with TTS server: %s", err)
-            return None, None
-        except Exception as err:
-            _LOGGER.exception("Unexpected error during TTS request: %s", err)
-            return None, None
+            if data is None:
+                raise HomeAssistantError("TTS request failed, see log for details")
+            return TTSAudioResponse(extension=extension, data_gen=_async_yield(data))
+
+        speed, speaker = self._resolve_options(request.options)
+        priority = self._resolve_priority(message, request.options)
+        if not (segments := split_text(message, SEGMENT_MAX_CHARS)):
+            raise HomeAssistantError("Nothing to synthesize in empty TTS message")
+        return TTSAudioResponse(
+            extension="wav",
+            data_gen=self._async_stream_segments(segments, speed, speaker, priority),
+        )
+
+    async def _async_stream_segments(
+        self,
+        segments: list[str],
+        speed: float,
+        speaker: str,
+        priority: str = PRIORITY_INTERACTIVE,
+    ) -> AsyncGenerator[bytes]:
+        """Stream a message as one WAV file, segment by segment.
+
+        The first segment is streamed, so playback starts as soon as the
+        server has decoded its first chunk. Meanwhile the other segments are
+        synthesized like in async_get_tts_audio: at most `parallelism`
+        requests in flight, each segment retried on its own. Their samples
+        are appended to the stream in order.
+        """
+        if len(segments) == 1:
+            async for chunk in self._async_stream_audio(
+                segments[0], speed, speaker, priority
+            ):
+                yield chunk
+            return
+
+        parallelism = self._config_entry.data.get(CONF_PARALLELISM, DEFAULT_PARALLELISM)
+        semaphore = asyncio.Semaphore(parallelism)
+        _LOGGER.debug(
+            "Streaming %d segments (parallelism: %d)", len(segments), parallelism
+        )
+
+        async def fetch(index: int, segment: str) -> bytes:
+            async with semaphore:
+                data = await self._async_fetch_segment(
+                    segment,
+                    speed,
+                    speaker,
+                    "wav",
+                    f"{index + 1}/{len(segments)}",
+                    priority,
+                )
+            if data is None:
+                raise _SegmentFailed
+            return data
 
-    async def async_get_speakers(self) -> list[str] | None:
-        """Return a list of available speakers."""
+        # The streamed segment takes the first slot of the semaphore, so the
+        # tasks below only use the remaining ones
+        await semaphore.acquire()
+        tasks = [
+            asyncio.create_task(fetch(index, segment))
+            for index, segment in enumerate(segments[1:], 1)
+        ]
         try:
-            url = f"{self._base_url}/api/list_speakers"
-            async with asyncio.timeout(30):
-                async with self._session.get(url) as response:
-                    if response.status != 200:
-                        _LOGGER.warning(
-                            "Failed to get speakers list: status %s", response.status
+            fmt_chunk: bytes | None = None
+            head = b""
+            try:
+                async for chunk in self._async_stream_audio(
+                    segments[0], speed, speaker, priority
+                ):
+                    if fmt_chunk is None:
+                        # Hold back audio until the WAV header is complete, so
+                        # the other segments can be checked against its format
+                        head += chunk
+                        try:
+                            fmt_chunk, _ = _parse_wav(head)
+                        except ValueError:
+                            continue
+                        chunk = head
+                    yield chunk
+            finally:
+                semaphore.release()
+            if fmt_chunk is None:
+                raise HomeAssistantError("TTS stream did not contain WAV audio")
+
+            for task in tasks:
+                part_fmt, data = _parse_wav(await task)
+                if part_fmt != fmt_chunk:
+                    raise HomeAssistantError(
+                        "Cannot join TTS audio segments: different audio formats"
+                    )
+                yield data
+        except _SegmentFailed as err:
+            raise HomeAssistantError("TTS request failed, see log for details") from err
+        except ValueError as err:
+            raise HomeAssistantError(f"Cannot join TTS audio segments: {err}") from err
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _async_stream_audio(
+        self,
+        message: str,
+        speed: float,
+        speaker: str,
+        priority: str = PRIORITY_INTERACTIVE,
+    ) -> AsyncGenerator[bytes]:
+        """Yield WAV audio chunks from the server's streaming endpoint.
+
+        If a server fails before sending any audio, the request moves on to
+        the next least loaded healthy server within the same deadline, which
+        is learned from the first server's observed generation speed. The
+        deadline covers the connection and the first chunk only: the rest is
+        read as fast as the consumer plays it, so later reads are each given
+        the same budget as a stall limit instead.
+        """
+        params = {
+            "text": message,
+            "speed": speed,
+            "language": "Chinese",
+            "speaker": speaker,
+            "priority": priority,
+        }
+        timeout_seconds = self._calculate_timeout(len(message))
+        _LOGGER.debug(
+            "Requesting streaming TTS: %s (speaker: %s, speed: %.2f, timeout: %.1fs)",
+            message[:50],
+            speaker,
+            speed,
+            timeout_seconds,
+        )
+
+        chunk: bytes | None = None
+        stream: contextlib.AsyncExitStack | None = None
+        server_time: float | None = None
+        cache_miss = False
+        tried: set[str] = set()
+        last_error = "no healthy Qwen3 TTS server available"
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        try:
+            async with asyncio.timeout(timeout_seconds) as timeout:
+                # Each server is tried once, plus once more if it turns out
+                # not to support v2 after all
+                for _ in range(2 * len(self._pool.backends)):
+                    backend = self._pool.acquire(exclude=tried)
+                    if backend is None or backend.base_url in tried:
+                        break
+                    if not tried:
+                        timeout_seconds = self._calculate_timeout(
+                            len(message), backend, speaker
                         )
-                        return None
+                        timeout.reschedule(started + timeout_seconds)
+                    tried.add(backend.base_url)
+                    async with contextlib.AsyncExitStack() as attempt:
+                        attempt.enter_context(self._pool.track(backend))
+                        try:
+                            response = await attempt.enter_async_context(
+                                self._post(
+                                    backend,
+                                    "/tts/stream",
+                                    params,
+                                    timeout.when() - loop.time(),
+                                )
+                            )
+                            if response.status == 404 and backend.api_version >= 2:
+                                backend.api_version = 1
+                                tried.discard(backend.base_url)
+                                continue
+                            if response.status != 200:
+                                error_text = await response.text()
+                                last_error = f"status {response.status}: {error_text}"
+                                if response.status < 500:
+                                    break
+                                if response.status != 503:
+                                    self._pool.mark_failure(backend, last_error)
+                                continue
+                            chunks = response.content.iter_any()
+                            chunk = await anext(chunks, None)
+                        except aiohttp.ClientError as err:
+                            self._pool.mark_failure(backend, str(err))
+                            last_error = f"{backend.base_url}: {err}"
+                            continue
+                        if chunk is None:
+                            self._pool.mark_success(backend)
+                            last_error = f"{backend.base_url}: empty audio stream"
+                            break
+                        server_time = _stream_server_time(response.headers)
+                        cache_miss = response.headers.get("X-Cache") == "MISS"
+                        # Keep the response open while the consumer reads it
+                        stream = attempt.pop_all()
+                        break
+        except asyncio.TimeoutError as err:
+            self._stats.async_record_timeout()
+            raise HomeAssistantError(
+                f"Timeout streaming TTS audio ({timeout_seconds:.1f}s)"
+            ) from err
 
-                    data = await response.json()
-                    speakers = [s["name"] for s in data.get("speakers", [])]
-                    _LOGGER.debug("Available speakers: %s", speakers)
-                    return speakers if speakers else None
+        if stream is None:
+            self._stats.async_record_error()
+            raise HomeAssistantError(f"TTS stream request failed: {last_error}")
 
-        except (asyncio.TimeoutError, aiohttp.ClientError) as err:
-            _LOGGER.warning("Error fetching speakers list: %s", err)
-            return None
+        # Playback starts on the first chunk, so that is the latency of a stream
+        first_byte = last_byte = loop.time() - started
+        received = 0
+        async with stream:
+            while chunk is not None:
+                received += len(chunk)
+                yield chunk
+                try:
+                    async with asyncio.timeout(timeout_seconds):
+                        chunk = await anext(chunks, None)
+                except asyncio.TimeoutError as err:
+                    self._stats.async_record_timeout()
+                    raise HomeAssistantError(
+                        f"TTS audio stream stalled for {timeout_seconds:.1f}s"
+                    ) from err
+                except aiohttp.ClientError as err:
+                    self._pool.mark_failure(backend, str(err))
+                    self._stats.async_record_error()
+                    raise HomeAssistantError(
+                        f"Error streaming TTS audio from server: {err}"
+                    ) from err
+                last_byte = loop.time() - started
+        self._pool.mark_success(backend)
+
+        self._stats.async_record_success(first_byte, server_time, received)
+        if cache_miss and server_time is not None:
+            # Chunks are sent as they are decoded, so the server finished
+            # generating about when the last one arrived (unless playback
+            # held the reads back, which only makes the estimate cautious)
+            self._record_speed(
+                backend,
+                speaker,
+                len(message),
+                server_time + last_byte - first_byte,
+            )
+        _LOGGER.debug("Finished streaming TTS audio (%d bytes)", received)
 
     @callback
     def async_get_supported_voices(self, language: str) -> list[str] | None:
-        """Return a list of supported voices for a language."""
-        # Return cached voices for this language
-        # If not cached yet, return None and cache will be populated on first TTS request
-        voices = self._supported_voices_cache.get(language)
-        _LOGGER.debug("Getting supported voices for %s: %s", language, voices)
-        return voices
+        """Return a list of supported voices for a language.
+
+        Every Qwen3 speaker supports every language. The list is the
+        background-refreshed snapshot, or None until it was first fetched.
+        """
+        return self._speakers.speakers
@@ -5,16 +5,35 @@ MLX-Audio FastAPI 服务器
 性能: 3-7 秒生成（vs Docker CPU 的 39-66 秒）
 """
 
-from fastapi import FastAPI, Query, HTTPException
-from fastapi.responses import FileResponse
+from fastapi import Depends, FastAPI, Header, Query, HTTPException, Request
+from pydantic import BaseModel, Field
+from fastapi.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
+import asyncio
+import bisect
+import contextlib
+import hashlib
+import io
+import itertools
+import json
 import logging
+import math
+import multiprocessing
+import os
+import queue
+import re
+import shutil
+import struct
+import sys
+import threading
+import unicodedata
+import uuid
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from functools import partial
 from pathlib import Path
-import mlx.core as mx
-from mlx_audio.tts import load
-import soundfile as sf
 import numpy as np
 import time
-from typing import Optional
+from typing import Any, AsyncIterator, Callable, Iterator, Literal, Optional
 
 # 配置日志
 logging.basicConfig(
@@ -30,144 +49,3362 @@ app = FastAPI(
 )
 
 # 全局变量
-model = None
-OUTPUT_DIR = Path("/tmp/qwen3-tts-outputs")
-OUTPUT_DIR.mkdir(exist_ok=True)
+CACHE_DIR = Path(os.environ.get(
+    "QWEN3_TTS_CACHE_DIR", str(Path.home() / ".cache" / "qwen3-tts")
+))
 
 # 支持的音色
 SUPPORTED_SPEAKERS = ["Vivian", "Chelsie", "Ethan"]
 
+# 自定义音色：注册时由参考音频计算一次说话人条件，保存到此目录，启动时以 mmap 方式加载；
+# 参考音频的时长范围（秒）与上传大小上限
+VOICES_DIR = Path(os.environ.get(
+    "QWEN3_TTS_VOICES_DIR", str(Path.home() / ".local" / "share" / "qwen3-tts" / "voices")
+))
+VOICE_MIN_SECONDS = 1.0
+VOICE_MAX_SECONDS = 30.0
+VOICE_MAX_BYTES = 20 * 1024 * 1024
+# 音色名称：字母、数字、汉字、下划线与连字符（同时用作目录名）
+VOICE_NAME_PATTERN = re.compile(r"^[\w-]{1,64}$")
+
+# 推理队列容量（每个优先级排队中的请求数上限，超出后返回 503）
+MAX_QUEUE_SIZE = int(os.environ.get("QWEN3_TTS_MAX_QUEUE", "8"))
+
+# 支持的请求协议版本：1 = 查询参数 (/api/tts)，2 = JSON 请求体 (/api/v2/tts) 与批量合成；
+# 在 /、/health 与 /ready 中公布，集成据此选择协议
+API_VERSIONS = [1, 2]
+# 批量合成：每次请求的最大条目数
+BATCH_MAX_ITEMS = 100
+
+# 优先级调度：interactive（语音助手回复）总是先于 bulk（长播报、预热）执行；
+# bulk 任务排队超过 QWEN3_TTS_BULK_MAX_WAIT 秒后提升到最前，防止饿死
+PRIORITIES = ("interactive", "bulk")
+Priority = Literal["interactive", "bulk"]
+BULK_MAX_WAIT = float(os.environ.get("QWEN3_TTS_BULK_MAX_WAIT", "10"))
+
+# 音频缓存容量（MB）：内存层 / 磁盘层
+CACHE_MEMORY_MB = int(os.environ.get("QWEN3_TTS_CACHE_MEMORY_MB", "64"))
+CACHE_DISK_MB = int(os.environ.get("QWEN3_TTS_CACHE_DISK_MB", "512"))
+
+# WAV 采样格式: int16（16-bit PCM，默认）或 float32（IEEE float）
+WAV_SAMPLE_FORMAT = os.environ.get("QWEN3_TTS_WAV_FORMAT", "int16")
+
+# 输出格式: MIME 类型, soundfile 格式, soundfile 子类型
+# 压缩格式由 soundfile (libsndfile >= 1.1) 编码，仅在请求这些格式时才导入
+AUDIO_FORMATS = {
+    "wav": ("audio/wav", None, None),
+    "flac": ("audio/flac", "FLAC", "PCM_16"),
+    "opus": ("audio/ogg", "OGG", "OPUS"),
+    "mp3": ("audio/mpeg", "MP3", "MPEG_LAYER_III"),
+}
+AudioFormat = Literal["wav", "flac", "opus", "mp3"]
+
+# 动态微批处理：最多合并的请求数 / 收集等待窗口（毫秒）
+BATCH_MAX_SIZE = int(os.environ.get("QWEN3_TTS_BATCH_SIZE", "4"))
+BATCH_WAIT_MS = float(os.environ.get("QWEN3_TTS_BATCH_WAIT_MS", "5"))
+
+# 预热任务：只在推理队列空闲时合成，空闲检测间隔（秒）与保留的历史任务数
+PREWARM_IDLE_POLL = 0.2
+PREWARM_MAX_JOBS = 20
+
+# 已经开始的流式响应在队列已满时等待空位的轮询间隔（秒）
+QUEUE_FULL_POLL = 0.2
+
+# 按句缓存：多句文本逐句生成并缓存，模板化播报中重复的句子直接复用；
+# 句子之间的交叉淡化时长（毫秒）
+SEGMENT_CACHE_ENABLED = os.environ.get("QWEN3_TTS_SEGMENT_CACHE", "1") != "0"
+SEGMENT_CROSSFADE_MS = float(os.environ.get("QWEN3_TTS_CROSSFADE_MS", "10"))
+
+# 时间拉伸：非标准语速不重新生成，而是对标准语速的音频做保持音高的时间拉伸；
+# 方法为 wsola（时域，适合语音，默认）或 phase_vocoder（频域，完全向量化、更快）
+TIME_STRETCH_ENABLED = os.environ.get("QWEN3_TTS_TIME_STRETCH", "0") != "0"
+TIME_STRETCH_METHOD = os.environ.get("QWEN3_TTS_TIME_STRETCH_METHOD", "wsola")
+CANONICAL_SPEED = 1.0
+
+# 后处理（按请求启用）：重采样到 sample_rate、裁剪首尾静音、响度归一化到 loudness LUFS。
+# 静音判定阈值（相对最响一帧，dB）与裁剪后两端保留的余量（毫秒）；
+# 响度归一化后的采样峰值上限（dBFS）
+SAMPLE_RATES = (8000, 16000, 22050, 24000, 44100, 48000)
+# Ogg Opus 只支持这些采样率
+OPUS_SAMPLE_RATES = (8000, 12000, 16000, 24000, 48000)
+TRIM_THRESHOLD_DB = float(os.environ.get("QWEN3_TTS_TRIM_THRESHOLD_DB", "-40"))
+TRIM_PAD_MS = float(os.environ.get("QWEN3_TTS_TRIM_PAD_MS", "50"))
+LOUDNESS_PEAK_DB = -1.0
+
+# 推理后端: mlx（Apple Silicon）或 stub（确定性假数据，用于在 Linux 上测试和压测）
+BACKEND = os.environ.get("QWEN3_TTS_BACKEND", "mlx")
+MODEL_ID = os.environ.get("QWEN3_TTS_MODEL", "Qwen/Qwen3-TTS-12Hz-0.6B-CustomVoice")
+# stub 后端的实时率（生成 1 秒音频耗时 1/RTF 秒）与每次调用的固定开销
+STUB_RTF = float(os.environ.get("QWEN3_TTS_STUB_RTF", "2.0"))
+STUB_OVERHEAD = float(os.environ.get("QWEN3_TTS_STUB_OVERHEAD", "0.2"))
+# stub 后端用忙等代替 sleep 模拟生成耗时，用于在多核机器上测量多进程的扩展效率
+STUB_CPU = os.environ.get("QWEN3_TTS_STUB_CPU", "0") != "0"
+
+# 多进程模式：启动 N 个模型工作进程（各自加载一份模型），本进程只负责 HTTP、
+# 调度、缓存与编码，按各进程的排队深度分发任务；1 表示在本进程内加载模型（默认）
+WORKER_PROCESSES = int(os.environ.get("QWEN3_TTS_WORKERS", "1"))
+# 工作进程崩溃后的重启等待时间（秒，连续失败时指数退避，最长 60 秒）
+WORKER_RESTART_DELAY = 1.0
+
+# 截止时间：客户端在 X-Deadline 请求头中给出绝对截止时间（Unix 时间戳，秒），
+# 过期的排队任务直接丢弃，生成中的任务在两个音频块之间放弃；客户端断开时同样放弃。
+# 多进程模式下父进程每隔 CANCEL_POLL_INTERVAL 秒检查一次是否需要通知工作进程取消
+CANCEL_POLL_INTERVAL = 0.25
+
+# 启动预热：模型加载后为每个音色各生成一次短句，触发图编译与 kernel 预热
+WARMUP_ENABLED = os.environ.get("QWEN3_TTS_WARMUP", "1") != "0"
+WARMUP_TEXT = os.environ.get("QWEN3_TTS_WARMUP_TEXT", "你好，欢迎使用。")
+
+
+class JobCancelledError(Exception):
+    """任务已取消：截止时间已过（deadline）或客户端已断开（disconnect）"""
+
+    def __init__(self, reason: str):
+        super().__init__(f"任务已取消 ({reason})")
+        self.reason = reason
+
+
+class CancelToken:
+    """
+    一个请求的取消信号
+
+    截止时间（time.time() 时间戳）已过或 cancel() 被调用（客户端断开）后
+    cancelled 为 True。推理线程在出队时和两个音频块之间检查它。
+    """
+
+    def __init__(self, deadline: Optional[float] = None, request: Optional[Request] = None):
+        self.deadline = deadline
+        self.reason: Optional[str] = None
+        self._request = request
+
+    def cancel(self, reason: str = "disconnect") -> None:
+        if self.reason is None:
+            self.reason = reason
+
+    @property
+    def cancelled(self) -> bool:
+        if self.reason is None and self.deadline is not None and time.time() >= self.deadline:
+            self.reason = "deadline"
+        return self.reason is not None
+
+    def check(self) -> None:
+        """已取消时抛出 JobCancelledError"""
+        if self.cancelled:
+            raise JobCancelledError(self.reason)
+
+    @contextlib.asynccontextmanager
+    async def watch_disconnect(self):
+        """在代码块执行期间监听客户端连接，断开时取消（没有关联请求时什么也不做）"""
+        if self._request is None:
+            yield self
+            return
+
+        async def wait_disconnect() -> None:
+            # 请求体已读完，之后收到的只会是 http.disconnect
+            while (await self._request.receive())["type"] != "http.disconnect":
+                pass
+            self.cancel("disconnect")
+
+        task = asyncio.ensure_future(wait_disconnect())
+        try:
+            yield self
+        finally:
+            task.cancel()
+
+
+class CancelGroup(CancelToken):
+    """
+    多个请求共享一次生成时的取消信号
+
+    所有成员都取消后才取消；成员为 None（不可取消的调用方，如预热）时永不取消。
+    截止时间取成员中最晚的一个。
+    """
+
+    def __init__(self, members: list):
+        self.reason = None
+        self._request = None
+        self.members = list(members)
+
+    def add(self, token: Optional[CancelToken]) -> None:
+        self.members.append(token)
+
+    @property
+    def deadline(self) -> Optional[float]:
+        if any(m is None or m.deadline is None for m in self.members):
+            return None
+        return max(m.deadline for m in self.members)
+
+    @property
+    def cancelled(self) -> bool:
+        if self.reason is None and all(m is not None and m.cancelled for m in self.members):
+            self.reason = self.members[-1].reason
+        return self.reason is not None
+
+
+class SynthesisBackend:
+    """
+    推理后端接口
+
+    HTTP 层、推理队列、缓存和编码只通过这个接口访问模型。所有方法
+    都在推理线程中调用（import_modules / load 除外，在启动阶段调用）。
+    音频为 float32 单声道 NumPy 数组，采样率为 sample_rate。
+    generate / stream 在两个音频块之间调用 cancel.check()，请求取消后不再继续生成。
+    自定义音色的说话人条件由 compute_voice 计算一次，经 add_voice 注册后
+    与内置音色一样按名称使用。
+    """
+
+    name = "base"
+    # 是否支持一次前向计算生成多条文本（batch_generate）
+    supports_batch = False
+    # 是否支持声音克隆（compute_voice）；不支持时自定义音色接口停用
+    supports_voices = False
+
+    def __init__(self):
+        self.sample_rate = 24000
+        self.speakers = list(SUPPORTED_SPEAKERS)
+        # 自定义音色名称 -> 说话人条件 {名称: NumPy 数组}
+        self.voices: dict = {}
+        self.loaded = False
+
+    def import_modules(self) -> None:
+        """导入后端依赖（较重的模块推迟到这里导入）"""
+
+    def load(self) -> None:
+        """加载模型权重"""
+        raise NotImplementedError
+
+    def generate(
+        self, text: str, speaker: str, speed: float, cancel: Optional[CancelToken] = None
+    ) -> list:
+        """生成整段语音，返回音频块列表（避免拼接复制）"""
+        raise NotImplementedError
+
+    def stream(
+        self, text: str, speaker: str, speed: float, cancel: Optional[CancelToken] = None
+    ) -> Iterator[np.ndarray]:
+        """流式生成语音，每解码出一个音频块就 yield"""
+        raise NotImplementedError
+
+    def batch_generate(self, texts: list, speaker: str, speed: float) -> list:
+        """批量生成同一音色、同一语速的多条文本，返回每条的音频块列表"""
+        raise NotImplementedError
+
+    def compute_voice(self, audio: np.ndarray, transcript: str) -> dict:
+        """由参考音频（采样率为 sample_rate）及其文本计算说话人条件，返回 {名称: NumPy 数组}"""
+        raise NotImplementedError(f"{self.name} 后端不支持自定义音色")
+
+    def add_voice(self, name: str, conditioning: dict) -> None:
+        """注册（或替换）自定义音色"""
+        self.voices[name] = conditioning
+        if name not in self.speakers:
+            self.speakers.append(name)
+
+    def remove_voice(self, name: str) -> None:
+        """删除自定义音色"""
+        self.voices.pop(name, None)
+        if name in self.speakers:
+            self.speakers.remove(name)
+
+    def device_info(self) -> dict:
+        """推理设备信息"""
+        return {"metal_gpu": False, "device": self.name}
+
+    def close(self) -> None:
+        """释放后端资源（服务器关闭时调用）"""
+
+    def memory(self) -> dict:
+        """模型占用的内存（字节）：默认取进程常驻内存峰值"""
+        import resource
+
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux 上 ru_maxrss 单位为 KB，macOS 上为字节
+        peak = peak if sys.platform == "darwin" else peak * 1024
+        return {"active": peak, "peak": peak}
+
+
+class MLXBackend(SynthesisBackend):
+    """
+    mlx-audio 上的 Qwen3-TTS（Apple Silicon GPU）
+
+    mlx-audio 没有批量生成接口，微批中的任务逐条生成（supports_batch 为 False）。
+    只有 Base 模型带说话人编码器（speaker_encoder），加载后据此设置 supports_voices。
+    mlx-audio 不接受预先计算的说话人嵌入，自定义音色保存的是参考音频与参考文本，
+    每次生成时作为 ref_audio / ref_text 传给模型。
+    """
+
+    name = "mlx"
+
+    def __init__(self, model_id: str = MODEL_ID):
+        super().__init__()
+        self.model_id = model_id
+        self._mx = None
+        self._load = None
+        self._model = None
+        # 自定义音色的生成参数 {名称: {ref_audio: MLX 数组, ref_text: 参考文本或 None}}
+        self._prompts: dict = {}
+
+    def import_modules(self) -> None:
+        import mlx.core as mx
+        from mlx_audio.tts import load
+
+        self._mx, self._load = mx, load
+
+    def load(self) -> None:
+        self._model = self._load(self.model_id)
+        self.sample_rate = getattr(self._model, "sample_rate", self.sample_rate)
+        self.supports_voices = getattr(self._model, "speaker_encoder", None) is not None
+        # 模型配置中的内置音色（mlx-audio 不区分大小写匹配）
+        known = {name.lower() for name in self.speakers}
+        for name in getattr(self._model, "get_supported_speakers", list)():
+            if name.lower() not in known:
+                known.add(name.lower())
+                self.speakers.append(name)
+        self.loaded = True
+
+    def _to_numpy(
+        self, results: Any, cancel: Optional[CancelToken] = None
+    ) -> Iterator[np.ndarray]:
+        """
+        提取生成结果中的音频块
+
+        MLX 采用惰性求值，np.asarray() 才会真正触发 GPU 计算，
+        因此必须在推理线程中完成转换；请求已取消时在触发计算前放弃。
+        """
+        for chunk in results:
+            if cancel is not None:
+                cancel.check()
+            if hasattr(chunk, "sample_rate"):
+                self.sample_rate = chunk.sample_rate
+            if hasattr(chunk, "audio"):
+                yield np.asarray(chunk.audio, dtype=np.float32)
+
+    def _voice(self, speaker: str) -> dict:
+        """内置音色按名称传给模型，自定义音色传入参考音频与参考文本"""
+        prompt = self._prompts.get(speaker)
+        return {"voice": speaker} if prompt is None else prompt
+
+    def generate(
+        self, text: str, speaker: str, speed: float, cancel: Optional[CancelToken] = None
+    ) -> list:
+        return list(self._to_numpy(
+            self._model.generate(text=text, speed=speed, stream=False, **self._voice(speaker)),
+            cancel,
+        ))
+
+    def stream(
+        self, text: str, speaker: str, speed: float, cancel: Optional[CancelToken] = None
+    ) -> Iterator[np.ndarray]:
+        yield from self._to_numpy(
+            self._model.generate(text=text, speed=speed, stream=True, **self._voice(speaker)),
+            cancel,
+        )
+
+    def compute_voice(self, audio: np.ndarray, transcript: str) -> dict:
+        # 声音克隆需要 Base 模型，CustomVoice 模型只有内置音色
+        if not self.supports_voices:
+            raise NotImplementedError(f"{self.model_id} 不支持声音克隆，请使用 Base 模型")
+        # 注册时提取一次说话人嵌入，参考音频无法使用时在这里就报错
+        self._model.extract_speaker_embedding(self._mx.array(audio), sr=self.sample_rate)
+        conditioning = {"ref_audio": np.asarray(audio, dtype=np.float32)}
+        if transcript:
+            # 参考文本按 UTF-8 字节保存，与音频一样可以 mmap 加载
+            conditioning["ref_text"] = np.frombuffer(transcript.encode("utf-8"), dtype=np.uint8)
+        return conditioning
+
+    def add_voice(self, name: str, conditioning: dict) -> None:
+        super().add_voice(name, conditioning)
+        # 只在注册时复制一次到 GPU 内存；同一个数组每次生成都会命中
+        # mlx-audio 按参考音频缓存的参考编码（有参考文本时）
+        ref_text = conditioning.get("ref_text")
+        if ref_text is not None:
+            ref_text = np.asarray(ref_text).tobytes().decode("utf-8")
+        self._prompts[name] = {
+            "ref_audio": self._mx.array(np.asarray(conditioning["ref_audio"])),
+            "ref_text": ref_text,
+        }
+
+    def remove_voice(self, name: str) -> None:
+        super().remove_voice(name)
+        self._prompts.pop(name, None)
+
+    def device_info(self) -> dict:
+        if self._mx is None:
+            return {"metal_gpu": False, "device": "pending"}
+        return {
+            "metal_gpu": self._mx.metal.is_available(),
+            "device": str(self._mx.default_device()),
+        }
+
+    def memory(self) -> dict:
+        if self._mx is None:
+            return {"active": 0, "peak": 0}
+        return {
+            "active": self._mx.metal.get_active_memory(),
+            "peak": self._mx.metal.get_peak_memory(),
+        }
+
+
+class StubBackend(SynthesisBackend):
+    """
+    确定性的假后端（无需 MLX，可在任何平台上测试和压测调度、缓存与编码）
+
+    音频为由文本和音色哈希决定频率的正弦波，时长约 0.2 秒/字 ÷ 语速；
+    生成耗时 = overhead + 音频时长 / rtf。批量生成时多个请求
+    并行"计算"，只支付一次固定开销，耗时由最长的一条决定。
+    自定义音色的"说话人嵌入"为参考音频的分频带对数幅度谱，
+    计算耗时与生成同样时长的音频相同。
+    """
+
+    name = "stub"
+    supports_batch = True
+    supports_voices = True
+
+    def __init__(
+        self, rtf: float = STUB_RTF, overhead: float = STUB_OVERHEAD, busy: bool = STUB_CPU
+    ):
+        super().__init__()
+        self.rtf = rtf
+        self.overhead = overhead
+        self.busy = busy
+
+    def load(self) -> None:
+        self.loaded = True
+
+    EMBEDDING_DIM = 192
+
+    def _audio(self, text: str, speaker: str, speed: float) -> np.ndarray:
+        voice = self.voices.get(speaker)
+        identity = (
+            speaker.encode("utf-8") if voice is None
+            else np.asarray(voice["speaker_embedding"]).tobytes()
+        )
+        digest = hashlib.sha256(identity + f"|{text}".encode("utf-8")).digest()
+        freq = 180.0 + digest[0] * 2
+        num_samples = max(1, int(len(text) * 0.2 / speed * self.sample_rate))
+        t = np.arange(num_samples, dtype=np.float32) / self.sample_rate
+        return (0.3 * np.sin(2 * np.pi * freq * t)).astype(np.float32)
+
+    def _compute(self, seconds: float) -> None:
+        """
+        模拟计算耗时：默认 sleep（类似等待 GPU）；busy 时消耗这么多 CPU 时间，
+        按线程 CPU 时间计时，核数不足时耗时会相应变长
+        """
+        if not self.busy:
+            time.sleep(seconds)
+            return
+        deadline = time.thread_time() + seconds
+        while time.thread_time() < deadline:
+            pass
+
+    def generate(
+        self, text: str, speaker: str, speed: float, cancel: Optional[CancelToken] = None
+    ) -> list:
+        return [np.concatenate(list(self.stream(text, speaker, speed, cancel)))]
+
+    def stream(
+        self, text: str, speaker: str, speed: float, cancel: Optional[CancelToken] = None
+    ) -> Iterator[np.ndarray]:
+        audio = self._audio(text, speaker, speed)
+        self._compute(self.overhead)
+        step = self.sample_rate // 2
+        for pos in range(0, audio.shape[0], step):
+            if cancel is not None:
+                cancel.check()
+            chunk = audio[pos:pos + step]
+            self._compute(chunk.shape[0] / self.sample_rate / self.rtf)
+            yield chunk
+
+    def batch_generate(self, texts: list, speaker: str, speed: float) -> list:
+        audios = [self._audio(text, speaker, speed) for text in texts]
+        longest = max(audio.shape[0] for audio in audios) / self.sample_rate
+        self._compute(self.overhead + longest / self.rtf)
+        return [[audio] for audio in audios]
+
+    def compute_voice(self, audio: np.ndarray, transcript: str) -> dict:
+        self._compute(self.overhead + audio.shape[0] / self.sample_rate / self.rtf)
+        spectrum = np.log1p(np.abs(np.fft.rfft(audio)))
+        bands = spectrum[:spectrum.shape[0] // self.EMBEDDING_DIM * self.EMBEDDING_DIM]
+        embedding = bands.reshape(self.EMBEDDING_DIM, -1).mean(axis=1)
+        embedding /= max(float(np.linalg.norm(embedding)), 1e-9)
+        return {"speaker_embedding": embedding.astype(np.float32)}
+
+
+# 可用的推理后端；新的运行时只需实现 SynthesisBackend 并在此注册
+BACKENDS = {
+    "mlx": MLXBackend,
+    "stub": StubBackend,
+}
+
+if BACKEND not in BACKENDS:
+    raise SystemExit(
+        f"未知的推理后端 QWEN3_TTS_BACKEND={BACKEND}，可选: {', '.join(BACKENDS)}"
+    )
+
+
+class WorkerCrashedError(Exception):
+    """模型工作进程在处理请求时退出"""
+
+
+class _WorkerCancelToken(CancelToken):
+    """工作进程中的取消信号：截止时间由父进程随请求传入，父进程把要取消的请求号写入 cancel_id"""
+
+    def __init__(self, deadline: Optional[float], cancel_id: Any, request_id: int):
+        super().__init__(deadline)
+        self._cancel_id = cancel_id
+        self._request_id = request_id
+
+    @property
+    def cancelled(self) -> bool:
+        if not super().cancelled and self._cancel_id.value == self._request_id:
+            self.cancel("disconnect")
+        return self.reason is not None
+
+
+def _worker_process_main(
+    index: int, conn: Any, backend_name: str, cancel_id: Any, voices: dict
+) -> None:
+    """
+    模型工作进程入口：加载并预热模型、注册自定义音色，然后依次处理父进程发来的请求
+
+    父 → 子: (request_id, method, args, deadline)，None 表示退出
+    子 → 父: (request_id, kind, payload)，kind 为 ready / result / chunk / end / error /
+    cancelled；result 与 end 附带本进程的内存占用，父进程无需单独查询。
+    父进程通过共享的 cancel_id 取消正在生成的请求。
+    """
+    model = BACKENDS[backend_name]()
+    try:
+        model.import_modules()
+        model.load()
+        if WARMUP_ENABLED:
+            for speaker in model.speakers:
+                model.generate(WARMUP_TEXT, speaker, 1.0)
+        for name, conditioning in voices.items():
+            model.add_voice(name, conditioning)
+    except Exception as e:  # pylint: disable=broad-except
+        conn.send((None, "error", f"{type(e).__name__}: {e}"))
+        return
+    conn.send((None, "ready", {
+        "sample_rate": model.sample_rate,
+        "speakers": model.speakers,
+        "supports_batch": model.supports_batch,
+        "supports_voices": model.supports_voices,
+        "device": model.device_info(),
+        "memory": model.memory(),
+    }))
+    logger.info(f"🧩 工作进程 {index} 已就绪 (pid={os.getpid()})")
+
+    while True:
+        try:
+            message = conn.recv()
+        except (EOFError, OSError):
+            break
+        if message is None:
+            break
+        request_id, method, args, deadline = message
+        cancel = _WorkerCancelToken(deadline, cancel_id, request_id)
+        try:
+            # 在管道中排队期间已过期的请求不再生成
+            cancel.check()
+            if method == "stream":
+                for chunk in model.stream(*args, cancel=cancel):
+                    conn.send((request_id, "chunk", chunk))
+                conn.send((request_id, "end", model.memory()))
+            elif method == "generate":
+                result = model.generate(*args, cancel=cancel)
+                conn.send((request_id, "result", (result, model.memory())))
+            else:
+                result = getattr(model, method)(*args)
+                conn.send((request_id, "result", (result, model.memory())))
+        except JobCancelledError as e:
+            conn.send((request_id, "cancelled", e.reason))
+        except Exception as e:  # pylint: disable=broad-except
+            conn.send((request_id, "error", f"{type(e).__name__}: {e}"))
+
+
+@dataclass
+class _WorkerProcess:
+    """一个模型工作进程及其未完成的请求"""
+
+    index: int
+    process: Any = None
+    conn: Any = None
+    # 共享内存中要取消的请求号（-1 表示没有）
+    cancel_id: Any = None
+    ready: bool = False
+    # request_id -> 接收该请求回复的队列；len(pending) 即该进程的排队深度
+    pending: dict = field(default_factory=dict)
+    send_lock: threading.Lock = field(default_factory=threading.Lock)
+    memory: dict = field(default_factory=dict)
+    completed: int = 0
+    restarts: int = 0
+    failures: int = 0
+    error: Optional[str] = None
+
+
+class ProcessPoolBackend(SynthesisBackend):
+    """
+    多进程后端：把推理分发到 N 个各自加载模型的工作进程
+
+    每次调用发给排队深度最小的就绪进程，结果经 Pipe 以 NumPy 数组传回；
+    HTTP、队列、缓存与编码仍在本进程中，因此所有工作进程共用同一份音频缓存。
+    工作进程退出时，它未完成的请求换一个进程重试一次（已开始输出的流式请求除外），
+    进程本身在后台重启并预热，HTTP 监听不受影响。自定义音色在启动进程时传入，
+    注册与删除时广播给所有就绪的进程。
+    """
+
+    name = "process-pool"
+
+    def __init__(self, backend_name: str, processes: int):
+        super().__init__()
+        self.backend_name = backend_name
+        self.supports_batch = BACKENDS[backend_name].supports_batch
+        self.supports_voices = BACKENDS[backend_name].supports_voices
+        self._ctx = multiprocessing.get_context("spawn")
+        self._workers = [_WorkerProcess(index) for index in range(processes)]
+        self._cond = threading.Condition()
+        self._ids = itertools.count()
+        self._stopping = False
+        self._device: dict = {"metal_gpu": False, "device": "pending"}
+
+    def import_modules(self) -> None:
+        for worker in self._workers:
+            self._spawn(worker)
+
+    def load(self) -> None:
+        """等待所有工作进程加载并预热完成"""
+        with self._cond:
+            while not all(w.ready for w in self._workers):
+                failed = [w for w in self._workers if w.error and not w.ready]
+                if failed:
+                    raise RuntimeError(f"工作进程 {failed[0].index} 启动失败: {failed[0].error}")
+                self._cond.wait()
+        self.loaded = True
+
+    def close(self) -> None:
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+        for worker in self._workers:
+            if worker.conn is not None:
+                try:
+                    with worker.send_lock:
+                        worker.conn.send(None)
+                except (OSError, ValueError):
+                    pass
+        for worker in self._workers:
+            if worker.process is not None:
+                worker.process.join(timeout=5)
+                if worker.process.is_alive():
+                    worker.process.terminate()
+
+    def _spawn(self, worker: _WorkerProcess) -> None:
+        conn, child_conn = self._ctx.Pipe()
+        worker.cancel_id = self._ctx.Value("q", -1, lock=False)
+        process = self._ctx.Process(
+            target=_worker_process_main,
+            args=(
+                worker.index, child_conn, self.backend_name, worker.cancel_id, dict(self.voices)
+            ),
+            name=f"qwen3-tts-worker-{worker.index}",
+            daemon=True,
+        )
+        process.start()
+        child_conn.close()
+        worker.process, worker.conn, worker.error = process, conn, None
+        threading.Thread(
+            target=self._read, args=(worker, conn),
+            name=f"qwen3-tts-worker-{worker.index}-reader", daemon=True,
+        ).start()
+        logger.info(f"🧩 启动工作进程 {worker.index} (pid={process.pid})")
+
+    def _read(self, worker: _WorkerProcess, conn: Any) -> None:
+        """读取一个工作进程的回复并分发给等待的调用方；进程退出后负责重启"""
+        while True:
+            try:
+                request_id, kind, payload = conn.recv()
+            except (EOFError, OSError):
+                break
+            if request_id is None:
+                with self._cond:
+                    if kind == "ready":
+                        worker.ready, worker.failures = True, 0
+                        worker.memory = payload["memory"]
+                        self.sample_rate = payload["sample_rate"]
+                        self.speakers = list(dict.fromkeys(payload["speakers"] + list(self.voices)))
+                        self.supports_batch = payload["supports_batch"]
+                        self.supports_voices = payload["supports_voices"]
+                        self._device = payload["device"]
+                    else:
+                        worker.error = payload
+                    self._cond.notify_all()
+                continue
+            with self._cond:
+                replies = worker.pending.get(request_id)
+            if replies is not None:
+                replies.put((kind, payload))
+
+        worker.process.join()
+        with self._cond:
+            worker.ready = False
+            for replies in worker.pending.values():
+                replies.put(("crashed", None))
+            worker.pending.clear()
+            self._cond.notify_all()
+            if self._stopping:
+                return
+            worker.failures += 1
+            worker.restarts += 1
+            delay = min(60.0, WORKER_RESTART_DELAY * 2 ** (worker.failures - 1))
+        logger.error(
+            f"💥 工作进程 {worker.index} 已退出 (exit code {worker.process.exitcode}"
+            f"{', ' + worker.error if worker.error else ''})，{delay:.0f}s 后重启"
+        )
+        time.sleep(delay)
+        if not self._stopping:
+            self._spawn(worker)
+
+    def _call(
+        self, method: str, *args: Any, cancel: Optional[CancelToken] = None,
+        target: Optional[_WorkerProcess] = None
+    ) -> Iterator[tuple]:
+        """
+        把一次调用发给排队深度最小的就绪进程（或指定的进程 target），逐条产出它的回复
+
+        等待回复期间每 CANCEL_POLL_INTERVAL 秒及每收到一条回复时检查一次 cancel，
+        取消后通知工作进程在下一个音频块之前放弃。
+        """
+        request_id = next(self._ids)
+        replies: "queue.SimpleQueue[tuple]" = queue.SimpleQueue()
+        kind = None
+        with self._cond:
+            while target is None:
+                if self._stopping:
+                    raise WorkerCrashedError("工作进程已停止")
+                ready = [w for w in self._workers if w.ready]
+                if ready:
+                    break
+                self._cond.wait()
+            if target is not None and not target.ready:
+                # 指定的进程已退出：重启后会重新收到所需的状态
+                return
+            worker = target or min(ready, key=lambda w: len(w.pending))
+            worker.pending[request_id] = replies
+        try:
+            with worker.send_lock:
+                worker.conn.send((
+                    request_id, method, args, cancel.deadline if cancel is not None else None
+                ))
+        except (OSError, ValueError):
+            # 管道已关闭：进程刚刚退出，读取线程会把它标记为 crashed
+            pass
+        try:
+            while True:
+                try:
+                    kind, payload = replies.get(
+                        timeout=CANCEL_POLL_INTERVAL if cancel is not None else None
+                    )
+                except queue.Empty:
+                    kind = None
+                # 流式回复的间隔可能一直短于轮询间隔，每收到一条回复也要检查
+                if cancel is not None and cancel.cancelled:
+                    worker.cancel_id.value = request_id
+                if kind is None:
+                    continue
+                if kind == "result":
+                    worker.memory = payload[1]
+                elif kind == "end":
+                    worker.memory = payload
+                yield kind, payload
+                if kind != "chunk":
+                    return
+        finally:
+            with self._cond:
+                if worker.pending.pop(request_id, None) is not None and kind != "crashed":
+                    worker.completed += 1
+
+    def _request(self, method: str, *args: Any, cancel: Optional[CancelToken] = None) -> Any:
+        for attempt in range(2):
+            for kind, payload in self._call(method, *args, cancel=cancel):
+                if kind == "result":
+                    result, _ = payload
+                    return result
+                if kind == "error":
+                    raise RuntimeError(payload)
+                if kind == "cancelled":
+                    raise JobCancelledError(payload)
+            if cancel is not None:
+                cancel.check()
+            logger.warning(f"⚠️ 工作进程在处理 {method} 时退出，换一个进程重试")
+        raise WorkerCrashedError(f"工作进程在处理 {method} 时退出")
+
+    def generate(
+        self, text: str, speaker: str, speed: float, cancel: Optional[CancelToken] = None
+    ) -> list:
+        return self._request("generate", text, speaker, speed, cancel=cancel)
+
+    def batch_generate(self, texts: list, speaker: str, speed: float) -> list:
+        return self._request("batch_generate", texts, speaker, speed)
+
+    def compute_voice(self, audio: np.ndarray, transcript: str) -> dict:
+        return self._request("compute_voice", audio, transcript)
+
+    def add_voice(self, name: str, conditioning: dict) -> None:
+        super().add_voice(name, conditioning)
+        self._broadcast("add_voice", name, conditioning)
+
+    def remove_voice(self, name: str) -> None:
+        super().remove_voice(name)
+        self._broadcast("remove_voice", name)
+
+    def _broadcast(self, method: str, *args: Any) -> None:
+        """
+        在每个就绪的工作进程上执行一次调用
+
+        正在重启的进程启动时会收到最新的音色，不需要广播；
+        广播时退出的进程同理，忽略即可。
+        """
+        with self._cond:
+            ready = [w for w in self._workers if w.ready]
+        for worker in ready:
+            for kind, payload in self._call(method, *args, target=worker):
+                if kind == "error":
+                    raise RuntimeError(payload)
+
+    def stream(
+        self, text: str, speaker: str, speed: float, cancel: Optional[CancelToken] = None
+    ) -> Iterator[np.ndarray]:
+        for attempt in range(2):
+            started = False
+            for kind, payload in self._call("stream", text, speaker, speed, cancel=cancel):
+                if kind == "chunk":
+                    started = True
+                    yield payload
+                elif kind == "end":
+                    return
+                elif kind == "error":
+                    raise RuntimeError(payload)
+                elif kind == "cancelled":
+                    raise JobCancelledError(payload)
+                elif started:
+                    raise WorkerCrashedError("工作进程在流式生成时退出")
+            logger.warning("⚠️ 工作进程在流式生成开始前退出，换一个进程重试")
+        raise WorkerCrashedError("工作进程在流式生成时退出")
+
+    def device_info(self) -> dict:
+        return {**self._device, "workers": self.worker_stats()}
+
+    def worker_stats(self) -> list:
+        with self._cond:
+            return [
+                {
+                    "index": w.index,
+                    "pid": w.process.pid if w.process is not None else None,
+                    "ready": w.ready,
+                    "queue_depth": len(w.pending),
+                    "completed": w.completed,
+                    "restarts": w.restarts,
+                }
+                for w in self._workers
+            ]
+
+    def memory(self) -> dict:
+        with self._cond:
+            return {
+                key: sum(w.memory.get(key, 0) for w in self._workers)
+                for key in ("active", "peak")
+            }
+
+
+backend: SynthesisBackend = (
+    ProcessPoolBackend(BACKEND, WORKER_PROCESSES) if WORKER_PROCESSES > 1
+    else BACKENDS[BACKEND]()
+)
+
+
+class QueueFullError(Exception):
+    """推理队列已满"""
+
+
+@dataclass
+class _Job:
+    """推理队列中的一个任务"""
+
+    fn: Callable[..., Any]
+    args: tuple
+    loop: asyncio.AbstractEventLoop
+    future: "asyncio.Future[Any]"
+    # 非 None 时表示可批处理：batch_key 相同的任务可合并为一次 fn([args, ...]) 调用
+    batch_key: Optional[tuple] = None
+    priority: str = "interactive"
+    enqueued_at: float = field(default_factory=time.monotonic)
+    cancel: Optional[CancelToken] = None
+
+
+class InferenceWorker:
+    """
+    专用推理线程 + 按优先级分开的有界队列 + 动态微批处理
+
+    模型推理（包括 MLX 的惰性求值）全部在该线程中执行，
+    事件循环只负责收发请求，因此 /health 等端点在 GPU 繁忙时仍能立即响应。
+
+    每次取任务时先取最高优先级的队列；最老的低优先级任务等待超过
+    max_wait 秒时先执行它（防止饿死）。长文本按句拆成多个任务提交，
+    因此高优先级请求最多等待正在执行的一句（一批）。
+
+    可批处理的任务取出后，最多再等待 batch_wait 秒，从同一优先级队列中
+    收集最多 max_batch 个 batch_key 相同的任务合并执行。
+
+    已取消（截止时间已过或客户端已断开）的任务出队时直接丢弃；任务函数以
+    cancel=（批处理为每个任务的 cancel 列表）接收取消信号，生成中途放弃时
+    抛出 JobCancelledError，已花费的推理时间计入 wasted_seconds。
+
+    多进程模式下每个模型工作进程对应一个推理线程，空闲的线程取下一个任务。
+    """
+
+    def __init__(
+        self, max_queue: int, max_batch: int = 1, batch_wait: float = 0.0,
+        max_wait: float = BULK_MAX_WAIT, threads: int = 1
+    ):
+        self._queues: dict = {priority: deque() for priority in PRIORITIES}
+        self._cond = threading.Condition()
+        self._stopping = False
+        self._threads: list = []
+        self.threads = threads
+        self.max_queue = max_queue
+        self.max_batch = max_batch
+        self.batch_wait = batch_wait
+        self.max_wait = max_wait
+        self.in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+        # 低优先级任务因等待过久而提前执行的次数
+        self.promoted = 0
+        # 取消的任务数，按 (阶段 queued/running, 原因 deadline/disconnect) 统计
+        self.cancelled: dict = {}
+        # 中途放弃的任务已花费的推理时间（秒）
+        self.wasted_seconds = 0.0
+        # 单个任务耗时的指数滑动平均，用于估算 Retry-After
+        self.avg_job_time = 5.0
+        # 批处理统计
+        self.batches = 0
+        self.batched_items = 0
+        self.last_batch_size = 0
+        self.max_seen_batch = 0
+        self.batch_throughput = 0.0  # 每批处理的请求数 / 秒（滑动平均）
+
+    @property
+    def queue_depth(self) -> int:
+        return sum(len(pending) for pending in self._queues.values())
+
+    def depth_by_priority(self) -> dict:
+        return {priority: len(pending) for priority, pending in self._queues.items()}
+
+    def start(self) -> None:
+        if self._threads:
+            return
+        self._stopping = False
+        self._threads = [
+            threading.Thread(target=self._run, name=f"inference-worker-{index}", daemon=True)
+            for index in range(self.threads)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self) -> None:
+        if not self._threads:
+            return
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+        for thread in self._threads:
+            thread.join(timeout=5)
+        self._threads = []
+
+    def retry_after(self) -> int:
+        """估算排队任务全部完成所需的秒数"""
+        pending = self.queue_depth + self.in_flight
+        return max(1, math.ceil(pending * self.avg_job_time))
+
+    def submit(
+        self, fn: Callable[..., Any], *args: Any, batch_key: Optional[tuple] = None,
+        priority: str = "interactive", cancel: Optional[CancelToken] = None
+    ) -> "asyncio.Future[Any]":
+        """提交任务到推理线程，返回可 await 的 Future；该优先级的队列满时抛出 QueueFullError"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        with self._cond:
+            pending = self._queues[priority]
+            if len(pending) >= self.max_queue:
+                self.rejected += 1
+                raise QueueFullError(f"推理队列已满 ({priority}: {self.max_queue})")
+            pending.append(_Job(fn, args, loop, future, batch_key, priority, cancel=cancel))
+            self._cond.notify()
+        return future
+
+    def cancel_counts(self) -> tuple:
+        """返回 ({(阶段, 原因): 任务数}, 浪费的推理秒数) 的快照"""
+        with self._cond:
+            return dict(self.cancelled), self.wasted_seconds
+
+    def cancel_stats(self) -> dict:
+        cancelled, wasted_seconds = self.cancel_counts()
+        return {
+            "queued": sum(n for (stage, _), n in cancelled.items() if stage == "queued"),
+            "running": sum(n for (stage, _), n in cancelled.items() if stage == "running"),
+            "by_reason": {
+                reason: sum(n for (_, r), n in cancelled.items() if r == reason)
+                for reason in ("deadline", "disconnect")
+            },
+            "wasted_seconds": round(wasted_seconds, 3),
+        }
+
+    def batch_stats(self) -> dict:
+        return {
+            "max_batch_size": self.max_batch,
+            "wait_ms": round(self.batch_wait * 1000, 1),
+            "batches": self.batches,
+            "avg_batch_size": round(self.batched_items / self.batches, 3) if self.batches else 0.0,
+            "last_batch_size": self.last_batch_size,
+            "max_seen_batch_size": self.max_seen_batch,
+            "throughput": round(self.batch_throughput, 3),
+        }
+
+    def _drop_cancelled(self) -> None:
+        """丢弃队列中已取消的任务（调用方持有 _cond）"""
+        for pending in self._queues.values():
+            for job in [job for job in pending if job.cancel is not None and job.cancel.cancelled]:
+                pending.remove(job)
+                self._count_cancelled("queued", job.cancel.reason)
+                job.loop.call_soon_threadsafe(
+                    _resolve_future, job.future, None, JobCancelledError(job.cancel.reason)
+                )
+
+    def _count_cancelled(self, stage: str, reason: str) -> None:
+        self.cancelled[(stage, reason)] = self.cancelled.get((stage, reason), 0) + 1
+
+    def _next_job(self) -> Optional[_Job]:
+        with self._cond:
+            while True:
+                while not self._stopping and not self.queue_depth:
+                    self._cond.wait()
+                if self._stopping:
+                    return None
+                self._drop_cancelled()
+                if self.queue_depth:
+                    break
+            now = time.monotonic()
+            # 防饿死：等待过久的低优先级任务先执行
+            for priority in PRIORITIES[1:]:
+                pending = self._queues[priority]
+                if pending and now - pending[0].enqueued_at >= self.max_wait:
+                    self.promoted += 1
+                    return pending.popleft()
+            for priority in PRIORITIES:
+                if self._queues[priority]:
+                    return self._queues[priority].popleft()
+        return None
+
+    def _collect_batch(self, first: _Job) -> list:
+        """在等待窗口内从同一优先级队列中收集与 first 兼容的任务"""
+        batch = [first]
+        pending = self._queues[first.priority]
+        deadline = time.monotonic() + self.batch_wait
+        with self._cond:
+            while True:
+                self._drop_cancelled()
+                for job in list(pending):
+                    if len(batch) >= self.max_batch:
+                        return batch
+                    if job.batch_key == first.batch_key:
+                        pending.remove(job)
+                        batch.append(job)
+                remaining = deadline - time.monotonic()
+                if len(batch) >= self.max_batch or remaining <= 0 or self._stopping:
+                    return batch
+                self._cond.wait(remaining)
+
+    def _run(self) -> None:
+        while True:
+            job = self._next_job()
+            if job is None:
+                break
+            if job.batch_key is not None and self.max_batch > 1:
+                batch = self._collect_batch(job)
+            else:
+                batch = [job]
+
+            with self._cond:
+                self.in_flight += len(batch)
+            start = time.time()
+            try:
+                if job.batch_key is None:
+                    results = [job.fn(*job.args, cancel=job.cancel)]
+                else:
+                    results = job.fn([j.args for j in batch], [j.cancel for j in batch])
+            except Exception as e:  # pylint: disable=broad-except
+                results = [e] * len(batch)
+            finally:
+                elapsed = time.time() - start
+                with self._cond:
+                    self.in_flight -= len(batch)
+                    self.completed += len(batch)
+                    # 多个线程并行时，按线程数折算为每个任务占用队列的时间
+                    self.avg_job_time = (
+                        0.8 * self.avg_job_time + 0.2 * elapsed / len(batch) / self.threads
+                    )
+            aborted = [r for r in results if isinstance(r, JobCancelledError)]
+            if aborted:
+                with self._cond:
+                    for error in aborted:
+                        self._count_cancelled("running", error.reason)
+                    self.wasted_seconds += elapsed * len(aborted) / len(batch)
+
+            for j, result in zip(batch, results):
+                if isinstance(result, Exception):
+                    j.loop.call_soon_threadsafe(_resolve_future, j.future, None, result)
+                else:
+                    j.loop.call_soon_threadsafe(_resolve_future, j.future, result, None)
+
+            if job.batch_key is not None:
+                with self._cond:
+                    self._record_batch(len(batch), elapsed)
+
+    def _record_batch(self, size: int, elapsed: float) -> None:
+        self.batches += 1
+        self.batched_items += size
+        self.last_batch_size = size
+        self.max_seen_batch = max(self.max_seen_batch, size)
+        if elapsed > 0:
+            self.batch_throughput = 0.8 * self.batch_throughput + 0.2 * size / elapsed
+
+
+def _resolve_future(
+    future: "asyncio.Future[Any]", result: Any, error: Optional[BaseException]
+) -> None:
+    """在事件循环线程中设置 Future 结果（调用方可能已取消）"""
+    if future.done():
+        return
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(result)
+
+
+worker = InferenceWorker(
+    MAX_QUEUE_SIZE, BATCH_MAX_SIZE, BATCH_WAIT_MS / 1000, threads=max(1, WORKER_PROCESSES)
+)
+
+
+def wav_header(
+    num_samples: Optional[int], sample_rate: int, sample_format: str
+) -> bytes:
+    """
+    手工构造单声道 WAV 文件头（float32 额外包含 fact 块）
+
+    num_samples 为 None 时用于流式输出：长度字段填 0xFFFFFFFF，
+    播放端（ffmpeg 等）会一直读取到连接结束。
+    """
+    if sample_format == "float32":
+        format_tag, sample_width = 3, 4  # WAVE_FORMAT_IEEE_FLOAT
+    else:
+        format_tag, sample_width = 1, 2  # WAVE_FORMAT_PCM
+    fmt = struct.pack(
+        "<4sIHHIIHH", b"fmt ", 16, format_tag, 1, sample_rate,
+        sample_rate * sample_width, sample_width, sample_width * 8,
+    )
+    if num_samples is None:
+        fact = struct.pack("<4sII", b"fact", 4, 0xFFFFFFFF) if format_tag == 3 else b""
+        data_size = riff_size = 0xFFFFFFFF
+    else:
+        fact = struct.pack("<4sII", b"fact", 4, num_samples) if format_tag == 3 else b""
+        data_size = num_samples * sample_width
+        riff_size = 4 + len(fmt) + len(fact) + 8 + data_size
+    return (
+        struct.pack("<4sI4s", b"RIFF", riff_size, b"WAVE")
+        + fmt + fact
+        + struct.pack("<4sI", b"data", data_size)
+    )
+
+
+def encode_wav(chunks: list, sample_rate: int, sample_format: str = "int16") -> bytes:
+    """
+    将音频块直接编码进一块预分配的内存
+
+    根据各块长度一次性分配 文件头 + PCM 数据 的缓冲区，
+    每个块转换后直接写入对应切片，不做中间拼接，也不落盘。
+    """
+    num_samples = sum(int(chunk.shape[0]) for chunk in chunks)
+    header = wav_header(num_samples, sample_rate, sample_format)
+    buffer = bytearray(len(header) + num_samples * (4 if sample_format == "float32" else 2))
+    buffer[:len(header)] = header
+
+    dtype = "<f4" if sample_format == "float32" else "<i2"
+    pcm = np.frombuffer(buffer, dtype=dtype, offset=len(header))
+    pos = 0
+    for chunk in chunks:
+        samples = np.asarray(chunk, dtype=np.float32).reshape(-1)
+        end = pos + samples.shape[0]
+        if sample_format == "float32":
+            pcm[pos:end] = samples
+        else:
+            scaled = np.clip(samples, -1.0, 1.0) * 32767.0
+            np.rint(scaled, out=scaled)
+            pcm[pos:end] = scaled
+        pos = end
+    return bytes(buffer)
+
+
+def pcm_bytes(chunk: Any, sample_format: str = "int16") -> bytes:
+    """将单个音频块转换为 PCM 字节（流式输出使用）"""
+    samples = np.asarray(chunk, dtype=np.float32).reshape(-1)
+    if sample_format == "float32":
+        return samples.astype("<f4", copy=False).tobytes()
+    scaled = np.clip(samples, -1.0, 1.0) * 32767.0
+    np.rint(scaled, out=scaled)
+    return scaled.astype("<i2").tobytes()
+
+
+def encode_audio(chunks: list, sample_rate: int, audio_format: str) -> bytes:
+    """按请求的输出格式编码音频块（pcm 为按句缓存使用的原始 float32 采样）"""
+    if audio_format == "wav":
+        return encode_wav(chunks, sample_rate, WAV_SAMPLE_FORMAT)
+    if audio_format == "pcm":
+        return b"".join(np.asarray(chunk, dtype=np.float32).tobytes() for chunk in chunks)
+
+    import soundfile as sf
+
+    _, sf_format, subtype = AUDIO_FORMATS[audio_format]
+    audio = np.concatenate(
+        [np.asarray(chunk, dtype=np.float32).reshape(-1) for chunk in chunks]
+    )
+    buffer = io.BytesIO()
+    sf.write(buffer, audio, sample_rate, format=sf_format, subtype=subtype)
+    return buffer.getvalue()
+
+
+# 句子边界：中文标点直接断句（NFKC 后全角 ！？； 已变为半角），
+# 英文句号只在后跟空白时断句，避免拆开 "21.5" 这类数字
+_SENTENCE_END = re.compile(r"(?<=[。…!?;\n])|(?<=\.)(?=\s)")
+
+
+def split_sentences(text: str) -> list:
+    """规范化文本并按句切分"""
+    text = normalize_text(text)
+    return [part.strip() for part in _SENTENCE_END.split(text) if part.strip()]
+
+
+def splice_audio(segments: list, sample_rate: int, crossfade_ms: float) -> np.ndarray:
+    """
+    拼接多段音频，相邻两段在边界处线性交叉淡化
+
+    输出缓冲区按总长度预分配，每个边界只做一次向量化的淡入淡出。
+    """
+    overlap = int(sample_rate * crossfade_ms / 1000)
+    lengths = [int(segment.shape[0]) for segment in segments]
+    overlaps = [
+        min(overlap, lengths[i], lengths[i + 1]) for i in range(len(segments) - 1)
+    ]
+    out = np.empty(sum(lengths) - sum(overlaps), dtype=np.float32)
+    pos = 0
+    for i, segment in enumerate(segments):
+        head = overlaps[i - 1] if i > 0 else 0
+        if head:
+            fade_in = np.linspace(0.0, 1.0, head, endpoint=False, dtype=np.float32)
+            tail = out[pos - head:pos]
+            tail += (segment[:head] - tail) * fade_in
+        out[pos:pos + lengths[i] - head] = segment[head:]
+        pos += lengths[i] - head
+    return out
+
+
+def wsola(audio: np.ndarray, rate: float, sample_rate: int,
+          frame_ms: float = 30.0, tolerance_ms: float = 10.0) -> np.ndarray:
+    """
+    WSOLA 时间拉伸（rate > 1 加快、变短），保持音高
+
+    输出按固定步长（半帧）叠加汉宁窗帧；每帧在名义位置 ±tolerance 内选取
+    与上一帧自然延续最相似的位置。帧间是串行依赖，每帧的相似度搜索则是
+    向量化的矩阵-向量乘法：先在 4 倍抽取的信号上粗搜，再在原始采样上
+    ±4 个采样内细搜，计算量约为全分辨率搜索的 1/16。
+    """
+    decimate = 4
+    frame = int(sample_rate * frame_ms / 1000) // (2 * decimate) * 2 * decimate
+    hop = frame // 2
+    tolerance = int(sample_rate * tolerance_ms / 1000) // decimate * decimate
+    window = np.hanning(frame + 1)[:frame].astype(np.float32)  # 周期汉宁窗，50% 重叠时和为 1
+
+    out_len = int(round(audio.shape[0] / rate))
+    num_frames = out_len // hop + 2
+    # 前端补 hop 个零使第一帧的淡入落在被裁掉的部分，两端再补 tolerance 供搜索
+    padded = np.zeros(audio.shape[0] + hop + 2 * tolerance + 3 * frame, dtype=np.float32)
+    padded[tolerance + hop:tolerance + hop + audio.shape[0]] = audio
+    coarse = padded[::decimate]
+    # 名义位置的上限：保证搜索区间和上一帧的自然延续都不越界
+    limit = (padded.shape[0] - 2 * frame - 2 * tolerance) // decimate * decimate
+
+    out = np.zeros(num_frames * hop + frame, dtype=np.float32)
+    windows = np.lib.stride_tricks.sliding_window_view
+    prev = tolerance
+    for k in range(num_frames):
+        nominal = min(tolerance + int(k * hop * rate) // decimate * decimate, limit)
+        if k == 0:
+            pos = nominal
+        else:
+            natural = prev + hop
+            start = (nominal - tolerance) // decimate
+            candidates = windows(
+                coarse[start:start + (2 * tolerance + frame) // decimate], frame // decimate
+            )
+            template = padded[natural:natural + frame:decimate]
+            pos = (start + int(np.argmax(candidates @ template))) * decimate
+            low = max(pos - decimate, 0)
+            fine = windows(padded[low:pos + decimate + frame], frame)
+            pos = low + int(np.argmax(fine @ padded[natural:natural + frame]))
+        out[k * hop:k * hop + frame] += padded[pos:pos + frame] * window
+        prev = pos
+    return out[hop:hop + out_len]
+
+
+def phase_vocoder(audio: np.ndarray, rate: float,
+                  n_fft: int = 1024, hop: int = 256) -> np.ndarray:
+    """
+    相位声码器时间拉伸（rate > 1 加快、变短），保持音高
+
+    STFT、幅度插值、相位累加（cumsum）和叠加全部向量化，比 WSOLA 更快；
+    但语音上会有轻微的"相位感"（混响、发闷），适合对延迟更敏感的场景。
+    """
+    window = np.hanning(n_fft + 1)[:n_fft].astype(np.float32)
+    padded = np.concatenate([
+        np.zeros(n_fft // 2, dtype=np.float32),
+        audio.astype(np.float32),
+        np.zeros(n_fft, dtype=np.float32),
+    ])
+    frames = np.lib.stride_tricks.sliding_window_view(padded, n_fft)[::hop] * window
+    spectrum = np.fft.rfft(frames, axis=1)
+
+    steps = np.arange(0, spectrum.shape[0] - 1, rate)
+    index = steps.astype(np.int64)
+    frac = (steps - index)[:, None]
+    magnitude = np.abs(spectrum)
+    magnitude = (1 - frac) * magnitude[index] + frac * magnitude[index + 1]
+
+    # 每个频点每帧的期望相位增量 + 实测偏差（折回到 [-π, π]）
+    expected = 2 * np.pi * hop * np.arange(spectrum.shape[1]) / n_fft
+    angle = np.angle(spectrum)
+    delta = angle[index + 1] - angle[index] - expected
+    delta -= 2 * np.pi * np.round(delta / (2 * np.pi))
+    phase = np.empty_like(delta)
+    phase[0] = angle[0]
+    phase[1:] = angle[0] + np.cumsum(delta[:-1] + expected, axis=0)
+
+    out_frames = np.fft.irfft(magnitude * np.exp(1j * phase), n=n_fft, axis=1)
+    out_frames = (out_frames * window).astype(np.float32)
+
+    # 叠加：帧长是步长的整数倍，按帧内偏移分组后每组都是连续的一维数组
+    overlap = n_fft // hop
+    out = np.zeros((len(steps) + overlap) * hop, dtype=np.float32)
+    grouped = out_frames.reshape(len(steps), overlap, hop)
+    for j in range(overlap):
+        out[j * hop:j * hop + len(steps) * hop] += grouped[:, j, :].reshape(-1)
+    out /= np.sum(window ** 2) / hop  # 汉宁窗平方在 75% 重叠下之和为常数
+
+    out_len = int(round(audio.shape[0] / rate))
+    return out[n_fft // 2:n_fft // 2 + out_len]
+
+
+def time_stretch(audio: np.ndarray, rate: float, sample_rate: int,
+                 method: str = TIME_STRETCH_METHOD) -> np.ndarray:
+    """按 rate 拉伸音频时长（rate > 1 加快），保持音高"""
+    if abs(rate - 1.0) < 1e-3:
+        return audio
+    if method == "phase_vocoder":
+        return phase_vocoder(audio, rate)
+    return wsola(audio, rate, sample_rate)
+
+
+def resample(audio: np.ndarray, src_rate: int, dst_rate: int,
+             zero_crossings: int = 10, beta: float = 5.0) -> np.ndarray:
+    """
+    多相 FIR 重采样（src_rate → dst_rate）
+
+    按 up/down = dst/src 的最简比插零、低通、抽取，但只计算保留下来的输出点：
+    每个输出点只用到原型滤波器的一个相位（约 2 × zero_crossings 个抽头）。
+    原型为 Kaiser 窗 sinc，截止频率为两者中较低的奈奎斯特频率；
+    所有输出点的抽头与输入索引一次性构造成矩阵，分块做逐行点积。
+    """
+    if src_rate == dst_rate or audio.shape[0] == 0:
+        return audio
+    g = math.gcd(src_rate, dst_rate)
+    up, down = dst_rate // g, src_rate // g
+    factor = max(up, down)
+    half = zero_crossings * factor
+    taps = np.arange(2 * half + 1, dtype=np.float64) - half
+    prototype = np.sinc(taps / factor) * np.kaiser(2 * half + 1, beta) * up / factor
+
+    # 多相分解: phases[p, j] = prototype[p + j * up]（不足补零）
+    per_phase = -(-prototype.shape[0] // up)
+    phases = np.zeros(per_phase * up, dtype=np.float32)
+    phases[:prototype.shape[0]] = prototype
+    phases = phases.reshape(per_phase, up).T
+
+    out_len = -(-audio.shape[0] * up // down)
+    # 输出点 m 对应插零信号中的位置 m*down + half（补偿滤波器的群延迟）
+    pos = np.arange(out_len, dtype=np.int64) * down + half
+    padded = np.concatenate([
+        np.zeros(per_phase, dtype=np.float32), audio.astype(np.float32),
+        np.zeros(per_phase, dtype=np.float32),
+    ])
+    out = np.empty(out_len, dtype=np.float32)
+    lags = np.arange(per_phase, dtype=np.int64)
+    block = 1 << 16
+    for start in range(0, out_len, block):
+        p = pos[start:start + block]
+        # 输入 x[p // up - j] 对应抽头 phases[p % up, j]
+        index = (p // up)[:, None] - lags[None, :] + per_phase
+        index = np.clip(index, 0, padded.shape[0] - 1)
+        out[start:start + block] = np.einsum("ij,ij->i", padded[index], phases[p % up])
+    return out
+
+
+def trim_silence(audio: np.ndarray, sample_rate: int, threshold_db: float = TRIM_THRESHOLD_DB,
+                 pad_ms: float = TRIM_PAD_MS, frame_ms: float = 10.0) -> np.ndarray:
+    """
+    按能量裁掉首尾静音（句中停顿保留）
+
+    以 frame_ms 分帧计算 RMS（reshape 后一次求均值），低于最响一帧
+    threshold_db 的帧视为静音；保留第一帧到最后一帧非静音之间的音频，
+    两端各多留 pad_ms，避免切掉字头的弱辅音和尾音。
+    """
+    frame = max(1, int(sample_rate * frame_ms / 1000))
+    num_frames = audio.shape[0] // frame
+    if num_frames == 0:
+        return audio
+    frames = audio[:num_frames * frame].reshape(num_frames, frame).astype(np.float64)
+    rms = np.sqrt(np.mean(frames ** 2, axis=1))
+    loud = np.flatnonzero(rms > rms.max() * 10 ** (threshold_db / 20))
+    if loud.size == 0:
+        return audio
+    pad = int(sample_rate * pad_ms / 1000)
+    start = max(0, loud[0] * frame - pad)
+    end = min(audio.shape[0], (loud[-1] + 1) * frame + pad)
+    return audio[start:end]
+
+
+def _k_weighting_response(sample_rate: int, n_fft: int) -> np.ndarray:
+    """
+    ITU-R BS.1770 K 计权（高架滤波 + 高通）在 rfft 频点上的功率响应 |H|²
+
+    两个二阶节的系数按采样率由模拟原型换算（与 libebur128 相同），
+    在频域求值，避免逐采样的 IIR 递推。
+    """
+    # 第一级：约 +4 dB 的高架滤波，模拟头部的声学效应
+    k = math.tan(math.pi * 1681.974450955533 / sample_rate)
+    q = 0.7071752369554196
+    vh = 10 ** (3.999843853973347 / 20)
+    vb = vh ** 0.4996667741545416
+    a0 = 1 + k / q + k * k
+    shelf_b = np.array([vh + vb * k / q + k * k, 2 * (k * k - vh), vh - vb * k / q + k * k]) / a0
+    shelf_a = np.array([a0, 2 * (k * k - 1), 1 - k / q + k * k]) / a0
+    # 第二级：38 Hz 高通（RLB 计权）
+    k = math.tan(math.pi * 38.13547087602444 / sample_rate)
+    q = 0.5003270373238773
+    a0 = 1 + k / q + k * k
+    high_b = np.array([1.0, -2.0, 1.0])
+    high_a = np.array([a0, 2 * (k * k - 1), 1 - k / q + k * k]) / a0
+
+    z = np.exp(-1j * np.pi * np.arange(n_fft // 2 + 1) / (n_fft // 2))
+    powers = np.stack([np.ones_like(z), z, z * z])
+    response = (shelf_b @ powers) / (shelf_a @ powers) * (high_b @ powers) / (high_a @ powers)
+    return np.abs(response) ** 2
+
+
+def integrated_loudness(audio: np.ndarray, sample_rate: int) -> float:
+    """
+    EBU R128 / ITU-R BS.1770 积分响度（LUFS，单声道）
+
+    K 计权在频域一次完成；400 ms 块（75% 重叠）的均方由平方信号的累加和
+    相减得到；先做 -70 LUFS 绝对门限，再做比平均响度低 10 LU 的相对门限。
+    不足一个块的短音频按整段计算。
+    """
+    if audio.shape[0] == 0:
+        return -math.inf
+    n_fft = 1 << int(math.ceil(math.log2(audio.shape[0] * 2)))
+    spectrum = np.fft.rfft(audio.astype(np.float64), n=n_fft)
+    weighted = np.fft.irfft(spectrum * np.sqrt(_k_weighting_response(sample_rate, n_fft)),
+                            n=n_fft)[:audio.shape[0]]
+
+    block = int(0.4 * sample_rate)
+    hop = block // 4
+    energy = np.concatenate([[0.0], np.cumsum(weighted ** 2)])
+    if audio.shape[0] < block:
+        power = np.array([energy[-1] / audio.shape[0]])
+    else:
+        starts = np.arange(0, audio.shape[0] - block + 1, hop)
+        power = (energy[starts + block] - energy[starts]) / block
+
+    def loudness(p: np.ndarray) -> float:
+        return -0.691 + 10 * math.log10(max(float(np.mean(p)), 1e-12))
+
+    gated = power[-0.691 + 10 * np.log10(np.maximum(power, 1e-12)) > -70.0]
+    if gated.size == 0:
+        return -math.inf
+    relative = loudness(gated) - 10.0
+    gated = gated[-0.691 + 10 * np.log10(gated) > relative]
+    return loudness(gated)
+
+
+def normalize_loudness(audio: np.ndarray, sample_rate: int, target_lufs: float,
+                       peak_db: float = LOUDNESS_PEAK_DB) -> np.ndarray:
+    """把积分响度调整到 target_lufs，增益受限于采样峰值不超过 peak_db（dBFS）"""
+    current = integrated_loudness(audio, sample_rate)
+    if not math.isfinite(current):
+        return audio
+    gain = 10 ** ((target_lufs - current) / 20)
+    peak = float(np.max(np.abs(audio)))
+    if peak > 0:
+        gain = min(gain, 10 ** (peak_db / 20) / peak)
+    return (audio * gain).astype(np.float32)
+
+
+@dataclass(frozen=True)
+class PostProcess:
+    """编码前的可选后处理：首尾静音裁剪 → 响度归一化 → 重采样"""
+
+    sample_rate: Optional[int] = None
+    trim_silence: bool = False
+    loudness: Optional[float] = None
+
+    @property
+    def active(self) -> bool:
+        return self.sample_rate is not None or self.trim_silence or self.loudness is not None
+
+    def variant(self) -> str:
+        """影响输出字节的后处理参数，作为缓存键的一部分"""
+        return (
+            f"sr={self.sample_rate or ''};trim={int(self.trim_silence)};"
+            f"lufs={'' if self.loudness is None else f'{self.loudness:.1f}'}"
+        )
+
+    def apply(self, audio: np.ndarray, sample_rate: int) -> tuple:
+        """返回 (处理后的音频, 采样率)"""
+        if self.trim_silence:
+            audio = trim_silence(audio, sample_rate)
+        if self.loudness is not None:
+            audio = normalize_loudness(audio, sample_rate, self.loudness)
+        if self.sample_rate is not None and self.sample_rate != sample_rate:
+            audio = resample(audio, sample_rate, self.sample_rate)
+            sample_rate = self.sample_rate
+        return audio, sample_rate
+
+
+def decode_reference_audio(data: bytes, sample_rate: int) -> np.ndarray:
+    """
+    解码上传的参考音频（WAV/FLAC/OGG/MP3 等 soundfile 支持的格式）
+
+    多声道混为单声道，并重采样到模型采样率；无法解码时抛出 ValueError。
+    """
+    import soundfile as sf
+
+    try:
+        audio, rate = sf.read(io.BytesIO(data), dtype="float32", always_2d=True)
+    except RuntimeError as e:
+        raise ValueError(f"无法解码参考音频: {e}") from e
+    return resample(audio.mean(axis=1), int(rate), sample_rate)
+
+
+def format_variant(audio_format: str) -> str:
+    """影响输出字节的格式参数，作为缓存键的一部分"""
+    return WAV_SAMPLE_FORMAT if audio_format == "wav" else audio_format
+
+
+def normalize_text(text: str) -> str:
+    """规范化文本：Unicode NFKC + 折叠空白，使等价文本得到相同的缓存键"""
+    return " ".join(unicodedata.normalize("NFKC", text).split())
+
+
+def cache_key(
+    text: str, speaker: str, speed: float, language: str, *variant: str
+) -> str:
+    """按内容计算缓存键（variant 为影响输出字节的附加参数，如采样格式）"""
+    payload = "\x1f".join(
+        [normalize_text(text), voice_registry.cache_tag(speaker), f"{speed:.2f}", language or "",
+         *variant]
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class CacheEntry:
+    """缓存条目：编码后的音频 + 元数据（时长等）"""
+
+    data: bytes
+    meta: dict = field(default_factory=dict)
+
+    @property
+    def size(self) -> int:
+        return len(self.data)
+
+
+class AudioCache:
+    """
+    两级合成音频缓存
+
+    - 内存层：按字节数限制的 LRU
+    - 磁盘层：每个条目一个文件（首行 JSON 元数据 + 音频字节），
+      重启后仍然有效，按字节数限制并以访问时间淘汰
+    """
+
+    SUFFIX = ".tts"
+
+    def __init__(self, directory: Path, memory_bytes: int, disk_bytes: int):
+        self.directory = directory
+        self.memory_bytes = memory_bytes
+        self.disk_bytes = disk_bytes
+        self._memory: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._memory_used = 0
+        self._disk: "OrderedDict[str, int]" = OrderedDict()
+        self._disk_used = 0
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def load_index(self) -> None:
+        """扫描磁盘目录，按修改时间重建磁盘层 LRU 索引"""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        files = sorted(
+            self.directory.glob(f"*{self.SUFFIX}"), key=lambda p: p.stat().st_mtime
+        )
+        with self._lock:
+            self._disk.clear()
+            self._disk_used = 0
+            for path in files:
+                size = path.stat().st_size
+                self._disk[path.stem] = size
+                self._disk_used += size
+        self._evict_disk()
+        logger.info(
+            f"💾 磁盘缓存: {len(self._disk)} 条, "
+            f"{self._disk_used / 1e6:.1f}/{self.disk_bytes / 1e6:.0f} MB"
+        )
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}{self.SUFFIX}"
+
+    def contains(self, key: str) -> bool:
+        """是否已缓存（不计入命中统计）"""
+        with self._lock:
+            return key in self._memory or key in self._disk
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        """查找缓存：先内存层，后磁盘层（磁盘命中会提升到内存层）"""
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return entry
+            on_disk = key in self._disk
+
+        if on_disk:
+            entry = self._read(key)
+            if entry is not None:
+                with self._lock:
+                    self.disk_hits += 1
+                    if key in self._disk:
+                        self._disk.move_to_end(key)
+                self.put(key, entry)
+                return entry
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key: str, entry: CacheEntry) -> None:
+        """写入内存层"""
+        if entry.size > self.memory_bytes:
+            return
+        with self._lock:
+            old = self._memory.pop(key, None)
+            if old is not None:
+                self._memory_used -= old.size
+            self._memory[key] = entry
+            self._memory_used += entry.size
+            while self._memory_used > self.memory_bytes:
+                _, evicted = self._memory.popitem(last=False)
+                self._memory_used -= evicted.size
+
+    def persist(self, key: str, entry: CacheEntry) -> None:
+        """写入磁盘层（在后台线程中调用）"""
+        path = self._path(key)
+        tmp = path.with_suffix(".tmp")
+        try:
+            header = json.dumps(entry.meta, separators=(",", ":")).encode("utf-8")
+            with open(tmp, "wb") as f:
+                f.write(header + b"\n")
+                f.write(entry.data)
+            os.replace(tmp, path)
+            size = path.stat().st_size
+        except OSError as e:
+            logger.warning(f"⚠️ 写入磁盘缓存失败: {e}")
+            return
+        with self._lock:
+            self._disk_used += size - self._disk.pop(key, 0)
+            self._disk[key] = size
+        self._evict_disk()
+
+    def _read(self, key: str) -> Optional[CacheEntry]:
+        path = self._path(key)
+        try:
+            raw = path.read_bytes()
+            header, _, data = raw.partition(b"\n")
+            meta = json.loads(header)
+            os.utime(path)
+        except (OSError, ValueError) as e:
+            logger.warning(f"⚠️ 读取磁盘缓存失败，已丢弃: {e}")
+            self._discard(key)
+            return None
+        return CacheEntry(data=data, meta=meta)
+
+    def _discard(self, key: str) -> None:
+        with self._lock:
+            self._disk_used -= self._disk.pop(key, 0)
+        self._path(key).unlink(missing_ok=True)
+
+    def _evict_disk(self) -> None:
+        while True:
+            with self._lock:
+                if self._disk_used <= self.disk_bytes or not self._disk:
+                    return
+                key, size = self._disk.popitem(last=False)
+                self._disk_used -= size
+            self._path(key).unlink(missing_ok=True)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            hits = self.memory_hits + self.disk_hits
+            return {
+                "memory_entries": len(self._memory),
+                "memory_bytes": self._memory_used,
+                "memory_capacity": self.memory_bytes,
+                "disk_entries": len(self._disk),
+                "disk_bytes": self._disk_used,
+                "disk_capacity": self.disk_bytes,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_ratio": round(hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+audio_cache = AudioCache(
+    CACHE_DIR, CACHE_MEMORY_MB * 1024 * 1024, CACHE_DISK_MB * 1024 * 1024
+)
+
+
+class VoiceRegistry:
+    """
+    自定义音色注册表（磁盘持久化）
+
+    每个音色一个目录：voice.json（名称、参考文本、模型与指纹等元数据）
+    + 每个条件数组一个 .npy 文件。启动时以 mmap 方式加载，不必把数组读入内存，
+    也不必重新处理参考音频。说话人条件与计算它的模型绑定，
+    由其他模型计算的音色在加载时跳过（需要重新注册）。
+    """
+
+    META = "voice.json"
+
+    def __init__(self, directory: Path, model: str):
+        self.directory = directory
+        self.model = model
+        self._voices: dict = {}
+        self._lock = threading.Lock()
+
+    def _path(self, name: str) -> Path:
+        return self.directory / name
+
+    def load(self) -> dict:
+        """扫描目录，返回 {名称: 说话人条件（mmap 数组）}"""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        voices = {}
+        for path in sorted(self.directory.iterdir()):
+            if path.name.startswith(".") or not path.is_dir():
+                continue
+            try:
+                meta = json.loads((path / self.META).read_text("utf-8"))
+                if meta.get("model") != self.model:
+                    logger.warning(
+                        f"⚠️ 跳过自定义音色 {path.name}: 由 {meta.get('model')} 计算，"
+                        f"当前模型为 {self.model}，请重新注册"
+                    )
+                    continue
+                voices[meta["name"]] = self._open(path, meta)
+            except (OSError, ValueError, KeyError) as e:
+                logger.warning(f"⚠️ 读取自定义音色 {path.name} 失败，已跳过: {e}")
+                continue
+            with self._lock:
+                self._voices[meta["name"]] = meta
+        return voices
+
+    def _open(self, path: Path, meta: dict) -> dict:
+        return {
+            key: np.load(path / f"{key}.npy", mmap_mode="r") for key in meta["arrays"]
+        }
+
+    def save(self, name: str, meta: dict, conditioning: dict) -> dict:
+        """
+        写入（或替换）一个音色，返回以 mmap 方式重新打开的说话人条件
+
+        先写入临时目录再改名，进程在写入中途退出不会留下不完整的音色。
+        """
+        digest = hashlib.sha256()
+        for key in sorted(conditioning):
+            digest.update(key.encode("utf-8"))
+            digest.update(np.ascontiguousarray(conditioning[key]).tobytes())
+        meta = {
+            **meta,
+            "name": name,
+            "model": self.model,
+            "fingerprint": digest.hexdigest()[:16],
+            "arrays": sorted(conditioning),
+        }
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self._path(name)
+        tmp = self.directory / f".{name}.tmp"
+        old = self.directory / f".{name}.old"
+        shutil.rmtree(tmp, ignore_errors=True)
+        tmp.mkdir()
+        for key, value in conditioning.items():
+            np.save(tmp / f"{key}.npy", np.asarray(value))
+        (tmp / self.META).write_text(json.dumps(meta, ensure_ascii=False), "utf-8")
+        shutil.rmtree(old, ignore_errors=True)
+        if path.exists():
+            os.replace(path, old)
+        os.replace(tmp, path)
+        shutil.rmtree(old, ignore_errors=True)
+        with self._lock:
+            self._voices[name] = meta
+        return self._open(path, meta)
+
+    def delete(self, name: str) -> bool:
+        with self._lock:
+            if self._voices.pop(name, None) is None:
+                return False
+        shutil.rmtree(self._path(name), ignore_errors=True)
+        return True
+
+    def get(self, name: str) -> Optional[dict]:
+        with self._lock:
+            return self._voices.get(name)
+
+    def list(self) -> list:
+        with self._lock:
+            return [self._voices[name] for name in sorted(self._voices)]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._voices)
+
+    def cache_tag(self, speaker: str) -> str:
+        """缓存键中的音色：自定义音色附加条件指纹，重新注册同名音色后不会命中旧音频"""
+        meta = self.get(speaker) if speaker else None
+        if meta is None:
+            return speaker or ""
+        return f"{speaker}#{meta['fingerprint']}"
+
+
+voice_registry = VoiceRegistry(VOICES_DIR, f"{BACKEND}:{MODEL_ID}")
+
+
+class Histogram:
+    """
+    Prometheus 直方图（可带一个标签维度）
+
+    observe() 只做一次二分查找和几次加法，渲染时才复制数据，
+    因此 /metrics 抓取不会拖慢推理线程。
+    """
+
+    def __init__(self, name: str, help_text: str, buckets: tuple, label: Optional[str] = None):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = buckets
+        self.label = label
+        self._series: dict = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, label_value: str = "") -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_value)
+            if series is None:
+                series = self._series[label_value] = [[0] * len(self.buckets), 0.0, 0]
+            if index < len(self.buckets):
+                series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self) -> list:
+        with self._lock:
+            snapshot = {k: (list(v[0]), v[1], v[2]) for k, v in self._series.items()}
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        for label_value, (counts, total, count) in sorted(snapshot.items()):
+            labels = f'{self.label}="{_escape_label(label_value)}"' if self.label else ""
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                bucket_labels = _join_labels(labels, f'le="{bound}"')
+                lines.append(f"{self.name}_bucket{{{bucket_labels}}} {cumulative}")
+            bucket_labels = _join_labels(labels, 'le="+Inf"')
+            lines.append(f"{self.name}_bucket{{{bucket_labels}}} {count}")
+            suffix = f"{{{labels}}}" if labels else ""
+            lines.append(f"{self.name}_sum{suffix} {total}")
+            lines.append(f"{self.name}_count{suffix} {count}")
+        return lines
+
+
+class Counter:
+    """Prometheus 计数器（标签为固定顺序的元组）"""
+
+    def __init__(self, name: str, help_text: str, labels: tuple = ()):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self._values: dict = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values: str, amount: float = 1) -> None:
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def render(self) -> list:
+        with self._lock:
+            snapshot = dict(self._values)
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        for label_values, value in sorted(snapshot.items()):
+            labels = ",".join(
+                f'{k}="{_escape_label(v)}"' for k, v in zip(self.labels, label_values)
+            )
+            lines.append(f"{self.name}{{{labels}}} {value}" if labels else f"{self.name} {value}")
+        return lines
+
+
+def _escape_label(value: str) -> str:
+    """按 Prometheus 文本格式转义标签值"""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _join_labels(*labels: str) -> str:
+    return ",".join(label for label in labels if label)
+
+
+def _gauge(name: str, help_text: str, value: float) -> list:
+    return [f"# HELP {name} {help_text}", f"# TYPE {name} gauge", f"{name} {value}"]
+
+
+_SECONDS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+
+class Metrics:
+    """服务器指标"""
+
+    def __init__(self):
+        self.queue_wait = Histogram(
+            "qwen3_tts_queue_wait_seconds", "Time requests wait in the inference queue, by priority",
+            _SECONDS_BUCKETS, label="priority")
+        self.generation = Histogram(
+            "qwen3_tts_generation_seconds", "Model generation time per request",
+            _SECONDS_BUCKETS)
+        self.encode = Histogram(
+            "qwen3_tts_encode_seconds", "Audio encoding time per request",
+            _SECONDS_BUCKETS)
+        self.audio_duration = Histogram(
+            "qwen3_tts_audio_duration_seconds", "Duration of generated audio",
+            (0.5, 1, 2, 5, 10, 20, 30, 60, 120, 300))
+        self.realtime_factor = Histogram(
+            "qwen3_tts_realtime_factor", "Seconds of audio generated per second, by speaker",
+            (0.25, 0.5, 0.75, 1, 1.5, 2, 3, 5, 10), label="speaker")
+        self.requests = Counter(
+            "qwen3_tts_requests_total", "HTTP requests by endpoint and status",
+            ("endpoint", "status"))
+        self.http_in_flight = 0
+
+    def observe_result(
+        self, result: dict, queue_time: float, speaker: str, priority: str = "interactive"
+    ) -> None:
+        """记录一次生成的耗时指标"""
+        gen_time = result["gen_time"]
+        self.queue_wait.observe(max(queue_time, 0.0), priority)
+        self.generation.observe(gen_time)
+        self.encode.observe(result.get("encode_time", 0.0))
+        self.audio_duration.observe(result["duration"])
+        if gen_time > 0:
+            self.realtime_factor.observe(result["duration"] / gen_time, speaker or "")
+
+    def render(self) -> str:
+        cache = audio_cache.stats()
+        memory = backend.memory()
+        lines = []
+        for metric in (self.queue_wait, self.generation, self.encode,
+                       self.audio_duration, self.realtime_factor, self.requests):
+            lines += metric.render()
+        coalescing = single_flight.stats()
+        lines += [
+            "# HELP qwen3_tts_coalesced_requests_total Requests served by joining an identical in-flight generation",
+            "# TYPE qwen3_tts_coalesced_requests_total counter",
+            f"qwen3_tts_coalesced_requests_total {coalescing['coalesced']}",
+        ]
+        lines += _gauge("qwen3_tts_http_in_flight", "HTTP requests being served", self.http_in_flight)
+        lines += _gauge("qwen3_tts_inference_in_flight", "Jobs running on the inference worker", worker.in_flight)
+        lines += [
+            "# HELP qwen3_tts_queue_depth Jobs waiting in the inference queue, by priority",
+            "# TYPE qwen3_tts_queue_depth gauge",
+        ]
+        lines += [
+            f'qwen3_tts_queue_depth{{priority="{priority}"}} {depth}'
+            for priority, depth in worker.depth_by_priority().items()
+        ]
+        if isinstance(backend, ProcessPoolBackend):
+            workers = backend.worker_stats()
+            lines += [
+                "# HELP qwen3_tts_worker_queue_depth Calls outstanding on each model worker process",
+                "# TYPE qwen3_tts_worker_queue_depth gauge",
+            ]
+            lines += [f'qwen3_tts_worker_queue_depth{{worker="{w["index"]}"}} {w["queue_depth"]}' for w in workers]
+            lines += [
+                "# HELP qwen3_tts_worker_restarts_total Model worker process restarts after a crash",
+                "# TYPE qwen3_tts_worker_restarts_total counter",
+            ]
+            lines += [f'qwen3_tts_worker_restarts_total{{worker="{w["index"]}"}} {w["restarts"]}' for w in workers]
+        lines += [
+            "# HELP qwen3_tts_queue_promoted_total Low-priority jobs run ahead of higher priorities after waiting too long",
+            "# TYPE qwen3_tts_queue_promoted_total counter",
+            f"qwen3_tts_queue_promoted_total {worker.promoted}",
+        ]
+        cancelled, wasted_seconds = worker.cancel_counts()
+        lines += [
+            "# HELP qwen3_tts_cancelled_jobs_total Jobs dropped from the queue or aborted mid-generation, by stage and reason",
+            "# TYPE qwen3_tts_cancelled_jobs_total counter",
+        ]
+        lines += [
+            f'qwen3_tts_cancelled_jobs_total{{stage="{stage}",reason="{reason}"}} {cancelled.get((stage, reason), 0)}'
+            for stage in ("queued", "running")
+            for reason in ("deadline", "disconnect")
+        ]
+        lines += [
+            "# HELP qwen3_tts_wasted_gpu_seconds_total Inference time spent on jobs that were aborted mid-generation",
+            "# TYPE qwen3_tts_wasted_gpu_seconds_total counter",
+            f"qwen3_tts_wasted_gpu_seconds_total {wasted_seconds}",
+        ]
+        lines += [
+            "# HELP qwen3_tts_queue_rejected_total Requests rejected with 503 because the queue was full",
+            "# TYPE qwen3_tts_queue_rejected_total counter",
+            f"qwen3_tts_queue_rejected_total {worker.rejected}",
+        ]
+        lines += _gauge("qwen3_tts_cache_hit_ratio", "Audio cache hit ratio", cache["hit_ratio"])
+        lines += _gauge("qwen3_tts_cache_memory_bytes", "Audio cache memory tier size", cache["memory_bytes"])
+        lines += _gauge("qwen3_tts_cache_disk_bytes", "Audio cache disk tier size", cache["disk_bytes"])
+        lines += [
+            "# HELP qwen3_tts_cache_lookups_total Audio cache lookups by result",
+            "# TYPE qwen3_tts_cache_lookups_total counter",
+            f'qwen3_tts_cache_lookups_total{{result="memory_hit"}} {cache["memory_hits"]}',
+            f'qwen3_tts_cache_lookups_total{{result="disk_hit"}} {cache["disk_hits"]}',
+            f'qwen3_tts_cache_lookups_total{{result="miss"}} {cache["misses"]}',
+        ]
+        lines += _gauge("qwen3_tts_ready", "1 once the model is loaded and warmed up", int(startup.ready))
+        lines += _gauge("qwen3_tts_custom_voices", "Registered custom voices", len(voice_registry))
+        lines += [
+            "# HELP qwen3_tts_startup_phase_seconds Duration of each startup phase",
+            "# TYPE qwen3_tts_startup_phase_seconds gauge",
+        ] + [
+            f'qwen3_tts_startup_phase_seconds{{phase="{name}"}} {seconds}'
+            for name, seconds in startup.phases.items()
+        ]
+        lines += _gauge("qwen3_tts_model_memory_bytes", "Active model memory", memory["active"])
+        lines += _gauge("qwen3_tts_model_memory_peak_bytes", "Peak model memory", memory["peak"])
+        return "\n".join(lines) + "\n"
+
+
+metrics = Metrics()
+
+
+@dataclass
+class StartupState:
+    """启动进度：各阶段耗时（秒）与每个音色的预热耗时"""
+
+    status: str = "starting"  # starting / importing / loading / warming_up / ready / failed
+    phases: dict = field(default_factory=dict)
+    warmup: dict = field(default_factory=dict)
+    error: Optional[str] = None
+    started_at: float = field(default_factory=time.time)
+
+    @property
+    def ready(self) -> bool:
+        return self.status == "ready"
+
+    def to_dict(self) -> dict:
+        return {
+            "status": self.status,
+            "ready": self.ready,
+            "phases": {name: round(seconds, 3) for name, seconds in self.phases.items()},
+            "warmup": {name: round(seconds, 3) for name, seconds in self.warmup.items()},
+            "error": self.error,
+            "uptime": round(time.time() - self.started_at, 1),
+        }
+
+
+startup = StartupState()
+
 
 @app.on_event("startup")
 async def load_model():
-    """启动时加载模型"""
-    global model
+    """启动时启动推理线程，并在后台导入、加载与预热模型（不阻塞端口监听）"""
     logger.info("=" * 60)
     logger.info("🚀 启动 MLX-Audio TTS 服务器...")
-    logger.info(f"📍 Metal GPU 可用: {mx.metal.is_available()}")
-    logger.info(f"📍 MLX 设备: {mx.default_device()}")
+    logger.info(f"📍 推理后端: {BACKEND}")
+    worker.start()
+    logger.info(
+        f"🧵 推理线程已启动，队列容量: {MAX_QUEUE_SIZE}，"
+        f"批大小: {BATCH_MAX_SIZE}，等待窗口: {BATCH_WAIT_MS}ms，"
+        f"bulk 最长等待: {BULK_MAX_WAIT}s，推理线程数: {worker.threads}"
+    )
+    task = asyncio.create_task(_warm_start())
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+
+
+async def _warm_start() -> None:
+    """
+    后台启动流程：导入 → 加载权重 → 预热，并记录各阶段耗时
+
+    导入和加载在线程池中执行；预热任务提交给推理线程，
+    与之后的真实请求在同一线程上运行。全部完成前 /ready 返回 503。
+    """
+    phase_start = time.time()
+    try:
+        startup.status = "importing"
+        await asyncio.to_thread(backend.import_modules)
+        startup.phases["import"] = time.time() - phase_start
+        device = backend.device_info()
+        logger.info(f"📍 Metal GPU 可用: {device['metal_gpu']}")
+        logger.info(f"📍 MLX 设备: {device['device']}")
+
+        startup.status = "loading"
+        phase_start = time.time()
+        await asyncio.to_thread(backend.load)
+        startup.phases["load"] = time.time() - phase_start
+        logger.info(f"✅ 模型加载完成，耗时: {startup.phases['load']:.2f}秒")
+        logger.info(f"📊 支持的音色: {', '.join(backend.speakers)}")
+        await asyncio.to_thread(audio_cache.load_index)
+
+        startup.status = "warming_up"
+        phase_start = time.time()
+        if WARMUP_ENABLED:
+            for speaker in backend.speakers:
+                speaker_start = time.time()
+                await worker.submit(_synthesize, WARMUP_TEXT, speaker, 1.0)
+                startup.warmup[speaker] = time.time() - speaker_start
+                logger.info(f"🔥 音色预热完成: {speaker} ({startup.warmup[speaker]:.2f}s)")
+        startup.phases["warmup"] = time.time() - phase_start
+
+        # 自定义音色在预热之后注册，启动耗时不随音色数量增加
+        phase_start = time.time()
+        if backend.supports_voices:
+            voices = await asyncio.to_thread(voice_registry.load)
+            for name, conditioning in voices.items():
+                await worker.submit(_add_voice, name, conditioning)
+            startup.phases["voices"] = time.time() - phase_start
+            if voices:
+                logger.info(f"🎙️ 已加载 {len(voices)} 个自定义音色: {', '.join(voices)}")
+        else:
+            logger.warning(
+                f"⚠️ 当前模型 {MODEL_ID} 不支持声音克隆，自定义音色接口已停用"
+                f"（需要 Base 模型，如 Qwen/Qwen3-TTS-12Hz-0.6B-Base）"
+            )
+
+        startup.status = "ready"
+        logger.info(
+            "✅ 服务器就绪，启动耗时: "
+            + ", ".join(f"{name} {seconds:.2f}s" for name, seconds in startup.phases.items())
+        )
+        logger.info("=" * 60)
+    except Exception as e:  # pylint: disable=broad-except
+        startup.status = "failed"
+        startup.error = str(e)
+        logger.error(f"❌ 模型加载失败: {e}", exc_info=True)
+
+
+def _require_ready() -> None:
+    """模型未就绪时拒绝请求：启动中返回 503 + Retry-After，启动失败返回 500"""
+    if startup.ready:
+        return
+    if startup.status == "failed":
+        raise HTTPException(status_code=500, detail=f"Model failed to load: {startup.error}")
+    raise HTTPException(
+        status_code=503,
+        detail=f"Model is starting ({startup.status})",
+        headers={"Retry-After": "5"},
+    )
+
+
+def _require_speaker(speaker: Optional[str]) -> str:
+    """
+    返回请求的音色在 backend.speakers 中的名称（与模型一样不区分大小写），未知音色返回 400
+
+    合成前检查，错误不会等到推理线程中才出现，指标的音色标签也只会是已知音色。
+    """
+    names = {name.lower(): name for name in backend.speakers}
+    name = names.get((speaker or "").lower())
+    if name is None:
+        raise HTTPException(
+            status_code=400, detail=f"未知音色: {speaker}（可用音色见 /api/list_speakers）"
+        )
+    return name
+
+
+def _require_voice_cloning() -> None:
+    """模型不支持声音克隆时拒绝修改自定义音色（501）"""
+    if not backend.supports_voices:
+        raise HTTPException(
+            status_code=501,
+            detail=f"{MODEL_ID} 不支持声音克隆，请使用 Base 模型（如 Qwen/Qwen3-TTS-12Hz-0.6B-Base）",
+        )
+
+
+@app.on_event("shutdown")
+async def stop_worker():
+    """关闭时停止推理线程与模型工作进程"""
+    worker.stop()
+    backend.close()
+
+
+@app.get("/")
+async def root():
+    """API 根路径"""
+    return {
+        "service": "Qwen3-TTS MLX Server",
+        "version": "1.0.0",
+        "backend": BACKEND,
+        "metal_gpu": backend.device_info()["metal_gpu"],
+        "model_loaded": backend.loaded,
+        "voice_cloning": backend.supports_voices,
+        "endpoints": {
+            "health": "/health",
+            "ready": "/ready",
+            "metrics": "/metrics",
+            "tts": "/api/tts",
+            "tts_stream": "/api/tts/stream",
+            "tts_prewarm": "/api/tts/prewarm",
+            "list_speakers": "/api/list_speakers",
+            "voices": "/api/voices",
+            "tts_to_speaker": "/api/tts_to_speaker",
+            "tts_v2": "/api/v2/tts",
+            "tts_v2_stream": "/api/v2/tts/stream",
+            "tts_v2_batch": "/api/v2/tts/batch"
+        },
+        "api_versions": API_VERSIONS
+    }
+
+
+@app.get("/health")
+async def health():
+    """
+    存活检查端点
+
+    只要进程与事件循环正常就返回 healthy（启动失败时为 unhealthy），
+    模型是否可以处理请求请查询 /ready。
+    """
+    return {
+        "status": "unhealthy" if startup.status == "failed" else "healthy",
+        "model_loaded": backend.loaded,
+        "ready": startup.ready,
+        "startup": startup.to_dict(),
+        "api_versions": API_VERSIONS,
+        "backend": BACKEND,
+        **backend.device_info(),
+        "supported_speakers": backend.speakers,
+        "custom_voices": len(voice_registry),
+        "queue": {
+            "depth": worker.queue_depth,
+            "depth_by_priority": worker.depth_by_priority(),
+            "capacity": worker.max_queue,
+            "in_flight": worker.in_flight,
+            "completed": worker.completed,
+            "rejected": worker.rejected,
+            "promoted": worker.promoted,
+            "bulk_max_wait": worker.max_wait,
+            "avg_job_time": round(worker.avg_job_time, 3),
+            "cancelled": worker.cancel_stats(),
+        },
+        "batching": worker.batch_stats(),
+        "coalescing": single_flight.stats(),
+        "cache": audio_cache.stats(),
+    }
+
+
+@app.get("/ready")
+async def ready():
+    """就绪检查端点：模型加载并预热完成后返回 200，否则返回 503"""
+    return JSONResponse(
+        status_code=200 if startup.ready else 503,
+        content={
+            **startup.to_dict(),
+            "api_versions": API_VERSIONS,
+            "voice_cloning": startup.ready and backend.supports_voices,
+        },
+    )
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    """Prometheus 指标端点"""
+    return PlainTextResponse(
+        metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
+@app.middleware("http")
+async def count_requests(request: Request, call_next):
+    """按端点与状态码统计请求数，并记录正在处理的请求数"""
+    metrics.http_in_flight += 1
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        metrics.http_in_flight -= 1
+        route = request.scope.get("route")
+        metrics.requests.inc(getattr(route, "path", "other"), str(status))
+
+
+def _synthesize(
+    text: str, speaker: str, speed: float, audio_format: str = "wav",
+    cancel: Optional[CancelToken] = None
+) -> dict:
+    """在推理线程中执行：生成语音并按输出格式编码"""
+    start_time = time.time()
+    audio_chunks = backend.generate(text, speaker, speed, cancel)
+    return _encode_result(audio_chunks, start_time, audio_format)
+
+
+def _synthesize_batch(requests: list, cancels: Optional[list] = None) -> list:
+    """
+    在推理线程中执行：批量生成同一音色、同一语速的多条文本
+
+    后端支持批量生成时合并为一次前向计算（中途不可取消），否则逐条生成。
+    返回与 requests 一一对应的结果，失败的条目为异常对象。
+    """
+    cancels = cancels or [None] * len(requests)
+    if len(requests) == 1 or not backend.supports_batch:
+        results = []
+        for args, cancel in zip(requests, cancels):
+            try:
+                results.append({**_synthesize(*args, cancel=cancel), "batch_size": 1})
+            except Exception as e:  # pylint: disable=broad-except
+                results.append(e)
+        return results
+
+    start_time = time.time()
+    _, speaker, speed, _ = requests[0]
+    outputs = backend.batch_generate(
+        [text for text, _, _, _ in requests], speaker, speed
+    )
+    results = []
+    for audio_chunks, (_, _, _, audio_format) in zip(outputs, requests):
+        try:
+            results.append({
+                **_encode_result(audio_chunks, start_time, audio_format),
+                "batch_size": len(requests),
+            })
+        except Exception as e:  # pylint: disable=broad-except
+            results.append(e)
+    return results
+
+
+def _encode_result(audio_chunks: list, start_time: float, audio_format: str = "wav") -> dict:
+    """按输出格式编码后端生成的音频块"""
+    if not audio_chunks:
+        raise Exception("未生成音频数据")
+
+    # 后端返回时音频已求值为 NumPy，编码耗时不会混入生成耗时
+    gen_time = time.time() - start_time
+    sample_rate = backend.sample_rate
+
+    # WAV 直接编码为内存中的预分配缓冲区（无需先拼接音频块）
+    encode_start = time.time()
+    data = encode_audio(audio_chunks, sample_rate, audio_format)
+    encode_time = time.time() - encode_start
+
+    duration = sum(int(c.shape[0]) for c in audio_chunks) / sample_rate
+    return {
+        "data": data,
+        "format": audio_format,
+        "gen_time": gen_time,
+        "encode_time": encode_time,
+        "duration": duration,
+    }
+
+
+def _synthesize_stream(
+    text: str, speaker: str, speed: float, emit: Callable[[Optional[bytes]], None],
+    cancel: Optional[CancelToken] = None
+) -> dict:
+    """
+    在推理线程中执行：流式生成一句语音
+
+    开始执行时先推送一个空块（事件循环据此得到排队时间），之后每解码出
+    一个音频块就通过 emit() 推送 PCM 数据，结束时推送 None。
+    返回完整 PCM 供整段写入缓存。
+    """
+    start_time = time.time()
+    first_chunk_time = None
+    pcm_parts = []
+    num_samples = 0
 
-    start = time.time()
     try:
-        model = load("Qwen/Qwen3-TTS-12Hz-0.6B-CustomVoice")
-        load_time = time.time() - start
-        logger.info(f"✅ 模型加载完成，耗时: {load_time:.2f}秒")
-        logger.info(f"📊 支持的音色: {', '.join(SUPPORTED_SPEAKERS)}")
-        logger.info("=" * 60)
-    except Exception as e:
-        logger.error(f"❌ 模型加载失败: {e}", exc_info=True)
-        raise
+        emit(b"")
+        for chunk in backend.stream(text, speaker, speed, cancel):
+            if first_chunk_time is None:
+                first_chunk_time = time.time() - start_time
+            data = pcm_bytes(chunk, WAV_SAMPLE_FORMAT)
+            pcm_parts.append(data)
+            num_samples += int(chunk.shape[0])
+            emit(data)
+    finally:
+        emit(None)
 
+    if not pcm_parts:
+        raise Exception("未生成音频数据")
 
-@app.get("/")
-async def root():
-    """API 根路径"""
     return {
-        "service": "Qwen3-TTS MLX Server",
-        "version": "1.0.0",
-        "metal_gpu": mx.metal.is_available(),
-        "model_loaded": model is not None,
-        "endpoints": {
-            "health": "/health",
-            "tts": "/api/tts",
-            "tts_to_speaker": "/api/tts_to_speaker"
-        }
+        "pcm": b"".join(pcm_parts),
+        "num_samples": num_samples,
+        "format": "wav",
+        "encode_time": 0.0,
+        "gen_time": time.time() - start_time,
+        "first_chunk_time": first_chunk_time,
+        "duration": num_samples / backend.sample_rate,
     }
 
 
-@app.get("/health")
-async def health():
-    """健康检查端点"""
+def _compute_voice(
+    audio: np.ndarray, transcript: str, cancel: Optional[CancelToken] = None
+) -> dict:
+    """在推理线程中执行：由参考音频计算说话人条件"""
+    return backend.compute_voice(audio, transcript)
+
+
+def _add_voice(name: str, conditioning: dict, cancel: Optional[CancelToken] = None) -> None:
+    """在推理线程中执行：注册自定义音色（MLX 后端在此把说话人条件复制到 GPU 内存）"""
+    backend.add_voice(name, conditioning)
+
+
+def _remove_voice(name: str, cancel: Optional[CancelToken] = None) -> None:
+    """在推理线程中执行：删除自定义音色"""
+    backend.remove_voice(name)
+
+
+def _submit(
+    fn: Callable[..., Any], *args: Any, batch_key: Optional[tuple] = None,
+    priority: str = "interactive", cancel: Optional[CancelToken] = None
+) -> "asyncio.Future[Any]":
+    """提交推理任务，队列已满时转换为 503 + Retry-After"""
+    try:
+        return worker.submit(fn, *args, batch_key=batch_key, priority=priority, cancel=cancel)
+    except QueueFullError as e:
+        retry_after = worker.retry_after()
+        logger.warning(f"⏳ {e}，建议 {retry_after}s 后重试")
+        raise HTTPException(
+            status_code=503,
+            detail=str(e),
+            headers={"Retry-After": str(retry_after)},
+        )
+
+
+async def _submit_waiting(
+    fn: Callable[..., Any], *args: Any, priority: str = "interactive",
+    cancel: Optional[CancelToken] = None
+) -> "asyncio.Future[Any]":
+    """提交推理任务，队列已满时等待空位（用于已经开始的响应中的后续任务）"""
+    while True:
+        try:
+            return worker.submit(fn, *args, priority=priority, cancel=cancel)
+        except QueueFullError:
+            if cancel is not None:
+                cancel.check()
+            await asyncio.sleep(QUEUE_FULL_POLL)
+
+
+def _cancelled_error(error: JobCancelledError) -> HTTPException:
+    """取消的任务：截止时间已过返回 504，客户端已断开返回 499（无人接收，仅用于日志与指标）"""
+    logger.warning(f"⏱️ {error}")
+    status_code = 504 if error.reason == "deadline" else 499
+    return HTTPException(status_code=status_code, detail=str(error))
+
+
+def request_cancel_token(
+    request: Request,
+    x_deadline: Optional[float] = Header(
+        None, description="绝对截止时间（Unix 时间戳，秒），过期后放弃生成"
+    ),
+) -> CancelToken:
+    """FastAPI 依赖：由 X-Deadline 请求头与客户端连接创建取消信号"""
+    return CancelToken(x_deadline, request)
+
+
+# bulk 任务在队列满时等待空位而不是返回 503：长播报与批量请求逐句提交的
+# 大量任务来自同一个请求，不应被拒绝
+bulk_slots = asyncio.Semaphore(MAX_QUEUE_SIZE)
+
+
+class SingleFlight:
+    """
+    合并相同的进行中请求
+
+    同一缓存键（文本、音色、语速、语言、格式）的请求只生成一次：第一个请求
+    （leader）创建生成任务，之后到达的请求直接等待同一个任务。任务独立于
+    发起它的 HTTP 请求运行，只有所有等待者都已取消（截止时间已过或客户端
+    断开）时才放弃生成；生成失败时所有等待者都收到同一个错误。
+    """
+
+    def __init__(self):
+        self._tasks: dict = {}
+        self._cancels: dict = {}
+        self.leaders = 0
+        self.coalesced = 0
+
+    def get(self, key: str) -> "Optional[asyncio.Task]":
+        return self._tasks.get(key)
+
+    async def run(
+        self, key: str, factory: Callable[..., Any], cancel: Optional[CancelToken] = None
+    ) -> tuple:
+        """
+        等待 key 对应的生成任务，没有则用 factory(cancel=...) 创建
+
+        factory 收到所有等待者共享的取消信号。返回 (结果, 是否合并到了已有任务)。
+        """
+        task = self._tasks.get(key)
+        coalesced = task is not None
+        if coalesced:
+            self.coalesced += 1
+            self._cancels[key].add(cancel)
+        else:
+            self.leaders += 1
+            self._cancels[key] = group = CancelGroup([cancel])
+            task = asyncio.ensure_future(factory(cancel=group))
+            self._tasks[key] = task
+            task.add_done_callback(partial(self._done, key))
+        # shield: 某个等待者被取消（客户端断开）时不取消共享的生成任务
+        return await asyncio.shield(task), coalesced
+
+    def _done(self, key: str, task: "asyncio.Task") -> None:
+        self._tasks.pop(key, None)
+        self._cancels.pop(key, None)
+        # 所有等待者都已断开时，避免 "exception was never retrieved" 警告
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": len(self._tasks),
+            "leaders": self.leaders,
+            "coalesced": self.coalesced,
+        }
+
+
+single_flight = SingleFlight()
+
+
+def _store_result(key: str, result: dict) -> CacheEntry:
+    """写入内存缓存，并在后台线程中持久化到磁盘"""
+    entry = CacheEntry(
+        data=result["data"],
+        meta={
+            "duration": result["duration"],
+            "format": result["format"],
+            "encode_time": result["encode_time"],
+        },
+    )
+    audio_cache.put(key, entry)
+    asyncio.get_running_loop().run_in_executor(
+        None, audio_cache.persist, key, entry
+    )
+    return entry
+
+
+def _audio_headers(entry: CacheEntry, encode_time: float) -> dict:
+    """输出格式、负载大小与编码耗时，便于比较不同格式的开销"""
     return {
-        "status": "healthy" if model is not None else "unhealthy",
-        "model_loaded": model is not None,
-        "metal_gpu": mx.metal.is_available(),
-        "device": str(mx.default_device()),
-        "supported_speakers": SUPPORTED_SPEAKERS
+        "X-Audio-Format": entry.meta.get("format", "wav"),
+        "X-Audio-Bytes": str(entry.size),
+        "X-Encode-Time": str(encode_time),
     }
 
 
+def _cached_response(key: str, cached: CacheEntry) -> Response:
+    logger.info(f"⚡ 缓存命中: {key[:12]} ({cached.size} bytes)")
+    audio_format = cached.meta.get("format", "wav")
+    return Response(
+        content=cached.data,
+        media_type=AUDIO_FORMATS[audio_format][0],
+        headers={
+            "X-Cache": "HIT",
+            "X-Generation-Time": "0",
+            "X-Audio-Duration": str(cached.meta.get("duration", 0)),
+            "X-Realtime-Factor": "0",
+            **_audio_headers(cached, 0.0),
+        }
+    )
+
+
 @app.post("/api/tts")
 async def text_to_speech(
     text: str = Query(..., description="要合成的文本"),
     speed: float = Query(1.0, ge=0.5, le=2.0, description="语速倍率 (0.5-2.0)"),
     language: Optional[str] = Query("Chinese", description="语言"),
-    speaker: Optional[str] = Query("Vivian", description="音色")
+    speaker: Optional[str] = Query("Vivian", description="音色"),
+    format: AudioFormat = Query("wav", description="输出格式 (wav/flac/opus/mp3)"),
+    segment_cache: Optional[bool] = Query(
+        None, description="多句文本按句生成并缓存（默认由 QWEN3_TTS_SEGMENT_CACHE 决定）"
+    ),
+    time_stretch: Optional[bool] = Query(
+        None, description="非标准语速由标准语速音频时间拉伸得到（默认由 QWEN3_TTS_TIME_STRETCH 决定）"
+    ),
+    priority: Priority = Query(
+        "interactive", description="调度优先级 (interactive/bulk)，bulk 的多句文本逐句生成"
+    ),
+    sample_rate: Optional[int] = Query(
+        None, description="输出采样率 (8000/16000/22050/24000/44100/48000，默认为模型采样率)"
+    ),
+    trim_silence: bool = Query(False, description="裁掉首尾静音"),
+    loudness: Optional[float] = Query(
+        None, ge=-40.0, le=-5.0, description="响度归一化目标 (LUFS，EBU R128)"
+    ),
+    cancel: CancelToken = Depends(request_cancel_token),
 ):
     """
     文本转语音 API（与 Docker 版本兼容）
 
     性能: 3-7 秒（GPU 加速）vs 39-66 秒（Docker CPU）
     """
-    if model is None:
-        raise HTTPException(status_code=500, detail="Model not loaded")
+    _require_ready()
+    speaker = _require_speaker(speaker)
+
+    logger.info(
+        f"📝 TTS 请求: {text} (speaker={speaker}, speed={speed}, "
+        f"language={language}, format={format}, priority={priority})"
+    )
+
+    if sample_rate is not None and sample_rate not in SAMPLE_RATES:
+        raise HTTPException(status_code=400, detail=f"不支持的采样率: {sample_rate}")
+    post = PostProcess(sample_rate, trim_silence, loudness)
+    if format == "opus" and (sample_rate or backend.sample_rate) not in OPUS_SAMPLE_RATES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"opus 不支持采样率 {sample_rate or backend.sample_rate}",
+        )
+    variant = [format_variant(format)] + ([post.variant()] if post.active else [])
+    key = cache_key(text, speaker, speed, language, *variant)
+    cached = await asyncio.to_thread(audio_cache.get, key)
+    if cached is not None:
+        return _cached_response(key, cached)
+
+    async with cancel.watch_disconnect():
+        return await _synthesize_response(
+            key, text, speaker, speed, language, format, segment_cache, time_stretch,
+            priority, cancel, post
+        )
+
+
+async def _synthesize_response(
+    key: str, text: str, speaker: str, speed: float, language: str, format: str,
+    segment_cache: Optional[bool], time_stretch: Optional[bool], priority: str,
+    cancel: Optional[CancelToken] = None, post: PostProcess = PostProcess()
+) -> Response:
+    """缓存未命中：按请求选择时间拉伸或后处理、按句合成或整句生成"""
+    use_segments = SEGMENT_CACHE_ENABLED if segment_cache is None else segment_cache
+    use_stretch = TIME_STRETCH_ENABLED if time_stretch is None else time_stretch
+    stretch = use_stretch and abs(speed - CANONICAL_SPEED) >= 1e-3
+    if stretch or post.active:
+        return await _processed_response(
+            key, text, speaker, speed, language, format,
+            use_segments or priority == "bulk", priority, cancel, stretch, post
+        )
 
-    logger.info(f"📝 TTS 请求: {text} (speaker={speaker}, speed={speed}, language={language})")
+    # 低优先级的长文本总是逐句生成，高优先级请求可以插在句子之间执行
+    if use_segments or priority == "bulk":
+        sentences = split_sentences(text)
+        if len(sentences) > 1:
+            return await _segmented_response(
+                key, sentences, speaker, speed, language, format, priority, cancel
+            )
 
     try:
-        start_time = time.time()
-
-        # 生成语音
-        result_gen = model.generate(
-            text=text,
-            voice=speaker,
-            speed=speed,
-            stream=False
-        )
-
-        # 提取音频
-        audio_chunks = []
-        sample_rate = 24000
-        for chunk in result_gen:
-            if hasattr(chunk, 'audio'):
-                audio_chunks.append(chunk.audio)
-            if hasattr(chunk, 'sample_rate'):
-                sample_rate = chunk.sample_rate
-
-        if not audio_chunks:
-            raise Exception("未生成音频数据")
-
-        # 合并音频
-        if len(audio_chunks) == 1:
-            full_audio = audio_chunks[0]
-        else:
-            full_audio = mx.concatenate(audio_chunks, axis=0)
+        (result, entry), coalesced = await single_flight.run(
+            key, partial(_generate, key, text, speaker, speed, format, priority), cancel
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"❌ 生成失败: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
+    if coalesced:
+        logger.info(f"🔗 合并到进行中的相同请求: {key[:12]}")
+    gen_time = result["gen_time"]
+    return Response(
+        content=entry.data,
+        media_type=AUDIO_FORMATS[format][0],
+        headers={
+            "X-Cache": "MISS",
+            "X-Coalesced": "true" if coalesced else "false",
+            "X-Generation-Time": str(gen_time),
+            "X-Audio-Duration": str(result["duration"]),
+            "X-Realtime-Factor": str(result["duration"] / gen_time if gen_time > 0 else 0),
+            "X-Queue-Time": str(result["queue_time"]),
+            "X-Batch-Size": str(result["batch_size"]),
+            **_audio_headers(entry, result["encode_time"]),
+        }
+    )
+
+
+async def _sentence_audio(
+    sentences: list, speaker: str, speed: float, language: str,
+    priority: str = "interactive", cancel: Optional[CancelToken] = None
+) -> tuple:
+    """
+    按句缓存：取得每句的音频，只生成缓存中没有的句子，返回 (各句音频, 命中句数)
+
+    每句以原始 float32 采样缓存（格式 pcm）。缺失的句子每次最多提交一批
+    （音色与语速相同，可在推理线程中合并），既不会占满队列，也让其他请求
+    能插在批次之间执行；相同的句子经 single_flight 与其他请求共享生成。
+    """
+    keys = [cache_key(sentence, speaker, speed, language, "pcm") for sentence in sentences]
+    entries = await asyncio.to_thread(lambda: [audio_cache.get(k) for k in keys])
+    hits = sum(entry is not None for entry in entries)
+
+    missing = {
+        k: sentence for k, sentence, entry in zip(keys, sentences, entries) if entry is None
+    }
+    window = asyncio.Semaphore(max(1, BATCH_MAX_SIZE))
 
-        # 保存为 WAV
-        output_file = OUTPUT_DIR / f"tts_{int(time.time() * 1000)}.wav"
-        audio_np = np.array(full_audio)
-        sf.write(str(output_file), audio_np, sample_rate)
+    async def generate(k: str, sentence: str) -> tuple:
+        async with window:
+            return await single_flight.run(
+                k, partial(_generate, k, sentence, speaker, speed, "pcm", priority), cancel
+            )
 
-        gen_time = time.time() - start_time
-        duration = full_audio.shape[0] / sample_rate
-        realtime_factor = duration / gen_time if gen_time > 0 else 0
+    generated = await asyncio.gather(*(
+        generate(k, sentence) for k, sentence in missing.items()
+    ))
+    fresh = {k: entry for k, ((_, entry), _) in zip(missing, generated)}
 
+    segments = [
+        np.frombuffer((entry or fresh[k]).data, dtype=np.float32)
+        for k, entry in zip(keys, entries)
+    ]
+    return segments, hits
+
+
+async def _segmented_response(
+    key: str, sentences: list, speaker: str, speed: float, language: str,
+    audio_format: str, priority: str = "interactive", cancel: Optional[CancelToken] = None
+) -> Response:
+    """
+    多句文本按句合成，再把缓存的与新生成的句子交叉淡化拼接
+
+    拼接结果按请求格式编码后也写入整句缓存。
+    """
+    start_time = time.time()
+    try:
+        segments, hits = await _sentence_audio(
+            sentences, speaker, speed, language, priority, cancel
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"❌ 生成失败: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+    gen_time = time.time() - start_time
+
+    encode_start = time.time()
+    sample_rate = backend.sample_rate
+    audio = splice_audio(segments, sample_rate, SEGMENT_CROSSFADE_MS)
+    data = await asyncio.to_thread(encode_audio, [audio], sample_rate, audio_format)
+    encode_time = time.time() - encode_start
+
+    duration = audio.shape[0] / sample_rate
+    hit_ratio = hits / len(sentences)
+    logger.info(
+        f"🧩 按句合成完成: {len(sentences)} 句，命中 {hits} 句 ({hit_ratio:.0%})，"
+        f"耗时: {gen_time:.2f}s，音频时长: {duration:.2f}s"
+    )
+    entry = _store_result(key, {
+        "data": data,
+        "format": audio_format,
+        "duration": duration,
+        "encode_time": encode_time,
+    })
+    return Response(
+        content=entry.data,
+        media_type=AUDIO_FORMATS[audio_format][0],
+        headers={
+            "X-Cache": "MISS",
+            "X-Segment-Count": str(len(sentences)),
+            "X-Segment-Hits": str(hits),
+            "X-Segment-Hit-Ratio": f"{hit_ratio:.3f}",
+            "X-Generation-Time": str(gen_time),
+            "X-Audio-Duration": str(duration),
+            "X-Realtime-Factor": str(duration / gen_time if gen_time > 0 else 0),
+            **_audio_headers(entry, encode_time),
+        }
+    )
+
+
+async def _processed_response(
+    key: str, text: str, speaker: str, speed: float, language: str,
+    audio_format: str, segment_cache: bool, priority: str = "interactive",
+    cancel: Optional[CancelToken] = None, stretch: bool = False,
+    post: PostProcess = PostProcess(),
+) -> Response:
+    """
+    时间拉伸与后处理：取源音频（缓存或生成）的 pcm，处理后再编码
+
+    拉伸时源音频为标准语速，否则为请求的语速。源音频以 pcm 缓存，
+    之后任意语速或后处理参数的请求都只需在 pcm 上处理一次
+    （WSOLA 约 5-10 ms/秒音频），无需重新运行模型。
+    """
+    source_speed = CANONICAL_SPEED if stretch else speed
+    start_time = time.time()
+    sentences = split_sentences(text) if segment_cache else []
+    try:
+        if len(sentences) > 1:
+            segments, hits = await _sentence_audio(
+                sentences, speaker, source_speed, language, priority, cancel
+            )
+            base = splice_audio(segments, backend.sample_rate, SEGMENT_CROSSFADE_MS)
+            source_hit = hits == len(sentences)
+        else:
+            base_key = cache_key(text, speaker, source_speed, language, "pcm")
+            base_entry = await asyncio.to_thread(audio_cache.get, base_key)
+            source_hit = base_entry is not None
+            if base_entry is None:
+                (_, base_entry), _ = await single_flight.run(
+                    base_key,
+                    partial(_generate, base_key, text, speaker, source_speed, "pcm", priority),
+                    cancel,
+                )
+            base = np.frombuffer(base_entry.data, dtype=np.float32)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"❌ 生成失败: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+    gen_time = time.time() - start_time
+
+    sample_rate = backend.sample_rate
+    audio = base
+    headers = {}
+    if stretch:
+        stretch_start = time.time()
+        audio = await asyncio.to_thread(time_stretch, audio, speed / CANONICAL_SPEED, sample_rate)
+        stretch_time = time.time() - stretch_start
         logger.info(
-            f"✅ 语音生成完成，耗时: {gen_time:.2f}s "
-            f"(音频时长: {duration:.2f}s, 实时率: {realtime_factor:.2f}x)"
-        )
-
-        return FileResponse(
-            output_file,
-            media_type="audio/wav",
-            filename="output.wav",
-            headers={
-                "X-Generation-Time": str(gen_time),
-                "X-Audio-Duration": str(duration),
-                "X-Realtime-Factor": str(realtime_factor)
-            }
+            f"⏩ 时间拉伸完成: {CANONICAL_SPEED}x → {speed}x ({TIME_STRETCH_METHOD}, "
+            f"{stretch_time * 1000:.0f}ms, 源音频{'命中缓存' if source_hit else '新生成'})"
+        )
+        headers.update({
+            "X-Time-Stretch": f"{CANONICAL_SPEED}->{speed} {TIME_STRETCH_METHOD}",
+            "X-Stretch-Source": "cache" if source_hit else "generated",
+            "X-Stretch-Time": str(stretch_time),
+        })
+    if post.active:
+        post_start = time.time()
+        audio, sample_rate = await asyncio.to_thread(post.apply, audio, sample_rate)
+        post_time = time.time() - post_start
+        logger.info(
+            f"🎚️ 后处理完成: {post.variant()} ({post_time * 1000:.0f}ms, "
+            f"源音频{'命中缓存' if source_hit else '新生成'})"
         )
+        headers.update({
+            "X-Post-Process": post.variant(),
+            "X-Post-Process-Source": "cache" if source_hit else "generated",
+            "X-Post-Process-Time": str(post_time),
+        })
+
+    encode_start = time.time()
+    data = await asyncio.to_thread(encode_audio, [audio], sample_rate, audio_format)
+    encode_time = time.time() - encode_start
 
+    duration = audio.shape[0] / sample_rate
+    entry = _store_result(key, {
+        "data": data,
+        "format": audio_format,
+        "duration": duration,
+        "encode_time": encode_time,
+    })
+    return Response(
+        content=entry.data,
+        media_type=AUDIO_FORMATS[audio_format][0],
+        headers={
+            "X-Cache": "MISS",
+            **headers,
+            "X-Sample-Rate": str(sample_rate),
+            "X-Generation-Time": str(gen_time),
+            "X-Audio-Duration": str(duration),
+            # 源音频命中缓存时与缓存命中一样报告 0
+            "X-Realtime-Factor": str(
+                duration / gen_time if gen_time > 0 and not source_hit else 0
+            ),
+            **_audio_headers(entry, encode_time),
+        }
+    )
+
+
+async def _generate(
+    key: str, text: str, speaker: str, speed: float, audio_format: str,
+    priority: str = "interactive", cancel: Optional[CancelToken] = None
+) -> tuple:
+    """提交生成任务，记录日志与指标并写入缓存，返回 (结果, 缓存条目)"""
+    queued_at = time.time()
+    try:
+        async with bulk_slots if priority == "bulk" else contextlib.nullcontext():
+            result = await _submit(
+                _synthesize_batch, text, speaker, speed, audio_format,
+                batch_key=(speaker, speed), priority=priority, cancel=cancel
+            )
+    except JobCancelledError as e:
+        raise _cancelled_error(e) from e
+    gen_time = result["gen_time"]
+    duration = result["duration"]
+    result["queue_time"] = queue_time = time.time() - queued_at - gen_time
+    realtime_factor = duration / gen_time if gen_time > 0 else 0
+
+    logger.info(
+        f"✅ 语音生成完成，耗时: {gen_time:.2f}s "
+        f"(排队: {queue_time:.2f}s, 音频时长: {duration:.2f}s, 实时率: {realtime_factor:.2f}x)"
+    )
+    metrics.observe_result(result, queue_time, speaker, priority)
+    return result, _store_result(key, result)
+
+
+@app.post("/api/tts/stream")
+async def text_to_speech_stream(
+    text: str = Query(..., description="要合成的文本"),
+    speed: float = Query(1.0, ge=0.5, le=2.0, description="语速倍率 (0.5-2.0)"),
+    language: Optional[str] = Query("Chinese", description="语言"),
+    speaker: Optional[str] = Query("Vivian", description="音色"),
+    priority: Priority = Query("interactive", description="调度优先级 (interactive/bulk)"),
+    cancel: CancelToken = Depends(request_cancel_token),
+):
+    """
+    流式文本转语音 API
+
+    使用模型的流式生成器，每解码出一个音频块就通过 chunked 传输发送。
+    多句文本逐句生成，首个音频块的延迟只取决于第一句的长度，高优先级请求
+    可以插在句子之间执行。客户端中途断开时停止生成。
+    """
+    _require_ready()
+    speaker = _require_speaker(speaker)
+
+    logger.info(f"📝 流式 TTS 请求: {text} (speaker={speaker}, speed={speed}, language={language})")
+
+    key = cache_key(text, speaker, speed, language, format_variant("wav"))
+    cached = await asyncio.to_thread(audio_cache.get, key)
+    if cached is not None:
+        return _cached_response(key, cached)
+
+    sentences = split_sentences(text)
+    if len(sentences) < 2:
+        sentences = [text]
+    timing: dict = {}
+    stream = _stream_sentences(key, sentences, speaker, speed, priority, cancel, timing)
+
+    # 等到第一个音频块再返回响应，生成失败时仍可返回正确的状态码
+    try:
+        async with cancel.watch_disconnect():
+            first = await anext(stream)
+    except HTTPException:
+        raise
+    except JobCancelledError as e:
+        raise _cancelled_error(e) from e
     except Exception as e:
         logger.error(f"❌ 生成失败: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
+    async def body():
+        try:
+            yield first
+            async for data in stream:
+                yield data
+        finally:
+            await stream.aclose()
+
+    return StreamingResponse(
+        body(),
+        media_type="audio/wav",
+        headers={
+            "X-Cache": "MISS",
+            "X-Queue-Time": str(timing["queue_time"]),
+            "X-First-Chunk-Time": str(timing["first_chunk_time"]),
+        }
+    )
+
+
+async def _stream_sentences(
+    key: str, sentences: list, speaker: str, speed: float, priority: str,
+    cancel: CancelToken, timing: Optional[dict] = None
+) -> AsyncIterator[bytes]:
+    """
+    逐句提交流式生成任务，依次产出各句的音频块（第一块前加 WAV 头）
+
+    每句是推理队列中的一个任务，上一句生成完才提交下一句，因此高优先级
+    请求最多等待正在生成的一句。bulk 句子与 _generate 一样占用 bulk_slots，
+    不会挤占其他 bulk 请求的队列空位。第一句提交时队列已满返回 503，之后的
+    句子等待空位，不中断已经开始的响应。全部句子生成完后整段写入缓存。
+
+    产出第一块时 timing 中已有第一句的排队时间 queue_time 与服务器收到
+    请求到第一块的耗时 first_chunk_time（流式响应在生成完成前发送响应头，
+    只能报告这两项）。
+    """
+    timing = {} if timing is None else timing
+    loop = asyncio.get_running_loop()
+    started = time.time()
+    results = []
+    future = None
+    sent = False
+    try:
+        for index, sentence in enumerate(sentences):
+            chunks: "asyncio.Queue[Optional[bytes]]" = asyncio.Queue()
+
+            def emit(data: Optional[bytes], chunks=chunks) -> None:
+                loop.call_soon_threadsafe(chunks.put_nowait, data)
+
+            queued_at = time.time()
+            try:
+                async with bulk_slots if priority == "bulk" else contextlib.nullcontext():
+                    if index == 0:
+                        future = _submit(
+                            _synthesize_stream, sentence, speaker, speed, emit,
+                            priority=priority, cancel=cancel,
+                        )
+                    else:
+                        future = await _submit_waiting(
+                            _synthesize_stream, sentence, speaker, speed, emit,
+                            priority=priority, cancel=cancel,
+                        )
+                    # 任务在排队时被取消就不会执行，也不会推送结束标记
+                    future.add_done_callback(lambda _, chunks=chunks: chunks.put_nowait(None))
+                    while (data := await chunks.get()) is not None:
+                        if not data:
+                            timing.setdefault("queue_time", time.time() - queued_at)
+                            continue
+                        if not sent:
+                            timing["first_chunk_time"] = time.time() - started
+                            data = wav_header(None, backend.sample_rate, WAV_SAMPLE_FORMAT) + data
+                            sent = True
+                        yield data
+                    result = await future
+            except Exception as e:
+                if not sent:
+                    raise
+                # 响应已经开始，只能提前结束音频流
+                if isinstance(e, JobCancelledError):
+                    logger.warning(f"⏱️ 流式生成第 {index + 1}/{len(sentences)} 句{e}")
+                else:
+                    logger.error(f"❌ 流式生成第 {index + 1}/{len(sentences)} 句失败: {e}")
+                return
+            metrics.observe_result(
+                result, time.time() - queued_at - result["gen_time"], speaker, priority
+            )
+            results.append(result)
+    finally:
+        # 客户端断开时响应被取消，推理线程在下一个音频块之前停止
+        if future is not None and not future.done():
+            cancel.cancel("disconnect")
+            # 不再有人等待这个任务，避免 "exception was never retrieved" 警告
+            future.add_done_callback(lambda f: f.cancelled() or f.exception())
+
+    gen_time = time.time() - started
+    num_samples = sum(result["num_samples"] for result in results)
+    duration = num_samples / backend.sample_rate
+    logger.info(
+        f"✅ 流式生成完成，{len(sentences)} 句，耗时: {gen_time:.2f}s "
+        f"(首块: {results[0]['first_chunk_time']:.2f}s, "
+        f"音频时长: {duration:.2f}s, 实时率: {duration / gen_time if gen_time > 0 else 0:.2f}x)"
+    )
+    _store_result(key, {
+        "data": wav_header(num_samples, backend.sample_rate, WAV_SAMPLE_FORMAT)
+        + b"".join(result["pcm"] for result in results),
+        "format": "wav",
+        "encode_time": 0.0,
+        "duration": duration,
+    })
+
+
+class PrewarmItem(BaseModel):
+    """预热条目"""
+
+    text: str = Field(..., min_length=1, description="要合成的文本")
+    speaker: str = Field("Vivian", description="音色")
+    speed: float = Field(1.0, ge=0.5, le=2.0, description="语速倍率 (0.5-2.0)")
+    language: str = Field("Chinese", description="语言")
+    format: AudioFormat = Field("wav", description="输出格式 (wav/flac/opus/mp3)")
+
+
+class PrewarmRequest(BaseModel):
+    """批量预热请求"""
+
+    items: list[PrewarmItem] = Field(..., min_length=1, max_length=1000)
+
+
+@dataclass
+class PrewarmJob:
+    """后台预热任务及其进度"""
+
+    job_id: str
+    items: list
+    done: int = 0
+    cached: int = 0
+    failed: int = 0
+    status: str = "running"
+    created: float = field(default_factory=time.time)
+
+    def progress(self) -> dict:
+        return {
+            "job_id": self.job_id,
+            "status": self.status,
+            "total": len(self.items),
+            "done": self.done,
+            "cached": self.cached,
+            "failed": self.failed,
+        }
+
+
+prewarm_jobs: "OrderedDict[str, PrewarmJob]" = OrderedDict()
+# 持有后台任务的引用，防止被垃圾回收
+_background_tasks: set = set()
+
+
+async def _run_prewarm(job: PrewarmJob) -> None:
+    """
+    逐条合成预热条目并写入缓存
+
+    低优先级：只在推理队列完全空闲时提交下一条，不与实时请求争抢 GPU。
+    与 bulk 请求走相同的 _generate 路径（占用 bulk_slots、记录指标），
+    相同的请求正在生成时合并到它。
+    全部处理完后状态为 completed，被意外异常中断时为 failed。
+    """
+    try:
+        for item in job.items:
+            key = cache_key(
+                item.text, item.speaker, item.speed, item.language, format_variant(item.format)
+            )
+            if audio_cache.contains(key):
+                job.cached += 1
+                job.done += 1
+                continue
+
+            generate = partial(
+                _generate, key, item.text, item.speaker, item.speed, item.format, "bulk"
+            )
+            try:
+                while True:
+                    # 相同的请求正在生成时不必等待队列空闲，直接等它写入缓存
+                    while single_flight.get(key) is None and (
+                        worker.queue_depth > 0 or worker.in_flight > 0
+                    ):
+                        await asyncio.sleep(PREWARM_IDLE_POLL)
+                    try:
+                        _, coalesced = await single_flight.run(key, generate)
+                        break
+                    except HTTPException as e:
+                        # 空闲后实时请求又填满了队列：等下一次空闲
+                        if e.status_code != 503:
+                            raise
+                if coalesced:
+                    job.cached += 1
+            except Exception as e:  # pylint: disable=broad-except
+                job.failed += 1
+                logger.warning(f"⚠️ 预热失败: {item.text[:30]} ({e})")
+            job.done += 1
+
+        job.status = "completed"
+    except Exception as e:  # pylint: disable=broad-except
+        logger.error(f"❌ 预热任务 {job.job_id} 中断: {e}")
+    finally:
+        # 任何异常（包括关闭时的取消）都要给任务一个终态，客户端才会停止轮询
+        if job.status == "running":
+            job.status = "failed"
+
+    logger.info(
+        f"🔥 预热任务 {job.job_id} 结束 ({job.status}): {job.done} 条 "
+        f"(已缓存 {job.cached}, 失败 {job.failed})"
+    )
+
+
+@app.post("/api/tts/prewarm", status_code=202)
+async def prewarm(request: PrewarmRequest):
+    """
+    批量预热 API
+
+    在后台以低优先级合成一组短语并写入音频缓存（含磁盘层），
+    之后对这些短语的请求都会直接命中缓存。
+    """
+    _require_ready()
+    for item in request.items:
+        item.speaker = _require_speaker(item.speaker)
+
+    job = PrewarmJob(job_id=uuid.uuid4().hex[:12], items=request.items)
+    prewarm_jobs[job.job_id] = job
+    while len(prewarm_jobs) > PREWARM_MAX_JOBS:
+        prewarm_jobs.popitem(last=False)
+
+    logger.info(f"🔥 预热任务 {job.job_id}: {len(job.items)} 条")
+    task = asyncio.create_task(_run_prewarm(job))
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+    return job.progress()
+
+
+@app.get("/api/tts/prewarm/{job_id}")
+async def prewarm_status(job_id: str):
+    """查询预热任务进度"""
+    job = prewarm_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown prewarm job")
+    return job.progress()
+
+
+@app.get("/api/list_speakers")
+async def list_speakers(request: Request):
+    """
+    音色列表 API
+
+    响应带 ETag，客户端可用 If-None-Match 条件请求，列表未变化时返回 304。
+    """
+    body = json.dumps(
+        {"speakers": [{"name": name} for name in backend.speakers]},
+        ensure_ascii=False,
+    ).encode("utf-8")
+    etag = f'"{hashlib.sha256(body).hexdigest()[:16]}"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if request.headers.get("If-None-Match") == etag:
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+@app.get("/api/voices")
+async def list_voices():
+    """音色列表：内置音色与自定义音色（含注册信息）"""
+    custom = voice_registry.list()
+    names = {voice["name"] for voice in custom}
+    return {
+        "voices": [
+            {"name": name, "builtin": True} for name in backend.speakers if name not in names
+        ] + [{**voice, "builtin": False} for voice in custom]
+    }
+
+
+@app.get("/api/voices/{name}")
+async def get_voice(name: str):
+    """自定义音色的注册信息"""
+    voice = voice_registry.get(name)
+    if voice is None:
+        raise HTTPException(status_code=404, detail=f"自定义音色不存在: {name}")
+    return {**voice, "builtin": False}
+
+
+@app.put("/api/voices/{name}", status_code=201)
+async def register_voice(
+    name: str,
+    request: Request,
+    transcript: str = Query("", description="参考音频对应的文本（可选，提供时克隆效果更好）"),
+):
+    """
+    注册自定义音色：请求体为参考音频（WAV/FLAC/OGG/MP3，1-30 秒）
+
+    说话人条件只在注册时计算一次并保存到磁盘，之后用这个音色合成与内置音色
+    开销相同。同名音色会被替换，音频缓存中旧音色的结果不再命中。
+    模型不支持声音克隆（非 Base 模型）时返回 501。
+    """
+    _require_ready()
+    _require_voice_cloning()
+    if not VOICE_NAME_PATTERN.match(name):
+        raise HTTPException(
+            status_code=400, detail="音色名称只能包含字母、数字、汉字、下划线与连字符（最多 64 个字符）"
+        )
+    if name in backend.speakers and voice_registry.get(name) is None:
+        raise HTTPException(status_code=409, detail=f"不能替换内置音色: {name}")
+    if int(request.headers.get("Content-Length") or 0) > VOICE_MAX_BYTES:
+        raise HTTPException(status_code=413, detail=f"参考音频超过 {VOICE_MAX_BYTES} 字节")
+    data = await request.body()
+    if len(data) > VOICE_MAX_BYTES:
+        raise HTTPException(status_code=413, detail=f"参考音频超过 {VOICE_MAX_BYTES} 字节")
+
+    try:
+        audio = await asyncio.to_thread(decode_reference_audio, data, backend.sample_rate)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    duration = audio.shape[0] / backend.sample_rate
+    if not VOICE_MIN_SECONDS <= duration <= VOICE_MAX_SECONDS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"参考音频时长 {duration:.1f}s 超出范围 ({VOICE_MIN_SECONDS:g}-{VOICE_MAX_SECONDS:g}s)",
+        )
+
+    start_time = time.time()
+    try:
+        conditioning = await _submit(_compute_voice, audio, transcript, priority="bulk")
+    except HTTPException:
+        raise
+    except NotImplementedError as e:
+        raise HTTPException(status_code=501, detail=str(e))
+    except Exception as e:
+        logger.error(f"❌ 计算音色失败: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+    compute_time = time.time() - start_time
+
+    meta = {
+        "transcript": transcript,
+        "duration": round(duration, 3),
+        "sample_rate": backend.sample_rate,
+        "created": time.time(),
+        "compute_time": round(compute_time, 3),
+    }
+    conditioning = await asyncio.to_thread(voice_registry.save, name, meta, conditioning)
+    await _submit(_add_voice, name, conditioning)
+    voice = voice_registry.get(name)
+    logger.info(
+        f"🎙️ 注册自定义音色: {name} (参考音频 {duration:.1f}s，"
+        f"计算耗时 {compute_time:.2f}s，指纹 {voice['fingerprint']})"
+    )
+    return JSONResponse(status_code=201, content={**voice, "builtin": False})
+
+
+@app.delete("/api/voices/{name}", status_code=204)
+async def delete_voice(name: str):
+    """删除自定义音色（内置音色不能删除）"""
+    _require_ready()
+    _require_voice_cloning()
+    if voice_registry.get(name) is None:
+        if name in backend.speakers:
+            raise HTTPException(status_code=409, detail=f"不能删除内置音色: {name}")
+        raise HTTPException(status_code=404, detail=f"自定义音色不存在: {name}")
+    await _submit(_remove_voice, name)
+    await asyncio.to_thread(voice_registry.delete, name)
+    logger.info(f"🗑️ 删除自定义音色: {name}")
+    return Response(status_code=204)
+
 
 @app.post("/api/tts_to_speaker")
 async def tts_to_speaker(
     text: str = Query(..., description="要合成的文本"),
     speaker: str = Query(..., description="音色名称"),
-    speed: float = Query(1.0, ge=0.5, le=2.0, description="语速倍率")
+    speed: float = Query(1.0, ge=0.5, le=2.0, description="语速倍率"),
+    cancel: CancelToken = Depends(request_cancel_token),
 ):
     """
     指定音色的 TTS API（与 Docker 版本兼容）
@@ -176,10 +3413,142 @@ async def tts_to_speaker(
         text=text,
         speed=speed,
         language="Chinese",
-        speaker=speaker
+        speaker=speaker,
+        format="wav",
+        segment_cache=None,
+        time_stretch=None,
+        priority="interactive",
+        sample_rate=None,
+        trim_silence=False,
+        loudness=None,
+        cancel=cancel,
+    )
+
+
+
+class TTSRequest(BaseModel):
+    """v2 合成请求（JSON 请求体，文本不出现在 URL 与访问日志中）"""
+
+    text: str = Field(..., min_length=1, description="要合成的文本")
+    speaker: str = Field("Vivian", description="音色")
+    speed: float = Field(1.0, ge=0.5, le=2.0, description="语速倍率 (0.5-2.0)")
+    language: str = Field("Chinese", description="语言")
+    format: AudioFormat = Field("wav", description="输出格式 (wav/flac/opus/mp3)")
+    segment_cache: Optional[bool] = Field(None, description="多句文本按句生成并缓存")
+    time_stretch: Optional[bool] = Field(None, description="非标准语速由时间拉伸得到")
+    priority: Priority = Field("interactive", description="调度优先级 (interactive/bulk)")
+    sample_rate: Optional[int] = Field(None, description="输出采样率（默认为模型采样率）")
+    trim_silence: bool = Field(False, description="裁掉首尾静音")
+    loudness: Optional[float] = Field(
+        None, ge=-40.0, le=-5.0, description="响度归一化目标 (LUFS，EBU R128)"
+    )
+
+
+class TTSBatchRequest(BaseModel):
+    """v2 批量合成请求"""
+
+    items: list[TTSRequest] = Field(..., min_length=1, max_length=BATCH_MAX_ITEMS)
+
+
+@app.post("/api/v2/tts")
+async def text_to_speech_v2(
+    request: TTSRequest, cancel: CancelToken = Depends(request_cancel_token)
+):
+    """文本转语音 API v2：参数与 /api/tts 相同，通过 JSON 请求体传递"""
+    return await text_to_speech(**request.model_dump(), cancel=cancel)
+
+
+@app.post("/api/v2/tts/stream")
+async def text_to_speech_stream_v2(
+    request: TTSRequest, cancel: CancelToken = Depends(request_cancel_token)
+):
+    """流式文本转语音 API v2（format、segment_cache、time_stretch 与后处理参数不适用）"""
+    return await text_to_speech_stream(
+        text=request.text,
+        speed=request.speed,
+        language=request.language,
+        speaker=request.speaker,
+        priority=request.priority,
+        cancel=cancel,
     )
 
 
+def _batch_frame(header: dict, data: bytes = b"") -> bytes:
+    """批量响应中的一帧: [头长度 u32][音频长度 u32][JSON 头][音频]（大端）"""
+    header_bytes = json.dumps(header, ensure_ascii=False).encode("utf-8")
+    return struct.pack(">II", len(header_bytes), len(data)) + header_bytes + data
+
+
+async def _batch_item(
+    index: int, item: TTSRequest, window: asyncio.Semaphore, cancel: CancelToken,
+    received_at: float
+) -> bytes:
+    """合成一个批量条目，成功或失败都编码为一帧（elapsed 为收到批量请求到该条目完成的秒数）"""
+    async with window:
+        try:
+            response = await text_to_speech(**item.model_dump(), cancel=cancel)
+        except HTTPException as e:
+            return _batch_frame({"index": index, "status": e.status_code, "error": str(e.detail)})
+        except Exception as e:  # pylint: disable=broad-except
+            logger.error(f"❌ 批量条目 {index} 生成失败: {e}", exc_info=True)
+            return _batch_frame({"index": index, "status": 500, "error": str(e)})
+    headers = response.headers
+    return _batch_frame({
+        "index": index,
+        "status": 200,
+        "format": headers.get("X-Audio-Format", item.format),
+        "media_type": response.media_type,
+        "cache": headers.get("X-Cache"),
+        "duration": float(headers.get("X-Audio-Duration", 0)),
+        "generation_time": float(headers.get("X-Generation-Time", 0)),
+        "elapsed": time.time() - received_at,
+    }, response.body)
+
+
+@app.post("/api/v2/tts/batch")
+async def text_to_speech_batch(
+    request: TTSBatchRequest, cancel: CancelToken = Depends(request_cancel_token)
+):
+    """
+    批量合成 API：一次请求合成多个条目，按完成顺序流式返回
+
+    响应是长度前缀的二进制流 (application/x-qwen3-tts-batch)，每个条目一帧：
+    4 字节 JSON 头长度 + 4 字节音频长度（均为大端 u32）+ JSON 头 + 音频。
+    JSON 头包含 index（请求中的位置）、status 与 elapsed（收到请求到该条目
+    完成的秒数）；失败的条目 status 非 200，
+    音频长度为 0，error 为错误信息。相同音色与语速的条目可合并生成。
+    所有条目共用请求的截止时间；客户端断开时放弃尚未完成的条目。
+    """
+    _require_ready()
+    received_at = time.time()
+    logger.info(f"📦 批量 TTS 请求: {len(request.items)} 条")
+
+    # 条目不轮询连接（响应流自己检测断开），只继承截止时间
+    items_cancel = CancelToken(cancel.deadline)
+    # 多句条目每条最多同时提交一个微批，限制同时处理的条目数使总数不超过队列容量
+    window = asyncio.Semaphore(max(1, MAX_QUEUE_SIZE // max(1, BATCH_MAX_SIZE)))
+    tasks = [
+        asyncio.ensure_future(_batch_item(index, item, window, items_cancel, received_at))
+        for index, item in enumerate(request.items)
+    ]
+
+    async def body():
+        try:
+            for next_frame in asyncio.as_completed(tasks):
+                yield await next_frame
+        finally:
+            # 客户端断开时取消尚未开始的条目，并放弃已排队或生成中的条目
+            if not all(task.done() for task in tasks):
+                items_cancel.cancel("disconnect")
+            for task in tasks:
+                task.cancel()
+
+    return StreamingResponse(
+        body(),
+        media_type="application/x-qwen3-tts-batch",
+        headers={"X-Batch-Items": str(len(tasks))},
+    )
+
 if __name__ == "__main__":
     import uvicorn
 
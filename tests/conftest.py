@@ -0,0 +1,107 @@
+"""Shared fixtures: mlx-server.py running on the deterministic stub backend."""
+from __future__ import annotations
+
+import contextlib
+import importlib.util
+from pathlib import Path
+import sys
+import time
+from types import SimpleNamespace
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Integration modules are imported as custom_components.qwen3_tts.*
+sys.path.insert(0, str(ROOT))
+
+
+@pytest.fixture(scope="session")
+def server(tmp_path_factory):
+    """The mlx-server module, configured through its environment before import.
+
+    The stub backend generates audio about 50x faster than real time, so a
+    test sentence takes a few tens of milliseconds.
+    """
+    env = {
+        "QWEN3_TTS_BACKEND": "stub",
+        "QWEN3_TTS_WARMUP": "0",
+        "QWEN3_TTS_STUB_RTF": "50",
+        "QWEN3_TTS_STUB_OVERHEAD": "0.01",
+        "QWEN3_TTS_CACHE_DIR": str(tmp_path_factory.mktemp("cache")),
+        "QWEN3_TTS_VOICES_DIR": str(tmp_path_factory.mktemp("voices")),
+    }
+    with pytest.MonkeyPatch.context() as mp:
+        for name, value in env.items():
+            mp.setenv(name, value)
+        spec = importlib.util.spec_from_file_location("mlx_server", ROOT / "mlx-server.py")
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[spec.name] = module
+        spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture(scope="session")
+def client(server):
+    """An HTTP client for the server, returned once the model is ready."""
+    from fastapi.testclient import TestClient
+
+    with TestClient(server.app) as client:
+        deadline = time.time() + 10
+        while client.get("/ready").status_code != 200:
+            assert time.time() < deadline, "stub server did not become ready"
+            time.sleep(0.05)
+        yield client
+
+
+@pytest.fixture
+def make_worker(server):
+    """Build InferenceWorker instances that are stopped after the test."""
+    workers = []
+
+    def make(max_queue: int = 8, **kwargs):
+        worker = server.InferenceWorker(max_queue, **kwargs)
+        workers.append(worker)
+        return worker
+
+    yield make
+    for worker in workers:
+        worker.stop()
+
+
+@pytest.fixture
+def serve_entity():
+    """Run an aiohttp app on localhost and yield an integration entity using it.
+
+    The entity's statistics are available as entity._stats and its server as
+    entity._pool.backends[0].
+    """
+    pytest.importorskip("homeassistant")
+    import aiohttp
+    from aiohttp import web
+
+    from custom_components.qwen3_tts.pool import ServerPool
+    from custom_components.qwen3_tts.speakers import SpeakerDirectory
+    from custom_components.qwen3_tts.stats import RequestStats
+    from custom_components.qwen3_tts.tts import Qwen3TTSEntity
+
+    @contextlib.asynccontextmanager
+    async def serve(app, api_version: int = 1, **data):
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        try:
+            async with aiohttp.ClientSession() as session:
+                pool = ServerPool(None, session, [f"http://127.0.0.1:{port}"])
+                pool.backends[0].api_version = api_version
+                entry = SimpleNamespace(entry_id="test", title="test", data=data)
+                yield Qwen3TTSEntity(
+                    None, pool, session, RequestStats(), SpeakerDirectory(None, session, pool),
+                    1.0, "Vivian", 60, entry,
+                )
+        finally:
+            await runner.cleanup()
+
+    return serve
@@ -0,0 +1,49 @@
+"""Tests for the synthesis backend interface and the stub backend."""
+import numpy as np
+import pytest
+
+
+@pytest.fixture
+def stub(server):
+    backend = server.StubBackend(rtf=1000, overhead=0)
+    backend.load()
+    return backend
+
+
+def test_stub_is_deterministic(stub):
+    first = np.concatenate(stub.generate("确定性输出", "Vivian", 1.0))
+    second = np.concatenate(stub.generate("确定性输出", "Vivian", 1.0))
+    np.testing.assert_array_equal(first, second)
+    other = np.concatenate(stub.generate("确定性输出", "Ethan", 1.0))
+    assert not np.array_equal(first, other)
+
+
+def test_duration_follows_text_length_and_speed(stub):
+    def seconds(text, speed):
+        return sum(chunk.shape[0] for chunk in stub.generate(text, "Vivian", speed)) / 24000
+
+    assert seconds("十个字的一句话啊啊", 1.0) == pytest.approx(9 * 0.2, rel=0.01)
+    assert seconds("十个字的一句话啊啊", 2.0) == pytest.approx(9 * 0.1, rel=0.01)
+
+
+def test_stream_yields_the_same_audio(stub):
+    streamed = np.concatenate(list(stub.stream("流式与整段一致", "Vivian", 1.0)))
+    whole = np.concatenate(stub.generate("流式与整段一致", "Vivian", 1.0))
+    np.testing.assert_array_equal(streamed, whole)
+
+
+def test_batches_match_single_generation(stub):
+    texts = ["第一条", "第二条更长一些"]
+    batch = stub.batch_generate(texts, "Vivian", 1.0)
+    for text, chunks in zip(texts, batch):
+        np.testing.assert_array_equal(
+            np.concatenate(chunks), np.concatenate(stub.generate(text, "Vivian", 1.0))
+        )
+
+
+def test_base_backend_has_no_optional_capabilities(server):
+    base = server.SynthesisBackend()
+    assert not base.supports_batch
+    assert not base.supports_voices
+    with pytest.raises(NotImplementedError):
+        base.compute_voice(np.zeros(10, dtype=np.float32), "")
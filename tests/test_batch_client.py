@@ -0,0 +1,47 @@
+"""Tests for the integration's v2 batch client."""
+import asyncio
+
+import pytest
+
+pytest.importorskip("homeassistant")
+
+from aiohttp import web  # noqa: E402
+
+
+def batch_server(status):
+    app = web.Application()
+
+    async def handle(request):
+        return web.Response(status=status, text="batch failed")
+
+    app.router.add_post("/api/v2/tts/batch", handle)
+    return app
+
+
+async def fetch_batch(serve_entity, status):
+    async with serve_entity(batch_server(status), api_version=2) as entity:
+        backend = entity._pool.backends[0]
+        deadline = asyncio.get_running_loop().time() + 5
+        parts = await entity._async_fetch_batch(
+            backend, ["第一句。", "第二句。"], 1.0, "Vivian", "wav", "interactive", deadline
+        )
+        return parts, entity, backend
+
+
+@pytest.mark.parametrize(
+    ("status", "errors", "timeouts", "failures"),
+    [(500, 1, 0, 1), (503, 1, 0, 0), (504, 0, 1, 1), (400, 1, 0, 0)],
+)
+def test_failed_batches_are_counted(serve_entity, status, errors, timeouts, failures):
+    parts, entity, backend = asyncio.run(fetch_batch(serve_entity, status))
+    # Every segment is left for the per-segment fallback
+    assert parts == [None, None]
+    assert (entity._stats.errors, entity._stats.timeouts) == (errors, timeouts)
+    assert backend.failures == failures
+    assert backend.api_version == 2
+
+
+def test_servers_without_batches_fall_back_to_v1(serve_entity):
+    parts, entity, backend = asyncio.run(fetch_batch(serve_entity, 404))
+    assert parts == [None, None]
+    assert (entity._stats.errors, backend.failures, backend.api_version) == (0, 0, 1)
@@ -0,0 +1,47 @@
+"""Tests for dynamic micro-batching in the inference worker."""
+import asyncio
+
+
+def test_compatible_jobs_run_as_one_batch(make_worker):
+    worker = make_worker(max_batch=4, batch_wait=0.05)
+    calls = []
+
+    def run(requests, cancels):
+        calls.append([text for text, in requests])
+        return [text.upper() for text, in requests]
+
+    async def main():
+        futures = [worker.submit(run, text, batch_key=("Vivian", 1.0)) for text in "abc"]
+        other = worker.submit(run, "d", batch_key=("Ethan", 1.0))
+        worker.start()
+        return await asyncio.gather(*futures, other)
+
+    assert asyncio.run(main()) == ["A", "B", "C", "D"]
+    assert calls == [["a", "b", "c"], ["d"]]
+    assert worker.batch_stats()["max_seen_batch_size"] == 3
+
+
+def test_batch_size_is_bounded(make_worker):
+    worker = make_worker(max_batch=2, batch_wait=0.05)
+    calls = []
+
+    def run(requests, cancels):
+        calls.append(len(requests))
+        return [None] * len(requests)
+
+    async def main():
+        futures = [worker.submit(run, i, batch_key=("Vivian", 1.0)) for i in range(5)]
+        worker.start()
+        await asyncio.gather(*futures)
+
+    asyncio.run(main())
+    assert calls == [2, 2, 1]
+
+
+def test_stub_batch_generates_each_request(server):
+    requests = [("你好", "Vivian", 1.0, "wav"), ("晚安，祝你好梦", "Vivian", 1.0, "wav")]
+    results = server._synthesize_batch(requests)
+    assert [result["batch_size"] for result in results] == [2, 2]
+    # Longer text, longer audio
+    assert results[1]["duration"] > results[0]["duration"]
+    assert all(result["data"].startswith(b"RIFF") for result in results)
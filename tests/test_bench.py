@@ -0,0 +1,66 @@
+"""Tests for the load-generation benchmark."""
+import asyncio
+import importlib.util
+from pathlib import Path
+import random
+
+import numpy as np
+import pytest
+
+pytest.importorskip("aiohttp")
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+@pytest.fixture(scope="module")
+def bench():
+    spec = importlib.util.spec_from_file_location("tts_bench", ROOT / "tts-bench.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_workloads_are_reproducible(bench):
+    for make_text in bench.WORKLOADS.values():
+        assert make_text(random.Random(1)) == make_text(random.Random(1))
+    assert 300 <= len(bench.long_text(random.Random(2))) < 700
+
+
+def test_wav_duration_of_whole_and_streamed_files(bench, server):
+    samples = [np.zeros(24000, dtype=np.float32)]
+    assert bench.wav_duration(server.encode_wav(samples, 24000)) == pytest.approx(1.0)
+    streamed = server.wav_header(None, 24000, "int16") + server.pcm_bytes(samples[0])[:24000]
+    assert bench.wav_duration(streamed) == pytest.approx(0.5)
+    assert bench.wav_duration(b"not a wav") is None
+
+
+def test_summary(bench):
+    samples = [
+        bench.Sample(0, 1.0, True, ttfb=0.2, audio_duration=2.0, bytes=10, cache_hit=False),
+        bench.Sample(0, 3.0, True, ttfb=0.4, audio_duration=3.0, bytes=30, cache_hit=True),
+        bench.Sample(0, 5.0, False, error="status 503"),
+    ]
+    summary = bench.summarize(samples, wall_time=4.0)
+    assert (summary["requests"], summary["ok"], summary["errors"]) == (3, 2, 1)
+    assert summary["error_types"] == {"status 503": 1}
+    assert summary["latency"]["p50"] == 2.0
+    assert summary["ttfb"]["max"] == 0.4
+    assert summary["realtime_factor"]["mean"] == 1.5
+    assert summary["cache_hit_ratio"] == 0.5
+    assert summary["bytes_received"] == 40
+
+
+def test_closed_loop_sends_the_requested_number(bench):
+    class Client:
+        in_flight = peak = 0
+
+        async def synthesize(self, text):
+            Client.in_flight += 1
+            Client.peak = max(Client.peak, Client.in_flight)
+            await asyncio.sleep(0.001)
+            Client.in_flight -= 1
+            return bench.Sample(0, 0.001, True)
+
+    samples = asyncio.run(bench.run_closed_loop(Client(), lambda: "x", 3, 10, None))
+    assert len(samples) == 10
+    assert Client.peak == 3
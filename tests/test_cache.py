@@ -0,0 +1,85 @@
+"""Tests for the two-tier synthesized-audio cache."""
+import pytest
+
+
+@pytest.fixture
+def make_cache(server, tmp_path):
+    def make(memory_bytes=1000, disk_bytes=1000):
+        cache = server.AudioCache(tmp_path, memory_bytes, disk_bytes)
+        cache.load_index()
+        return cache
+
+    return make
+
+
+def entry(server, size, **meta):
+    return server.CacheEntry(data=b"x" * size, meta=meta)
+
+
+def test_memory_tier_evicts_least_recently_used_by_bytes(server, make_cache):
+    cache = make_cache(memory_bytes=250)
+    cache.put("a", entry(server, 100))
+    cache.put("b", entry(server, 100))
+    assert cache.get("a") is not None
+    cache.put("c", entry(server, 100))
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.get("c") is not None
+    assert cache.stats()["memory_bytes"] == 200
+
+
+def test_oversized_entries_are_not_kept_in_memory(server, make_cache):
+    cache = make_cache(memory_bytes=50)
+    cache.put("big", entry(server, 100))
+    assert cache.get("big") is None
+
+
+def test_disk_tier_survives_a_restart(server, make_cache):
+    cache = make_cache()
+    cache.persist("key", entry(server, 10, duration=1.5, format="wav"))
+
+    restarted = make_cache()
+    cached = restarted.get("key")
+    assert cached.data == b"x" * 10
+    assert cached.meta == {"duration": 1.5, "format": "wav"}
+    assert restarted.stats()["disk_hits"] == 1
+    # The disk hit was promoted to memory
+    restarted.get("key")
+    assert restarted.stats()["memory_hits"] == 1
+
+
+def test_disk_tier_is_bounded(server, make_cache):
+    cache = make_cache(disk_bytes=300)
+    for key in "abcd":
+        cache.persist(key, entry(server, 100))
+    assert cache.stats()["disk_bytes"] <= 300
+    assert not cache.contains("a")
+    assert cache.contains("d")
+
+
+def test_corrupt_disk_entries_are_discarded(server, make_cache, tmp_path):
+    cache = make_cache()
+    cache.persist("key", entry(server, 10))
+    (tmp_path / "key.tts").write_bytes(b"not json\n")
+    assert cache.get("key") is None
+    assert not cache.contains("key")
+
+
+def test_cache_key_normalizes_text(server):
+    assert server.cache_key("你好  世界", "Vivian", 1.0, "Chinese") == server.cache_key(
+        "你好 世界", "Vivian", 1.0, "Chinese"
+    )
+    assert server.cache_key("你好", "Vivian", 1.0, "Chinese") != server.cache_key(
+        "你好", "Ethan", 1.0, "Chinese"
+    )
+
+
+def test_repeated_request_is_served_from_cache(client):
+    params = {"text": "缓存测试的句子", "speaker": "Vivian"}
+    first = client.post("/api/tts", params=params)
+    second = client.post("/api/tts", params=params)
+    assert first.status_code == second.status_code == 200
+    assert first.headers["X-Cache"] == "MISS"
+    assert second.headers["X-Cache"] == "HIT"
+    assert second.content == first.content
@@ -0,0 +1,81 @@
+"""Tests for deadline propagation and generation cancellation."""
+import asyncio
+import threading
+import time
+
+import pytest
+
+
+def test_token_expires_at_its_deadline(server):
+    token = server.CancelToken(deadline=time.time() + 60)
+    assert not token.cancelled
+    token.deadline = time.time() - 1
+    with pytest.raises(server.JobCancelledError) as err:
+        token.check()
+    assert err.value.reason == "deadline"
+
+
+def test_first_cancel_reason_wins(server):
+    token = server.CancelToken()
+    token.cancel()
+    token.cancel("deadline")
+    assert token.reason == "disconnect"
+
+
+def test_cancelled_jobs_are_dropped_from_the_queue(server, make_worker):
+    worker = make_worker()
+    token = server.CancelToken()
+    ran = []
+
+    async def main():
+        future = worker.submit(lambda cancel=None: ran.append(True), cancel=token)
+        token.cancel()
+        worker.start()
+        await future
+
+    with pytest.raises(server.JobCancelledError):
+        asyncio.run(main())
+    assert not ran
+    assert worker.cancel_stats()["queued"] == 1
+    assert worker.cancel_stats()["by_reason"]["disconnect"] == 1
+
+
+def test_running_jobs_stop_between_chunks(server, make_worker):
+    worker = make_worker()
+    worker.start()
+    token = server.CancelToken()
+    started = threading.Event()
+
+    def generate(cancel=None):
+        started.set()
+        while True:
+            cancel.check()
+            time.sleep(0.01)
+
+    async def main():
+        future = worker.submit(generate, cancel=token)
+        await asyncio.to_thread(started.wait, 5)
+        token.cancel()
+        await future
+
+    with pytest.raises(server.JobCancelledError):
+        asyncio.run(main())
+    stats = worker.cancel_stats()
+    assert stats["running"] == 1
+    assert stats["wasted_seconds"] > 0
+
+
+def test_stub_generation_honours_cancellation(server):
+    token = server.CancelToken()
+    token.cancel()
+    with pytest.raises(server.JobCancelledError):
+        server.backend.generate("已取消的请求", "Vivian", 1.0, token)
+
+
+def test_expired_deadline_answers_504(client):
+    response = client.post(
+        "/api/tts",
+        params={"text": "来不及生成的句子"},
+        headers={"X-Deadline": str(time.time() - 1)},
+    )
+    assert response.status_code == 504
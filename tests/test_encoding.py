@@ -0,0 +1,32 @@
+"""Tests for in-memory WAV encoding."""
+import io
+
+import numpy as np
+import pytest
+import soundfile as sf
+
+
+def chunks():
+    rng = np.random.default_rng(0)
+    return [rng.uniform(-0.5, 0.5, size).astype(np.float32) for size in (100, 0, 257)]
+
+
+@pytest.mark.parametrize(("sample_format", "subtype"), [("int16", "PCM_16"), ("float32", "FLOAT")])
+def test_wav_is_readable_by_soundfile(server, sample_format, subtype):
+    data = server.encode_wav(chunks(), 24000, sample_format)
+    audio, rate = sf.read(io.BytesIO(data), dtype="float32")
+    assert rate == 24000
+    assert sf.info(io.BytesIO(data)).subtype == subtype
+    np.testing.assert_allclose(audio, np.concatenate(chunks()), atol=1 / 32767)
+
+
+def test_out_of_range_samples_are_clipped(server):
+    data = server.encode_wav([np.array([2.0, -2.0], dtype=np.float32)], 24000)
+    np.testing.assert_array_equal(np.frombuffer(data[44:], "<i2"), [32767, -32767])
+
+
+def test_stream_chunks_match_the_whole_file(server):
+    header = server.wav_header(None, 24000, "int16")
+    assert header[4:8] == b"\xff\xff\xff\xff"
+    streamed = b"".join(server.pcm_bytes(chunk) for chunk in chunks())
+    assert streamed == server.encode_wav(chunks(), 24000)[len(header):]
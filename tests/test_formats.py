@@ -0,0 +1,32 @@
+"""Tests for compressed output formats."""
+import io
+
+import pytest
+import soundfile as sf
+
+
+@pytest.mark.parametrize(
+    ("audio_format", "media_type"),
+    [("flac", "audio/flac"), ("opus", "audio/ogg"), ("mp3", "audio/mpeg")],
+)
+def test_compressed_formats_decode(server, client, audio_format, media_type):
+    _, sf_format, _ = server.AUDIO_FORMATS[audio_format]
+    if sf_format not in sf.available_formats():
+        pytest.skip(f"libsndfile without {sf_format} support")
+    text = f"压缩格式{audio_format}"
+    response = client.post("/api/tts", params={"text": text, "format": audio_format})
+    assert response.status_code == 200
+    assert response.headers["content-type"] == media_type
+    assert response.headers["X-Audio-Format"] == audio_format
+    assert int(response.headers["X-Audio-Bytes"]) == len(response.content)
+
+    wav = client.post("/api/tts", params={"text": text})
+    assert len(response.content) < len(wav.content)
+    audio, _ = sf.read(io.BytesIO(response.content))
+    assert audio.shape[0] > 0
+
+
+def test_formats_are_cached_separately(client):
+    text = "同一句话的两种格式"
+    client.post("/api/tts", params={"text": text, "format": "flac"})
+    assert client.post("/api/tts", params={"text": text}).headers["X-Cache"] == "MISS"
@@ -0,0 +1,57 @@
+"""Tests for the Prometheus /metrics endpoint."""
+import re
+
+
+def sample(text, name, labels=""):
+    """Return the value of one sample in the exposition text."""
+    match = re.search(rf"^{re.escape(name + labels)} (\S+)$", text, re.MULTILINE)
+    assert match, f"{name}{labels} not found"
+    return float(match.group(1))
+
+
+def test_generation_is_recorded_in_histograms(client):
+    client.post("/api/tts", params={"text": "指标测试的句子"})
+    after = client.get("/metrics")
+
+    assert after.headers["content-type"].startswith("text/plain; version=0.0.4")
+    for histogram in (
+        "qwen3_tts_queue_wait_seconds",
+        "qwen3_tts_generation_seconds",
+        "qwen3_tts_realtime_factor",
+    ):
+        assert f"# TYPE {histogram} histogram" in after.text
+        count = [line for line in after.text.splitlines() if line.startswith(f"{histogram}_count")]
+        assert count, histogram
+    assert sample(after.text, "qwen3_tts_ready") == 1
+
+
+def test_requests_are_counted_by_route_and_status(client):
+    def count(text):
+        match = re.search(
+            r'^qwen3_tts_requests_total\{[^}]*endpoint="/health"[^}]*status="200"[^}]*\} (\S+)$',
+            text,
+            re.MULTILINE,
+        )
+        return float(match.group(1)) if match else 0.0
+
+    before = count(client.get("/metrics").text)
+    client.get("/health")
+    assert count(client.get("/metrics").text) == before + 1
+
+
+def test_unknown_speakers_are_rejected_before_synthesis(client):
+    for path in ("/api/tts", "/api/tts/stream"):
+        response = client.post(path, params={"text": "未知音色", "speaker": 'x"\ny'})
+        assert response.status_code == 400
+    # Speaker names match like the model does, and are recorded under the listed name
+    assert client.post("/api/tts", params={"text": "大小写", "speaker": "vivian"}).status_code == 200
+    text = client.get("/metrics").text
+    speakers = set(re.findall(r'^qwen3_tts_realtime_factor_count\{speaker="([^"]*)"\}', text, re.M))
+    listed = {item["name"] for item in client.get("/api/list_speakers").json()["speakers"]}
+    assert "Vivian" in speakers and speakers <= listed
+
+
+def test_label_values_are_escaped(server):
+    histogram = server.Histogram("h", "help", (1,), label="name")
+    histogram.observe(0.5, 'a"b\\c\nd')
+    assert 'h_count{name="a\\"b\\\\c\\nd"} 1' in histogram.render()
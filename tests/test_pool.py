@@ -0,0 +1,103 @@
+"""Tests for the server pool."""
+import asyncio
+from unittest.mock import MagicMock
+
+import pytest
+
+pytest.importorskip("homeassistant")
+
+from custom_components.qwen3_tts.const import MAX_BACKEND_FAILURES  # noqa: E402
+from custom_components.qwen3_tts.pool import ServerPool, parse_servers  # noqa: E402
+
+URLS = ["http://a:7861", "http://b:7861", "http://c:7861"]
+
+
+class FakeResponse:
+    def __init__(self, status, data=None):
+        self.status = status
+        self._data = data or {}
+
+    async def json(self, content_type=None):
+        return self._data
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class FakeSession:
+    def __init__(self, responses):
+        self._responses = responses
+
+    def get(self, url):
+        return self._responses[url]
+
+
+def make_pool(session=None):
+    return ServerPool(MagicMock(), session or MagicMock(), URLS)
+
+
+def test_least_loaded_backend_is_chosen():
+    pool = make_pool()
+    pool.backends[0].in_flight = 2
+    pool.backends[1].in_flight = 1
+    pool.backends[2].in_flight = 3
+    assert pool.acquire().base_url == "http://b:7861"
+
+
+def test_idle_backends_share_the_load():
+    pool = make_pool()
+    assert {pool.acquire().base_url for _ in range(3)} == set(URLS)
+
+
+def test_excluded_backends_are_a_last_resort():
+    pool = make_pool()
+    pool.backends[1].healthy = pool.backends[2].healthy = False
+    assert pool.acquire(exclude={"http://a:7861"}).base_url == "http://a:7861"
+    pool.backends[0].healthy = False
+    assert pool.acquire() is None
+
+
+def test_track_counts_requests_in_flight():
+    pool = make_pool()
+    backend = pool.backends[0]
+    with pool.track(backend):
+        assert backend.in_flight == 1
+    assert backend.in_flight == 0
+
+
+def test_repeated_failures_eject_a_backend():
+    pool = make_pool()
+    backend = pool.backends[0]
+    for _ in range(MAX_BACKEND_FAILURES - 1):
+        pool.mark_failure(backend, "boom")
+    assert backend.healthy
+    pool.mark_success(backend)
+    for _ in range(MAX_BACKEND_FAILURES):
+        pool.mark_failure(backend, "boom")
+    assert not backend.healthy
+    assert backend.last_error == "boom"
+
+
+def test_probe_reads_readiness_and_capabilities():
+    session = FakeSession({
+        "http://a:7861/ready": FakeResponse(200, {"api_versions": [1, 2], "voice_cloning": True}),
+        "http://b:7861/ready": FakeResponse(503),
+        "http://c:7861/ready": FakeResponse(404),
+        "http://c:7861/health": FakeResponse(200),
+    })
+    pool = make_pool(session)
+    asyncio.run(pool.async_probe())
+
+    a, b, c = pool.backends
+    assert (a.healthy, a.api_version, a.voice_cloning) == (True, 2, True)
+    assert not b.healthy
+    assert (c.healthy, c.api_version, c.voice_cloning) == (True, 1, False)
+
+
+def test_parse_servers():
+    assert parse_servers(" a:1, b:7861 ,") == [("a", 1), ("b", 7861)]
+    with pytest.raises(ValueError):
+        parse_servers("a:99999")
@@ -0,0 +1,65 @@
+"""Tests for server-side audio post-processing."""
+import io
+
+import numpy as np
+import pytest
+import soundfile as sf
+
+RATE = 24000
+
+
+def tone(seconds, freq=440.0, amplitude=0.3, rate=RATE):
+    t = np.arange(int(seconds * rate), dtype=np.float32) / rate
+    return (amplitude * np.sin(2 * np.pi * freq * t)).astype(np.float32)
+
+
+def dominant_frequency(audio, rate):
+    spectrum = np.abs(np.fft.rfft(audio))
+    return np.fft.rfftfreq(audio.shape[0], 1 / rate)[np.argmax(spectrum)]
+
+
+@pytest.mark.parametrize("target", [16000, 22050, 48000])
+def test_resample_keeps_duration_and_pitch(server, target):
+    audio = server.resample(tone(1.0), RATE, target)
+    assert audio.shape[0] == target
+    assert dominant_frequency(audio, target) == pytest.approx(440, abs=2)
+
+
+def test_resample_removes_content_above_the_new_nyquist(server):
+    audio = server.resample(tone(1.0, freq=10000), RATE, 16000)
+    assert np.sqrt(np.mean(audio[1000:-1000] ** 2)) < 0.01
+
+
+def test_trim_silence_keeps_the_padded_speech(server):
+    silence = np.zeros(RATE // 2, dtype=np.float32)
+    audio = np.concatenate([silence, tone(1.0), silence])
+    trimmed = server.trim_silence(audio, RATE, pad_ms=50)
+    assert trimmed.shape[0] == pytest.approx(RATE * 1.1, abs=RATE * 0.02)
+
+
+def test_trim_silence_leaves_silence_alone(server):
+    audio = np.zeros(RATE, dtype=np.float32)
+    assert server.trim_silence(audio, RATE) is audio
+
+
+def test_loudness_is_normalized_to_the_target(server):
+    audio = server.normalize_loudness(tone(3.0, freq=1000, amplitude=0.05), RATE, -23.0)
+    assert server.integrated_loudness(audio, RATE) == pytest.approx(-23.0, abs=0.2)
+
+
+def test_loudness_gain_is_peak_limited(server):
+    audio = server.normalize_loudness(tone(3.0, freq=1000, amplitude=0.05), RATE, -5.0)
+    assert np.max(np.abs(audio)) <= 10 ** (server.LOUDNESS_PEAK_DB / 20) + 1e-6
+
+
+def test_http_request_resamples_the_output(client):
+    response = client.post(
+        "/api/tts",
+        params={"text": "重采样到十六千赫", "sample_rate": 16000, "trim_silence": True},
+    )
+    assert response.status_code == 200
+    assert response.headers["X-Sample-Rate"] == "16000"
+    assert "X-Realtime-Factor" in response.headers
+    audio, rate = sf.read(io.BytesIO(response.content))
+    assert rate == 16000
+    assert audio.shape[0] / rate == pytest.approx(float(response.headers["X-Audio-Duration"]))
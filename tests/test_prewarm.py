@@ -0,0 +1,78 @@
+"""Tests for the background prewarm service."""
+import asyncio
+import re
+import time
+
+
+def wait_for(client, job_id, timeout=10):
+    deadline = time.time() + timeout
+    while True:
+        progress = client.get(f"/api/tts/prewarm/{job_id}").json()
+        if progress["status"] != "running" or time.time() > deadline:
+            return progress
+        time.sleep(0.05)
+
+
+def test_prewarmed_phrases_are_cache_hits(client):
+    items = [{"text": "预热短语一"}, {"text": "预热短语二", "speaker": "Ethan", "speed": 1.2}]
+    response = client.post("/api/tts/prewarm", json={"items": items})
+    assert response.status_code == 202
+
+    progress = wait_for(client, response.json()["job_id"])
+    assert progress == {**progress, "status": "completed", "total": 2, "done": 2, "failed": 0}
+    for item in items:
+        assert client.post("/api/tts", params=item).headers["X-Cache"] == "HIT"
+
+
+def test_cached_phrases_are_not_generated_again(client):
+    client.post("/api/tts", params={"text": "已经缓存的预热短语"})
+    response = client.post("/api/tts/prewarm", json={"items": [{"text": "已经缓存的预热短语"}]})
+    progress = wait_for(client, response.json()["job_id"])
+    assert progress["cached"] == 1
+
+
+def bulk_generations(client):
+    text = client.get("/metrics").text
+    match = re.search(r'^qwen3_tts_queue_wait_seconds_count\{priority="bulk"\} (\S+)$', text, re.M)
+    return float(match.group(1)) if match else 0.0
+
+
+def test_prewarm_is_recorded_like_bulk_requests(client):
+    before = bulk_generations(client)
+    response = client.post("/api/tts/prewarm", json={"items": [{"text": "记录指标的预热短语"}]})
+    assert wait_for(client, response.json()["job_id"])["status"] == "completed"
+    assert bulk_generations(client) == before + 1
+
+
+def test_unknown_speakers_are_rejected_up_front(client):
+    items = [{"text": "预热"}, {"text": "未知音色", "speaker": "nobody"}]
+    assert client.post("/api/tts/prewarm", json={"items": items}).status_code == 400
+
+
+def test_unknown_job_is_404(client):
+    assert client.get("/api/tts/prewarm/missing").status_code == 404
+
+
+def test_interrupted_job_ends_failed(server, monkeypatch):
+    def broken(*args):
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(server, "cache_key", broken)
+    job = server.PrewarmJob("job", [server.PrewarmItem(text="中断的预热")])
+    asyncio.run(server._run_prewarm(job))
+    assert job.progress()["status"] == "failed"
+
+
+def test_cancelled_job_ends_failed(server, monkeypatch):
+    monkeypatch.setattr(server.audio_cache, "contains", lambda key: False)
+    monkeypatch.setattr(server, "worker", server.InferenceWorker(1))
+    job = server.PrewarmJob("job", [server.PrewarmItem(text="关闭时的预热")])
+
+    async def main():
+        task = asyncio.ensure_future(server._run_prewarm(job))
+        await asyncio.sleep(0.05)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+    asyncio.run(main())
+    assert job.status == "failed"
@@ -0,0 +1,80 @@
+"""Tests for the priority-aware scheduler."""
+import asyncio
+import threading
+import time
+
+
+def test_interactive_jobs_run_before_queued_bulk_jobs(make_worker):
+    worker = make_worker()
+    order = []
+
+    def job(name):
+        return lambda cancel=None: order.append(name)
+
+    async def main():
+        futures = [
+            worker.submit(job("bulk-1"), priority="bulk"),
+            worker.submit(job("bulk-2"), priority="bulk"),
+            worker.submit(job("interactive"), priority="interactive"),
+        ]
+        worker.start()
+        await asyncio.gather(*futures)
+
+    asyncio.run(main())
+    assert order == ["interactive", "bulk-1", "bulk-2"]
+
+
+def test_starved_bulk_jobs_are_promoted(make_worker):
+    worker = make_worker(max_wait=0.0)
+    order = []
+
+    async def main():
+        futures = [
+            worker.submit(lambda cancel=None: order.append("bulk"), priority="bulk"),
+            worker.submit(lambda cancel=None: order.append("interactive")),
+        ]
+        worker.start()
+        await asyncio.gather(*futures)
+
+    asyncio.run(main())
+    assert order == ["bulk", "interactive"]
+    assert worker.promoted == 1
+
+
+def test_interactive_request_overtakes_a_streamed_bulk_message(server, client):
+    sentences = [f"这是后台播报的第{i}句话。" for i in range(6)]
+    finished = []
+
+    def stream():
+        with client.stream(
+            "POST", "/api/tts/stream", params={"text": "".join(sentences), "priority": "bulk"}
+        ) as response:
+            assert response.status_code == 200
+            response.read()
+        finished.append("bulk")
+
+    before = server.worker.completed
+    thread = threading.Thread(target=stream)
+    thread.start()
+    # Wait until the bulk message is being generated
+    while server.worker.completed == before:
+        time.sleep(0.005)
+    reply = client.post("/api/tts", params={"text": "插队的交互回复"})
+    finished.append("interactive")
+    thread.join()
+
+    assert reply.status_code == 200
+    # The stream endpoint queues one job per sentence, so the reply only waits
+    # for the sentence being generated and finishes first
+    assert finished == ["interactive", "bulk"]
+    assert server.worker.completed - before == len(sentences) + 1
+
+
+def test_streamed_message_is_a_wav(client):
+    with client.stream("POST", "/api/tts/stream", params={"text": "第一句。第二句。"}) as response:
+        assert response.status_code == 200
+        assert response.headers["X-Cache"] == "MISS"
+        body = response.read()
+    assert body.startswith(b"RIFF")
+    assert body[8:12] == b"WAVE"
+    assert len(body) > 44
@@ -0,0 +1,47 @@
+"""Tests for the multi-process model worker pool."""
+from pathlib import Path
+import threading
+import time
+
+import numpy as np
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+@pytest.fixture
+def pool(server, tmp_path, monkeypatch):
+    # Spawned workers import the server by module name, which the file name
+    # (with a hyphen) does not allow
+    (tmp_path / "mlx_server.py").symlink_to(ROOT / "mlx-server.py")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    # Workers read their configuration when they import the server
+    monkeypatch.setenv("QWEN3_TTS_WARMUP", "0")
+    monkeypatch.setenv("QWEN3_TTS_STUB_RTF", "50")
+    pool = server.ProcessPoolBackend("stub", 2)
+    pool.import_modules()
+    try:
+        pool.load()
+        yield pool
+    finally:
+        pool.close()
+
+
+def test_workers_generate_like_the_in_process_backend(server, pool):
+    assert pool.loaded
+    assert pool.supports_batch and pool.supports_voices
+    expected = np.concatenate(server.StubBackend().generate("多进程", "Vivian", 1.0))
+    np.testing.assert_array_equal(np.concatenate(pool.generate("多进程", "Vivian", 1.0)), expected)
+    streamed = np.concatenate(list(pool.stream("多进程", "Vivian", 1.0)))
+    np.testing.assert_array_equal(streamed, expected)
+
+
+def test_cancellation_reaches_the_worker(server, pool):
+    token = server.CancelToken()
+    # About 0.8 s of generation on the stub
+    text = "很长的一段文本" * 30
+    threading.Timer(0.2, token.cancel).start()
+    start = time.time()
+    with pytest.raises(server.JobCancelledError):
+        list(pool.stream(text, "Vivian", 1.0, token))
+    assert time.time() - start < 0.6
@@ -0,0 +1,44 @@
+"""Tests for sentence segmentation of long messages."""
+import pytest
+
+pytest.importorskip("homeassistant")
+
+from custom_components.qwen3_tts.segment import split_text  # noqa: E402
+
+
+def test_short_text_is_one_segment():
+    assert split_text("  你好。  ", 50) == ["你好。"]
+    assert split_text("   ", 50) == []
+
+
+def test_sentences_are_packed_up_to_the_limit():
+    text = "今天天气晴朗。气温二十度。适合出门散步。晚上可能有小雨。"
+    segments = split_text(text, 15)
+    assert segments == ["今天天气晴朗。气温二十度。", "适合出门散步。晚上可能有小雨。"]
+    assert "".join(segments) == text
+
+
+def test_long_sentences_are_split_at_clauses():
+    text = "明天上午有雨，下午转晴，晚上气温下降，请注意添加衣物。"
+    segments = split_text(text, 12)
+    assert all(len(segment) <= 12 for segment in segments)
+    assert segments[0] == "明天上午有雨，下午转晴，"
+    assert "".join(segments) == text
+
+
+def test_unbroken_text_is_hard_cut():
+    segments = split_text("字" * 25, 10)
+    assert segments == ["字" * 10, "字" * 10, "字" * 5]
+
+
+def test_ascii_periods_inside_numbers_do_not_split():
+    text = "The temperature is 21.5 degrees. Version v1.2 is installed."
+    assert split_text(text, 40) == [
+        "The temperature is 21.5 degrees.",
+        "Version v1.2 is installed.",
+    ]
+
+
+def test_latin_pieces_are_rejoined_with_spaces():
+    text = "First sentence. Second sentence. Third sentence."
+    assert split_text(text, 35) == ["First sentence. Second sentence.", "Third sentence."]
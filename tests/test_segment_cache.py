@@ -0,0 +1,28 @@
+"""Tests for the sentence-level audio cache."""
+import io
+
+import soundfile as sf
+
+
+def test_shared_sentences_are_reused(client):
+    first = client.post("/api/tts", params={"text": "早上好。今天是晴天。出门记得带伞。"})
+    second = client.post("/api/tts", params={"text": "晚上好。今天是晴天。出门记得带伞。"})
+    assert first.headers["X-Segment-Count"] == "3"
+    assert first.headers["X-Segment-Hits"] == "0"
+    assert second.headers["X-Segment-Hits"] == "2"
+    assert float(second.headers["X-Segment-Hit-Ratio"]) == round(2 / 3, 3)
+
+
+def test_spliced_audio_covers_every_sentence(client):
+    text = "第一句。第二句话。第三句话更长。"
+    whole = client.post("/api/tts", params={"text": text, "segment_cache": False})
+    spliced = client.post("/api/tts", params={"text": text, "segment_cache": True})
+    whole_audio, _ = sf.read(io.BytesIO(whole.content))
+    spliced_audio, _ = sf.read(io.BytesIO(spliced.content))
+    # Crossfades shorten the splice by a few milliseconds per joint
+    assert abs(spliced_audio.shape[0] - whole_audio.shape[0]) < 0.05 * 24000
+
+
+def test_single_sentences_are_not_segmented(client):
+    response = client.post("/api/tts", params={"text": "只有一句话"})
+    assert "X-Segment-Count" not in response.headers
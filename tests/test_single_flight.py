@@ -0,0 +1,98 @@
+"""Tests for single-flight coalescing of identical in-flight requests."""
+import asyncio
+import threading
+
+import pytest
+
+
+def test_identical_requests_share_one_generation(server):
+    flight = server.SingleFlight()
+    calls = 0
+
+    async def generate(cancel=None):
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return "audio"
+
+    async def main():
+        return await asyncio.gather(*(flight.run("key", generate) for _ in range(3)))
+
+    results = asyncio.run(main())
+    assert calls == 1
+    assert results == [("audio", False), ("audio", True), ("audio", True)]
+    assert flight.stats() == {"in_flight": 0, "leaders": 1, "coalesced": 2}
+
+
+def test_errors_reach_every_waiter(server):
+    flight = server.SingleFlight()
+
+    async def generate(cancel=None):
+        await asyncio.sleep(0.01)
+        raise RuntimeError("boom")
+
+    async def main():
+        return await asyncio.gather(
+            *(flight.run("key", generate) for _ in range(2)), return_exceptions=True
+        )
+
+    assert [str(error) for error in asyncio.run(main())] == ["boom", "boom"]
+
+
+def test_generation_is_cancelled_only_when_every_waiter_is(server):
+    flight = server.SingleFlight()
+    first, second = server.CancelToken(), server.CancelToken()
+    shared = []
+
+    async def generate(cancel=None):
+        shared.append(cancel)
+        await asyncio.sleep(0.05)
+        return "audio"
+
+    async def main():
+        leader = asyncio.ensure_future(flight.run("key", generate, first))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(flight.run("key", generate, second))
+        await asyncio.sleep(0)
+        first.cancel()
+        assert not shared[0].cancelled
+        second.cancel()
+        assert shared[0].cancelled
+        await asyncio.gather(leader, follower)
+
+    asyncio.run(main())
+
+
+def test_concurrent_http_requests_are_coalesced(server, client):
+    before = server.single_flight.stats()["coalesced"]
+    params = {"text": "同时到达的两个相同请求", "speaker": "Ethan"}
+    responses = []
+    barrier = threading.Barrier(2)
+
+    def request():
+        barrier.wait()
+        responses.append(client.post("/api/tts", params=params))
+
+    threads = [threading.Thread(target=request) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert [response.status_code for response in responses] == [200, 200]
+    assert responses[0].content == responses[1].content
+    if server.single_flight.stats()["coalesced"] == before:
+        # The second request arrived after the first was cached
+        assert {response.headers["X-Cache"] for response in responses} == {"MISS", "HIT"}
+    else:
+        assert server.single_flight.stats()["coalesced"] == before + 1
+
+
+@pytest.mark.parametrize("cancelled", [True, False])
+def test_cancel_group_tolerates_uncancellable_members(server, cancelled):
+    token = server.CancelToken()
+    if cancelled:
+        token.cancel()
+    assert server.CancelGroup([token]).cancelled is cancelled
+    # A member without a token (e.g. prewarm) keeps the work alive
+    assert not server.CancelGroup([token, None]).cancelled
@@ -0,0 +1,24 @@
+"""Tests for speaker discovery."""
+
+
+def test_speakers_are_listed(server, client):
+    response = client.get("/api/list_speakers")
+    assert response.status_code == 200
+    names = [speaker["name"] for speaker in response.json()["speakers"]]
+    assert names == server.backend.speakers
+
+
+def test_unchanged_list_answers_304(client):
+    etag = client.get("/api/list_speakers").headers["ETag"]
+    response = client.get("/api/list_speakers", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers["ETag"] == etag
+    assert client.get(
+        "/api/list_speakers", headers={"If-None-Match": '"stale"'}
+    ).status_code == 200
+
+
+def test_etag_changes_with_the_speakers(server, client, monkeypatch):
+    etag = client.get("/api/list_speakers").headers["ETag"]
+    monkeypatch.setattr(server.backend, "speakers", [*server.backend.speakers, "Extra"])
+    assert client.get("/api/list_speakers").headers["ETag"] != etag
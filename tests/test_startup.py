@@ -0,0 +1,27 @@
+"""Tests for readiness reporting during startup."""
+
+
+def test_ready_reports_the_startup_phases(client):
+    response = client.get("/ready")
+    assert response.status_code == 200
+    ready = response.json()
+    assert ready["status"] == "ready"
+    assert {"import", "load", "warmup"} <= set(ready["phases"])
+
+
+def test_requests_wait_for_the_model(server, client, monkeypatch):
+    monkeypatch.setattr(server.startup, "status", "loading")
+    assert client.get("/ready").status_code == 503
+    assert client.get("/health").json()["status"] == "healthy"
+    response = client.post("/api/tts", params={"text": "模型还没加载好"})
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "5"
+
+
+def test_failed_startup_is_reported(server, client, monkeypatch):
+    monkeypatch.setattr(server.startup, "status", "failed")
+    monkeypatch.setattr(server.startup, "error", "no weights")
+    assert client.get("/health").json()["status"] == "unhealthy"
+    response = client.post("/api/tts", params={"text": "模型加载失败"})
+    assert response.status_code == 500
+    assert "no weights" in response.json()["detail"]
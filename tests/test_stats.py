@@ -0,0 +1,44 @@
+"""Tests for the client-side request statistics."""
+import pytest
+
+pytest.importorskip("homeassistant")
+
+from custom_components.qwen3_tts.stats import RequestStats, percentile  # noqa: E402
+
+
+def test_percentile_interpolates():
+    assert percentile([], 50) is None
+    assert percentile([3.0], 95) == 3.0
+    assert percentile([4.0, 1.0, 3.0, 2.0], 50) == 2.5
+    assert percentile([1.0, 2.0, 3.0, 4.0, 5.0], 95) == pytest.approx(4.8)
+
+
+def test_network_overhead_is_latency_minus_server_time():
+    stats = RequestStats()
+    stats.async_record_success(1.5, 1.0, 100)
+    stats.async_record_success(0.2, None, 50)
+    stats.async_record_success(0.5, 0.7, 10)
+    assert list(stats.latency) == [1.5, 0.2, 0.5]
+    assert list(stats.server_time) == [1.0, 0.7]
+    assert list(stats.network_overhead) == [0.5, 0.0]
+    assert stats.bytes_received == 160
+
+
+def test_window_is_bounded():
+    stats = RequestStats(window=3)
+    for latency in range(5):
+        stats.async_record_success(float(latency), None, 0)
+    assert list(stats.latency) == [2.0, 3.0, 4.0]
+    assert stats.requests == 5
+
+
+def test_listeners_are_notified_until_removed():
+    stats = RequestStats()
+    calls = []
+    remove = stats.async_add_listener(lambda: calls.append(True))
+    stats.async_record_timeout()
+    stats.async_record_error()
+    remove()
+    stats.async_record_error()
+    assert len(calls) == 2
+    assert (stats.requests, stats.timeouts, stats.errors) == (3, 1, 2)
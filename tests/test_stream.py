@@ -0,0 +1,45 @@
+"""Tests for the chunked streaming endpoint."""
+import io
+
+import numpy as np
+import soundfile as sf
+
+
+def read_stream(client, text, **params):
+    with client.stream("POST", "/api/tts/stream", params={"text": text, **params}) as response:
+        chunks = list(response.iter_bytes())
+        return response, chunks
+
+
+def test_stream_reports_first_chunk_timing(client):
+    response, chunks = read_stream(client, "流式响应的计时。第二句。")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "audio/wav"
+    first_chunk = float(response.headers["X-First-Chunk-Time"])
+    assert 0 <= float(response.headers["X-Queue-Time"]) <= first_chunk
+    assert len(chunks) >= 1
+
+
+def test_streamed_audio_matches_the_cached_file(client):
+    text = "流式输出完成后写入缓存。之后直接命中。"
+    _, chunks = read_stream(client, text)
+    streamed = b"".join(chunks)
+
+    cached, _ = read_stream(client, text)
+    assert cached.headers["X-Cache"] == "HIT"
+    whole = client.post("/api/tts", params={"text": text, "segment_cache": False})
+    assert whole.headers["X-Cache"] == "HIT"
+
+    # The streamed header has no length, so compare the samples
+    pcm = np.frombuffer(streamed[44:], dtype="<i2")
+    audio, _ = sf.read(io.BytesIO(whole.content), dtype="int16")
+    np.testing.assert_array_equal(pcm, audio)
+
+
+def test_expired_deadline_fails_before_streaming(client):
+    response = client.post(
+        "/api/tts/stream",
+        params={"text": "来不及的流式请求"},
+        headers={"X-Deadline": "1"},
+    )
+    assert response.status_code == 504
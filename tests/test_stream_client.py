@@ -0,0 +1,98 @@
+"""Tests for the integration's streaming client."""
+import asyncio
+import struct
+
+import pytest
+
+pytest.importorskip("homeassistant")
+
+from aiohttp import web  # noqa: E402
+from homeassistant.exceptions import HomeAssistantError  # noqa: E402
+
+TIMEOUT = 0.3
+
+
+def stream_server(first_delay=0.0, gap=0.0, chunks=3):
+    """A server whose stream sends its first chunk, then one chunk per gap."""
+
+    async def handle(request):
+        response = web.StreamResponse(headers={"X-Cache": "HIT"})
+        await response.prepare(request)
+        await asyncio.sleep(first_delay)
+        for index in range(chunks):
+            if index:
+                await asyncio.sleep(gap)
+            await response.write(b"x" * 100)
+        await response.write_eof()
+        return response
+
+    app = web.Application()
+    app.router.add_post("/api/tts/stream", handle)
+    return app
+
+
+async def read(serve_entity, app, pause=0.0):
+    """Stream a message from app, pausing after each chunk like playback would."""
+    async with serve_entity(app) as entity:
+        entity._calculate_timeout = lambda *args, **kwargs: TIMEOUT
+        received = 0
+        async for chunk in entity._async_stream_audio("流式消息", 1.0, "Vivian"):
+            received += len(chunk)
+            await asyncio.sleep(pause)
+        return received, entity
+
+
+def test_slow_consumers_are_not_cut_off(serve_entity):
+    received, entity = asyncio.run(read(serve_entity, stream_server(), pause=TIMEOUT))
+    assert received == 300
+    assert (entity._stats.timeouts, entity._stats.errors) == (0, 0)
+    assert entity._pool.backends[0].in_flight == 0
+
+
+def test_a_missing_first_chunk_times_out(serve_entity):
+    with pytest.raises(HomeAssistantError, match="Timeout"):
+        asyncio.run(read(serve_entity, stream_server(first_delay=2 * TIMEOUT)))
+
+
+def test_a_stalled_stream_fails_with_an_error(serve_entity):
+    with pytest.raises(HomeAssistantError, match="stalled"):
+        asyncio.run(read(serve_entity, stream_server(gap=2 * TIMEOUT)))
+
+
+def wav(samples: bytes, streaming: bool = False) -> bytes:
+    """A 16-bit mono WAV file, optionally with the streaming size markers."""
+    size = 0xFFFFFFFF if streaming else len(samples)
+    fmt = struct.pack("<HHIIHH", 1, 1, 24000, 48000, 2, 16)
+    return (
+        b"RIFF" + struct.pack("<I", size) + b"WAVE"
+        + b"fmt " + struct.pack("<I", len(fmt)) + fmt
+        + b"data" + struct.pack("<I", size) + samples
+    )
+
+
+def test_later_segments_are_appended_to_the_stream(serve_entity):
+    async def handle_stream(request):
+        response = web.StreamResponse()
+        await response.prepare(request)
+        await response.write(wav(b"\x01\x00" * 50, streaming=True))
+        await response.write_eof()
+        return response
+
+    async def handle_whole(request):
+        assert request.query["format"] == "wav"
+        return web.Response(body=wav(b"\x02\x00" * 50))
+
+    app = web.Application()
+    app.router.add_post("/api/tts/stream", handle_stream)
+    app.router.add_post("/api/tts", handle_whole)
+
+    async def main():
+        async with serve_entity(app) as entity:
+            return b"".join([
+                chunk async for chunk in entity._async_stream_segments(
+                    ["第一段。", "第二段。", "第三段。"], 1.0, "Vivian"
+                )
+            ])
+
+    audio = asyncio.run(main())
+    assert audio.endswith(b"\x01\x00" * 50 + b"\x02\x00" * 100)
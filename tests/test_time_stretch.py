@@ -0,0 +1,40 @@
+"""Tests for serving alternate speeds by time-stretching cached audio."""
+import numpy as np
+import pytest
+
+RATE = 24000
+
+
+def tone(seconds, freq=300.0):
+    t = np.arange(int(seconds * RATE), dtype=np.float32) / RATE
+    return (0.3 * np.sin(2 * np.pi * freq * t)).astype(np.float32)
+
+
+def dominant_frequency(audio):
+    spectrum = np.abs(np.fft.rfft(audio))
+    return np.fft.rfftfreq(audio.shape[0], 1 / RATE)[np.argmax(spectrum)]
+
+
+@pytest.mark.parametrize("method", ["wsola", "phase_vocoder"])
+@pytest.mark.parametrize("rate", [0.8, 1.5])
+def test_stretch_changes_duration_but_not_pitch(server, method, rate):
+    audio = server.time_stretch(tone(2.0), rate, RATE, method)
+    assert audio.shape[0] == pytest.approx(2.0 * RATE / rate, rel=0.03)
+    assert dominant_frequency(audio) == pytest.approx(300, abs=5)
+
+
+def test_unit_rate_is_a_no_op(server):
+    audio = tone(0.5)
+    assert server.time_stretch(audio, 1.0, RATE) is audio
+
+
+def test_speeds_share_the_canonical_source_audio(client):
+    text = "换一个语速再播一遍"
+    first = client.post("/api/tts", params={"text": text, "speed": 1.5, "time_stretch": True})
+    second = client.post("/api/tts", params={"text": text, "speed": 0.8, "time_stretch": True})
+    assert first.status_code == second.status_code == 200
+    assert first.headers["X-Time-Stretch"].startswith("1.0->1.5")
+    assert first.headers["X-Stretch-Source"] == "generated"
+    assert second.headers["X-Stretch-Source"] == "cache"
+    ratio = float(second.headers["X-Audio-Duration"]) / float(first.headers["X-Audio-Duration"])
+    assert ratio == pytest.approx(1.5 / 0.8, rel=0.05)
@@ -0,0 +1,80 @@
+"""Tests for the adaptive request timeouts."""
+from unittest.mock import MagicMock
+
+import pytest
+
+pytest.importorskip("homeassistant")
+
+from custom_components.qwen3_tts import timeouts  # noqa: E402
+from custom_components.qwen3_tts.const import (  # noqa: E402
+    ADAPTIVE_MIN_SAMPLES,
+    MAX_TIMEOUT,
+    MIN_TIMEOUT,
+)
+from custom_components.qwen3_tts.timeouts import SpeedEstimate  # noqa: E402
+
+
+def fit(samples):
+    estimate = SpeedEstimate()
+    for chars, seconds in samples:
+        estimate.add(chars, seconds)
+    return estimate
+
+
+def test_fit_separates_overhead_from_per_character_time():
+    # 1 s per request plus 50 ms per character
+    estimate = fit([(chars, 1.0 + 0.05 * chars) for chars in [10, 200, 40, 120, 80] * 10])
+    intercept, slope = estimate.coefficients()
+    assert intercept == pytest.approx(1.0, abs=0.05)
+    assert slope == pytest.approx(0.05, abs=0.002)
+    assert estimate.predict(100) == pytest.approx(6.0, abs=0.05)
+    assert estimate.upper(100) >= estimate.predict(100)
+
+
+def test_equal_lengths_are_attributed_to_the_characters():
+    intercept, slope = fit([(50, 5.0)] * 10).coefficients()
+    assert intercept == 0.0
+    assert slope == pytest.approx(0.1)
+
+
+def test_noise_widens_the_upper_bound():
+    steady = fit([(chars, 0.1 * chars) for chars in [20, 80] * 10])
+    noisy = fit(
+        [(chars, 0.1 * chars + (i % 2) * 2.0) for i, chars in enumerate([20, 80, 80, 20] * 5)]
+    )
+    assert noisy.upper(50) > steady.upper(50)
+    assert steady.upper(50) == pytest.approx(steady.predict(50), abs=0.01)
+
+
+@pytest.fixture
+def estimator(monkeypatch):
+    monkeypatch.setattr(timeouts, "Store", MagicMock())
+    return timeouts.TimeoutEstimator(MagicMock(), "entry")
+
+
+def test_fallback_until_enough_samples(estimator):
+    for _ in range(ADAPTIVE_MIN_SAMPLES - 1):
+        estimator.async_record("server", "Vivian", 100, 10.0)
+    assert estimator.timeout("server", "Vivian", 100, 2.0, fallback=42.0) == 42.0
+    estimator.async_record("server", "Vivian", 100, 10.0)
+    assert estimator.timeout("server", "Vivian", 100, 2.0, fallback=42.0) == pytest.approx(20.0)
+
+
+def test_server_estimate_covers_new_speakers(estimator):
+    for _ in range(ADAPTIVE_MIN_SAMPLES):
+        estimator.async_record("server", "Vivian", 100, 10.0)
+    assert estimator.timeout("server", "Ethan", 100, 2.0, fallback=42.0) == pytest.approx(20.0)
+    assert estimator.timeout("other", "Vivian", 100, 2.0, fallback=42.0) == 42.0
+
+
+def test_timeouts_are_clamped(estimator):
+    for _ in range(ADAPTIVE_MIN_SAMPLES):
+        estimator.async_record("server", "Vivian", 100, 1.0)
+    assert estimator.timeout("server", "Vivian", 1, 2.0, fallback=42.0) == MIN_TIMEOUT
+    assert estimator.timeout("server", "Vivian", 100000, 2.0, fallback=42.0) == MAX_TIMEOUT
+
+
+def test_invalid_samples_are_ignored(estimator):
+    estimator.async_record("server", "Vivian", 0, 1.0)
+    estimator.async_record("server", "Vivian", 10, 0.0)
+    assert estimator._data_to_save() == {"servers": {}}
@@ -0,0 +1,70 @@
+"""Tests for the body-based v2 protocol and the batch endpoint."""
+import json
+import struct
+
+
+def read_frames(body: bytes) -> list:
+    """Decode a batch response into (header, audio) pairs."""
+    frames = []
+    while body:
+        header_length, data_length = struct.unpack(">II", body[:8])
+        header = json.loads(body[8:8 + header_length])
+        start = 8 + header_length
+        frames.append((header, body[start:start + data_length]))
+        body = body[start + data_length:]
+    return frames
+
+
+def test_v2_matches_query_parameters(client):
+    request = {"text": "第二版协议", "speaker": "Chelsie", "speed": 1.2}
+    v1 = client.post("/api/tts", params=request)
+    v2 = client.post("/api/v2/tts", json=request)
+    assert v1.status_code == v2.status_code == 200
+    assert v2.content == v1.content
+    assert v2.headers["X-Cache"] == "HIT"
+
+
+def test_v2_validates_the_body(client):
+    assert client.post("/api/v2/tts", json={"text": ""}).status_code == 422
+    assert client.post("/api/v2/tts", json={"text": "太快了", "speed": 5}).status_code == 422
+
+
+def test_batch_returns_one_frame_per_item(server, client, monkeypatch):
+    generate = server.backend.generate
+
+    def fail_one(text, *args, **kwargs):
+        if text == "批量第三条":
+            raise RuntimeError("boom")
+        return generate(text, *args, **kwargs)
+
+    monkeypatch.setattr(server.backend, "generate", fail_one)
+    # Different speakers, so no item is generated in a shared batch
+    items = [
+        {"text": "批量第一条"},
+        {"text": "批量第二条，稍微长一些", "speaker": "Ethan"},
+        {"text": "批量第三条", "speaker": "Chelsie"},
+    ]
+    response = client.post("/api/v2/tts/batch", json={"items": items})
+    assert response.status_code == 200
+    assert response.headers["X-Batch-Items"] == "3"
+
+    frames = {header["index"]: (header, data) for header, data in read_frames(response.content)}
+    assert sorted(frames) == [0, 1, 2]
+    for index in (0, 1):
+        header, data = frames[index]
+        assert header["status"] == 200
+        assert header["cache"] == "MISS"
+        assert header["elapsed"] >= header["generation_time"] > 0
+        assert data.startswith(b"RIFF")
+    assert frames[1][0]["duration"] > frames[0][0]["duration"]
+    header, data = frames[2]
+    assert header["status"] == 500
+    assert "boom" in header["error"]
+    assert data == b""
+
+
+def test_batch_items_share_the_cache(client):
+    client.post("/api/v2/tts", json={"text": "已经缓存的批量条目"})
+    response = client.post("/api/v2/tts/batch", json={"items": [{"text": "已经缓存的批量条目"}]})
+    [(header, _)] = read_frames(response.content)
+    assert header["cache"] == "HIT"
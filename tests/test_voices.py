@@ -0,0 +1,141 @@
+"""Tests for the custom voice registry."""
+import io
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+import soundfile as sf
+
+
+def clip(seconds=2.0, freq=220.0, rate=24000):
+    t = np.arange(int(seconds * rate), dtype=np.float32) / rate
+    buffer = io.BytesIO()
+    sf.write(buffer, 0.3 * np.sin(2 * np.pi * freq * t), rate, format="WAV")
+    return buffer.getvalue()
+
+
+def test_registry_round_trip(server, tmp_path):
+    registry = server.VoiceRegistry(tmp_path, "stub:model")
+    embedding = np.arange(8, dtype=np.float32)
+    registry.save("alice", {"transcript": "你好"}, {"speaker_embedding": embedding})
+
+    restarted = server.VoiceRegistry(tmp_path, "stub:model")
+    voices = restarted.load()
+    assert isinstance(voices["alice"]["speaker_embedding"], np.memmap)
+    np.testing.assert_array_equal(voices["alice"]["speaker_embedding"], embedding)
+    assert restarted.get("alice")["transcript"] == "你好"
+    assert restarted.cache_tag("alice") == f"alice#{restarted.get('alice')['fingerprint']}"
+
+
+def test_voices_of_another_model_are_skipped(server, tmp_path):
+    server.VoiceRegistry(tmp_path, "stub:old").save(
+        "alice", {}, {"speaker_embedding": np.zeros(4, dtype=np.float32)}
+    )
+    registry = server.VoiceRegistry(tmp_path, "stub:new")
+    assert registry.load() == {}
+    assert registry.get("alice") is None
+
+
+def test_register_synthesize_and_delete(client):
+    response = client.put("/api/voices/test-voice", content=clip(), params={"transcript": "测试"})
+    assert response.status_code == 201
+    voice = response.json()
+    assert voice["builtin"] is False
+    assert voice["duration"] == pytest.approx(2.0)
+
+    names = {v["name"]: v["builtin"] for v in client.get("/api/voices").json()["voices"]}
+    assert names["test-voice"] is False
+    assert names["Vivian"] is True
+
+    text = "用自定义音色合成"
+    custom = client.post("/api/tts", params={"text": text, "speaker": "test-voice"})
+    builtin = client.post("/api/tts", params={"text": text, "speaker": "Vivian"})
+    assert custom.status_code == 200
+    assert custom.content != builtin.content
+
+    assert client.delete("/api/voices/test-voice").status_code == 204
+    assert client.get("/api/voices/test-voice").status_code == 404
+
+
+@pytest.mark.parametrize(
+    ("name", "body", "status"),
+    [
+        ("Vivian", clip(), 409),
+        ("bad name!", clip(), 400),
+        ("short", clip(seconds=0.2), 400),
+        ("noise", b"not audio", 400),
+    ],
+)
+def test_invalid_registrations_are_rejected(client, name, body, status):
+    assert client.put(f"/api/voices/{name}", content=body).status_code == status
+
+
+def test_models_without_voice_cloning_refuse_registration(server, client, monkeypatch):
+    monkeypatch.setattr(server.backend, "supports_voices", False)
+    assert client.get("/ready").json()["voice_cloning"] is False
+    response = client.put("/api/voices/refused", content=clip())
+    assert response.status_code == 501
+    assert "Base" in response.json()["detail"]
+    assert client.delete("/api/voices/refused").status_code == 501
+
+
+class FakeQwen3TTS:
+    """Stands in for mlx-audio's qwen3_tts.Model, with the same generate signature."""
+
+    sample_rate = 24000
+
+    def __init__(self, base: bool):
+        # Only Base models load a speaker encoder
+        self.speaker_encoder = object() if base else None
+        self.calls = []
+
+    def extract_speaker_embedding(self, audio, sr=24000):
+        assert sr == 24000
+        return np.ones((1, 4), dtype=np.float32)
+
+    def generate(
+        self, text, voice=None, instruct=None, temperature=0.9, speed=1.0, lang_code="auto",
+        ref_audio=None, ref_text=None, split_pattern="\n", max_tokens=4096, verbose=False,
+        stream=False, streaming_interval=2.0, streaming_context_size=25, top_k=50, top_p=1.0,
+        repetition_penalty=1.05, **kwargs,
+    ):
+        # The real model swallows unknown keywords, which would silently drop the voice
+        assert not kwargs, f"unexpected generate arguments: {sorted(kwargs)}"
+        self.calls.append({"voice": voice, "ref_audio": ref_audio, "ref_text": ref_text})
+        yield SimpleNamespace(audio=np.zeros(2400, dtype=np.float32), sample_rate=24000)
+
+
+def mlx_backend(server, base: bool):
+    backend = server.MLXBackend("test-model")
+    backend._mx = SimpleNamespace(array=np.asarray)
+    backend._load = lambda model_id: FakeQwen3TTS(base)
+    backend.load()
+    return backend
+
+
+def test_mlx_custom_voice_model_cannot_clone(server):
+    backend = mlx_backend(server, base=False)
+    assert not backend.supports_voices
+    with pytest.raises(NotImplementedError):
+        backend.compute_voice(np.zeros(24000, dtype=np.float32), "")
+    backend.generate("内置音色", "Vivian", 1.0)
+    assert backend._model.calls[-1] == {"voice": "Vivian", "ref_audio": None, "ref_text": None}
+
+
+def test_mlx_voices_pass_the_reference_clip_to_the_model(server, tmp_path):
+    backend = mlx_backend(server, base=True)
+    assert backend.supports_voices
+    audio = np.linspace(-0.5, 0.5, 24000, dtype=np.float32)
+    # Round-trip through the registry, as a restarted server would load the voice
+    registry = server.VoiceRegistry(tmp_path, "test-model")
+    conditioning = registry.save("xiaoming", {}, backend.compute_voice(audio, "今天天气真不错"))
+    backend.add_voice("xiaoming", conditioning)
+    list(backend.stream("自定义音色", "xiaoming", 1.0))
+    call = backend._model.calls[-1]
+    assert call["voice"] is None
+    np.testing.assert_array_equal(call["ref_audio"], audio)
+    assert call["ref_text"] == "今天天气真不错"
+
+    backend.add_voice("untranscribed", backend.compute_voice(audio, ""))
+    backend.generate("没有参考文本", "untranscribed", 1.0)
+    assert backend._model.calls[-1]["ref_text"] is None
@@ -0,0 +1,68 @@
+"""Tests for the inference thread and its bounded queue."""
+import asyncio
+import threading
+
+import pytest
+
+
+def test_jobs_run_on_the_inference_thread(make_worker):
+    worker = make_worker()
+    worker.start()
+
+    async def main():
+        return await worker.submit(lambda cancel=None: threading.current_thread().name)
+
+    assert asyncio.run(main()).startswith("inference-worker")
+    assert worker.completed == 1
+
+
+def test_full_queue_rejects_per_priority(server, make_worker):
+    # Not started, so submitted jobs stay queued
+    worker = make_worker(max_queue=1)
+
+    async def main():
+        worker.submit(lambda cancel=None: None)
+        with pytest.raises(server.QueueFullError):
+            worker.submit(lambda cancel=None: None)
+        # A full interactive queue does not block bulk work, and vice versa
+        worker.submit(lambda cancel=None: None, priority="bulk")
+
+    asyncio.run(main())
+    assert worker.rejected == 1
+    assert worker.depth_by_priority() == {"interactive": 1, "bulk": 1}
+
+
+def test_job_errors_reach_the_caller(make_worker):
+    worker = make_worker()
+    worker.start()
+
+    def fail(cancel=None):
+        raise RuntimeError("boom")
+
+    async def main():
+        await worker.submit(fail)
+
+    with pytest.raises(RuntimeError, match="boom"):
+        asyncio.run(main())
+
+
+def test_full_queue_answers_503_with_retry_after(server, client, monkeypatch):
+    monkeypatch.setattr(server.worker, "max_queue", 0)
+    response = client.post("/api/tts", params={"text": "队列已满时的请求"})
+    assert response.status_code == 503
+    assert int(response.headers["Retry-After"]) >= 1
+
+
+def test_health_answers_while_model_is_busy(server, client):
+    release = threading.Event()
+
+    async def block():
+        await server.worker.submit(lambda cancel=None: release.wait(5))
+
+    thread = threading.Thread(target=asyncio.run, args=(block(),))
+    thread.start()
+    try:
+        assert client.get("/health").status_code == 200
+    finally:
+        release.set()
+        thread.join()
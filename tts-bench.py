@@ -0,0 +1,479 @@
+#!/usr/bin/env python3
+"""
+Qwen3-TTS 压测工具
+
+按可配置的负载回放请求，输出吞吐量、延迟分位数、首字节时间、
+实时率和错误率（JSON）。
+
+负载 (--workload):
+  short     Assist 风格的短回复（随机组合的文本，多数不命中缓存）
+  long      300-600 字的长播报
+  burst     每隔 --burst-interval 秒同时发出 --burst-size 条短回复
+  repeated  80% 来自少量固定短语（测缓存命中路径），20% 为新文本
+
+发送方式:
+  --concurrency N   闭环：N 个并发客户端，每个收到响应后立即发下一条
+  --rate R          开环：按平均 R 条/秒的泊松过程发请求，与响应速度无关
+
+模式 (--mode):
+  http    直接请求服务器 /api/tts（或 --stream 时请求 /api/tts/stream）
+  entity  与 Home Assistant 一样调用集成的 Qwen3TTSEntity.async_stream_tts_audio
+          （默认的 wav 格式走流式分段路径，其他格式与后处理回退到整段请求），
+          包含客户端的分段、并行、拼接与服务器池开销（需要安装 Home Assistant）
+
+示例:
+  python tts-bench.py --url http://localhost:7861 --workload short --concurrency 4 --requests 50
+  python tts-bench.py --workload long --rate 0.5 --duration 60 --output long.json
+  python tts-bench.py --mode entity --workload long --concurrency 2 --requests 10
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import struct
+import sys
+import time
+from dataclasses import dataclass
+from functools import partial
+from pathlib import Path
+from typing import Callable, Optional
+
+import aiohttp
+
+# Assist 风格短回复模板
+SHORT_TEMPLATES = [
+    "好的，已为你打开{room}的灯。",
+    "现在{room}的温度是{n}度，湿度百分之{m}。",
+    "已将{room}空调设置为{n}度。",
+    "好的，{n}分钟后提醒你。",
+    "{room}的窗帘已经关上了。",
+    "Turned on the {room_en} lights.",
+    "The {room_en} is at {n} degrees.",
+    "Timer set for {n} minutes.",
+]
+ROOMS = ["客厅", "卧室", "厨房", "书房", "阳台"]
+ROOMS_EN = ["living room", "bedroom", "kitchen", "office", "hallway"]
+
+# 长播报使用的句子
+LONG_SENTENCES = [
+    "早上好，今天是{n}月{m}日。",
+    "室外气温{n}度，最高气温{m}度，午后有阵雨，出门请带伞。",
+    "今天日程共有{n}项，第一项会议在上午{m}点开始。",
+    "洗衣机已经完成洗涤，请及时晾晒衣物。",
+    "家中的{n}个设备电量不足，建议尽快更换电池。",
+    "本周用电量为{n}度，比上周减少了百分之{m}。",
+    "前门在{n}点{m}分被打开，当前已经关闭并上锁。",
+    "空气质量良好，PM2.5 浓度为每立方米{n}微克。",
+    "垃圾清运日是明天早上，请在今晚把垃圾桶放到门口。",
+    "The package was delivered at {n} {m} and is waiting at the front door.",
+]
+
+# repeated 负载的固定短语（门铃、晚安等高频播报）
+REPEATED_PHRASES = [
+    "有人按门铃。",
+    "晚安，祝你好梦。",
+    "欢迎回家。",
+    "洗衣机已完成。",
+    "前门没有关好。",
+]
+
+
+def _fill(template: str, rng: random.Random) -> str:
+    return template.format(
+        room=rng.choice(ROOMS),
+        room_en=rng.choice(ROOMS_EN),
+        n=rng.randint(1, 40),
+        m=rng.randint(1, 99),
+    )
+
+
+def short_text(rng: random.Random) -> str:
+    return _fill(rng.choice(SHORT_TEMPLATES), rng)
+
+
+def long_text(rng: random.Random) -> str:
+    target = rng.randint(300, 600)
+    text = ""
+    while len(text) < target:
+        sentence = _fill(rng.choice(LONG_SENTENCES), rng)
+        text += (" " if text and sentence[0].isascii() else "") + sentence
+    return text
+
+
+def repeated_text(rng: random.Random) -> str:
+    if rng.random() < 0.8:
+        return rng.choice(REPEATED_PHRASES)
+    return short_text(rng)
+
+
+WORKLOADS: dict = {
+    "short": short_text,
+    "long": long_text,
+    "burst": short_text,
+    "repeated": repeated_text,
+}
+
+
+@dataclass
+class Sample:
+    """一次请求的测量结果（秒）"""
+
+    start: float
+    latency: float
+    ok: bool
+    ttfb: Optional[float] = None
+    audio_duration: Optional[float] = None
+    bytes: int = 0
+    cache_hit: Optional[bool] = None
+    error: Optional[str] = None
+
+
+def wav_duration(data: bytes) -> Optional[float]:
+    """从 WAV 头计算音频时长（流式 WAV 的数据长度以实际字节数为准）"""
+    if data[:4] != b"RIFF" or data[8:12] != b"WAVE":
+        return None
+    pos = 12
+    byte_rate = None
+    while pos + 8 <= len(data):
+        chunk_id, size = struct.unpack_from("<4sI", data, pos)
+        pos += 8
+        if chunk_id == b"fmt ":
+            byte_rate = struct.unpack_from("<I", data, pos + 8)[0]
+        elif chunk_id == b"data":
+            if not byte_rate:
+                return None
+            return min(size, len(data) - pos) / byte_rate
+        pos += size + (size & 1)
+    return None
+
+
+class HttpClient:
+    """直接请求 TTS 服务器"""
+
+    def __init__(self, url: str, speaker: str, speeds: list, audio_format: str,
+                 stream: bool, timeout: float, time_stretch: Optional[bool],
+                 rng: random.Random):
+        self.url = url.rstrip("/")
+        self.speaker = speaker
+        self.speeds = speeds
+        self.audio_format = audio_format
+        self.stream = stream
+        self.timeout = timeout
+        self.time_stretch = time_stretch
+        self.rng = rng
+        self.session: Optional[aiohttp.ClientSession] = None
+
+    async def __aenter__(self):
+        self.session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=0),
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+        )
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.session.close()
+
+    async def synthesize(self, text: str) -> Sample:
+        speed = self.rng.choice(self.speeds)
+        params = {"text": text, "speaker": self.speaker, "speed": speed}
+        if self.stream:
+            url = f"{self.url}/api/tts/stream"
+        else:
+            url = f"{self.url}/api/tts"
+            params["format"] = self.audio_format
+            if self.time_stretch is not None:
+                params["time_stretch"] = "true" if self.time_stretch else "false"
+        start = time.perf_counter()
+        try:
+            async with self.session.post(url, params=params) as response:
+                if response.status != 200:
+                    await response.read()
+                    return Sample(start, time.perf_counter() - start, False,
+                                  error=f"status {response.status}")
+                ttfb = None
+                parts = []
+                async for chunk in response.content.iter_any():
+                    if ttfb is None:
+                        ttfb = time.perf_counter() - start
+                    parts.append(chunk)
+                latency = time.perf_counter() - start
+                data = b"".join(parts)
+                duration = response.headers.get("X-Audio-Duration")
+                return Sample(
+                    start, latency, bool(data), ttfb=ttfb,
+                    audio_duration=float(duration) if duration else wav_duration(data),
+                    bytes=len(data),
+                    cache_hit=response.headers.get("X-Cache") == "HIT",
+                    error=None if data else "empty response",
+                )
+        except (asyncio.TimeoutError, aiohttp.ClientError) as err:
+            return Sample(start, time.perf_counter() - start, False,
+                          error=str(err) or type(err).__name__)
+
+
+class EntityClient:
+    """
+    通过集成的 Qwen3TTSEntity 合成，测量包含客户端开销的端到端延迟
+
+    需要在安装了 Home Assistant 的环境中运行；只构造实体用到的对象，
+    不启动 Home Assistant。
+    """
+
+    def __init__(self, url: str, speaker: str, speed: float, audio_format: str,
+                 parallelism: int, timeout: float):
+        self.urls = [u.rstrip("/") for u in url.split(",")]
+        self.speaker = speaker
+        self.speed = speed
+        self.data = {"format": audio_format, "parallelism": parallelism,
+                     "timeout": timeout, "speed": speed, "speaker": speaker}
+        self.entity = None
+        self.session: Optional[aiohttp.ClientSession] = None
+
+    async def __aenter__(self):
+        from types import SimpleNamespace
+
+        sys.path.insert(0, str(Path(__file__).resolve().parent))
+        from custom_components.qwen3_tts.pool import ServerPool
+        from custom_components.qwen3_tts.speakers import SpeakerDirectory
+        from custom_components.qwen3_tts.stats import RequestStats
+        from custom_components.qwen3_tts.tts import Qwen3TTSEntity, TTSAudioRequest
+
+        self.session = aiohttp.ClientSession()
+        config_entry = SimpleNamespace(entry_id="bench", title="Qwen3 TTS bench", data=self.data)
+        pool = ServerPool(None, self.session, self.urls)
+        await pool.async_probe()
+        if not pool.healthy_backends():
+            raise SystemExit(f"没有可用的 TTS 服务器: {pool.primary.last_error}")
+        self.stats = RequestStats()
+        self.request_type = TTSAudioRequest
+        self.entity = Qwen3TTSEntity(
+            None, pool, self.session, self.stats,
+            SpeakerDirectory(None, self.session, pool), self.speed, self.speaker,
+            int(self.data["timeout"]), config_entry,
+        )
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.session.close()
+
+    async def synthesize(self, text: str) -> Sample:
+        async def message_gen():
+            yield text
+
+        start = time.perf_counter()
+        errors = self.stats.errors + self.stats.timeouts
+        ttfb = None
+        parts = []
+        try:
+            response = await self.entity.async_stream_tts_audio(self.request_type(
+                language="zh",
+                options={"speed": self.speed, "speaker": self.speaker},
+                message_gen=message_gen(),
+            ))
+            async for chunk in response.data_gen:
+                if ttfb is None:
+                    ttfb = time.perf_counter() - start
+                parts.append(chunk)
+        except Exception as err:  # pylint: disable=broad-except
+            return Sample(start, time.perf_counter() - start, False, ttfb=ttfb, error=repr(err))
+        latency = time.perf_counter() - start
+        data = b"".join(parts)
+        if not data:
+            return Sample(start, latency, False, error="entity returned no audio")
+        retried = self.stats.errors + self.stats.timeouts - errors
+        return Sample(
+            start, latency, True, ttfb=ttfb,
+            audio_duration=wav_duration(data) if response.extension == "wav" else None,
+            bytes=len(data),
+            error=f"{retried} segment attempts failed" if retried else None,
+        )
+
+
+async def run_closed_loop(client, make_text: Callable[[], str], concurrency: int,
+                          requests: int, duration: Optional[float]) -> list:
+    """闭环：concurrency 个客户端各自连续发送请求"""
+    samples: list = []
+    deadline = time.perf_counter() + duration if duration else None
+    remaining = requests
+
+    async def user():
+        nonlocal remaining
+        while True:
+            if deadline is not None:
+                if time.perf_counter() >= deadline:
+                    return
+            elif remaining <= 0:
+                return
+            remaining -= 1
+            samples.append(await client.synthesize(make_text()))
+
+    await asyncio.gather(*(user() for _ in range(concurrency)))
+    return samples
+
+
+async def run_open_loop(client, make_text: Callable[[], str], rate: float,
+                        requests: int, duration: Optional[float],
+                        rng: random.Random) -> list:
+    """开环：按泊松过程到达，请求是否完成不影响下一次发送"""
+    tasks = []
+    start = time.perf_counter()
+    next_at = start
+    while (time.perf_counter() - start < duration) if duration else len(tasks) < requests:
+        next_at += rng.expovariate(rate)
+        await asyncio.sleep(max(0.0, next_at - time.perf_counter()))
+        tasks.append(asyncio.create_task(client.synthesize(make_text())))
+    return list(await asyncio.gather(*tasks))
+
+
+async def run_bursts(client, make_text: Callable[[], str], burst_size: int,
+                     interval: float, requests: int) -> list:
+    """突发：每 interval 秒同时发出 burst_size 条请求"""
+    tasks = []
+    while len(tasks) < requests:
+        size = min(burst_size, requests - len(tasks))
+        tasks += [asyncio.create_task(client.synthesize(make_text())) for _ in range(size)]
+        if len(tasks) < requests:
+            await asyncio.sleep(interval)
+    return list(await asyncio.gather(*tasks))
+
+
+def percentile(values: list, q: float) -> Optional[float]:
+    """线性插值分位数（q 为 0-100）"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * q / 100
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return round(ordered[low] + (ordered[high] - ordered[low]) * (rank - low), 4)
+
+
+def _distribution(values: list) -> dict:
+    return {
+        "p50": percentile(values, 50),
+        "p95": percentile(values, 95),
+        "p99": percentile(values, 99),
+        "mean": round(sum(values) / len(values), 4) if values else None,
+        "max": round(max(values), 4) if values else None,
+    }
+
+
+def summarize(samples: list, wall_time: float) -> dict:
+    """汇总测量结果；实时率 = 音频时长 / 请求延迟"""
+    ok = [s for s in samples if s.ok]
+    audio = [s for s in ok if s.audio_duration]
+    hits = [s for s in ok if s.cache_hit is not None]
+    errors: dict = {}
+    for s in samples:
+        if not s.ok:
+            errors[s.error] = errors.get(s.error, 0) + 1
+    return {
+        "requests": len(samples),
+        "ok": len(ok),
+        "errors": len(samples) - len(ok),
+        "error_rate": round((len(samples) - len(ok)) / len(samples), 4) if samples else 0.0,
+        "error_types": errors,
+        "wall_time": round(wall_time, 3),
+        "requests_per_second": round(len(ok) / wall_time, 3) if wall_time else 0.0,
+        "latency": _distribution([s.latency for s in ok]),
+        "ttfb": _distribution([s.ttfb for s in ok if s.ttfb is not None]),
+        "realtime_factor": _distribution([s.audio_duration / s.latency for s in audio]),
+        "audio_seconds_per_second": (
+            round(sum(s.audio_duration for s in audio) / wall_time, 3) if wall_time else 0.0
+        ),
+        "bytes_received": sum(s.bytes for s in ok),
+        "cache_hit_ratio": (
+            round(sum(s.cache_hit for s in hits) / len(hits), 4) if hits else None
+        ),
+    }
+
+
+async def main(args: argparse.Namespace) -> dict:
+    # 默认每次运行使用新的种子，避免重复运行时命中上一次的缓存
+    if args.seed is None:
+        args.seed = random.randrange(2**32)
+    rng = random.Random(args.seed)
+    make_text = partial(WORKLOADS[args.workload], rng)
+    speeds = args.speeds or [args.speed]
+    if args.mode == "entity":
+        client = EntityClient(args.url, args.speaker, args.speed, args.format,
+                              args.parallelism, args.timeout)
+    else:
+        client = HttpClient(args.url, args.speaker, speeds, args.format,
+                            args.stream, args.timeout, args.time_stretch, rng)
+
+    async with client:
+        for _ in range(args.warmup):
+            await client.synthesize(make_text())
+        start = time.perf_counter()
+        if args.workload == "burst":
+            samples = await run_bursts(client, make_text, args.burst_size,
+                                       args.burst_interval, args.requests)
+        elif args.rate:
+            samples = await run_open_loop(client, make_text, args.rate,
+                                          args.requests, args.duration, rng)
+        else:
+            samples = await run_closed_loop(client, make_text, args.concurrency,
+                                            args.requests, args.duration)
+        wall_time = time.perf_counter() - start
+
+    return {
+        "config": {
+            "mode": args.mode,
+            "url": args.url,
+            "workload": args.workload,
+            "concurrency": None if args.rate or args.workload == "burst" else args.concurrency,
+            "rate": args.rate,
+            "burst_size": args.burst_size if args.workload == "burst" else None,
+            "speaker": args.speaker,
+            "speed": args.speed if args.mode == "entity" else speeds,
+            "time_stretch": args.time_stretch,
+            "format": "wav" if args.stream and args.mode == "http" else args.format,
+            "stream": args.stream,
+            "seed": args.seed,
+        },
+        "results": summarize(samples, wall_time),
+    }
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Qwen3-TTS 压测工具",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__,
+    )
+    parser.add_argument("--url", default="http://localhost:7861",
+                        help="服务器地址；entity 模式下可用逗号分隔多个组成服务器池")
+    parser.add_argument("--mode", choices=["http", "entity"], default="http")
+    parser.add_argument("--workload", choices=sorted(WORKLOADS), default="short")
+    parser.add_argument("--concurrency", type=int, default=1, help="闭环并发数")
+    parser.add_argument("--rate", type=float, help="开环到达率（条/秒）")
+    parser.add_argument("--requests", type=int, default=20, help="请求总数")
+    parser.add_argument("--duration", type=float, help="按时长（秒）而不是请求数运行")
+    parser.add_argument("--burst-size", type=int, default=8)
+    parser.add_argument("--burst-interval", type=float, default=10.0)
+    parser.add_argument("--speaker", default="Vivian")
+    parser.add_argument("--speed", type=float, default=1.0)
+    parser.add_argument("--speeds", type=lambda v: [float(s) for s in v.split(",")],
+                        help="http 模式下每个请求从逗号分隔的语速中随机选择，如 0.8,1.0,1.2")
+    parser.add_argument("--time-stretch", dest="time_stretch",
+                        action=argparse.BooleanOptionalAction,
+                        help="http 模式下显式开启/关闭服务器的时间拉伸（默认由服务器决定）")
+    parser.add_argument("--format", choices=["wav", "flac", "opus", "mp3"], default="wav")
+    parser.add_argument("--stream", action="store_true", help="http 模式下请求流式端点")
+    parser.add_argument("--parallelism", type=int, default=2, help="entity 模式的分段并行数")
+    parser.add_argument("--timeout", type=float, default=300.0, help="单次请求超时（秒）")
+    parser.add_argument("--warmup", type=int, default=0, help="正式测量前的预热请求数")
+    parser.add_argument("--seed", type=int, help="文本生成的随机种子（用于复现同一组文本）")
+    parser.add_argument("--output", help="结果写入 JSON 文件（默认输出到标准输出）")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    report = asyncio.run(main(args))
+    output = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        Path(args.output).write_text(output + "\n", encoding="utf-8")
+    print(output)